@@ -0,0 +1,280 @@
+"""pytest-benchmark suite for the import time and the hot paths of colormap_tool.
+
+These benchmarks are not collected by the regular test run. Run them from the package
+directory and save the results as JSON:
+
+    uv run python -m pytest benchmarks --benchmark-only --benchmark-autosave
+
+Autosaved runs go to ``.benchmarks/`` and can be compared across releases with
+``uv run pytest-benchmark compare``. Use ``--benchmark-json=PATH`` to write a single file.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import cv2
+import matplotlib as mpl
+import numpy as np
+import pytest
+
+from colormap_tool import (
+    MPL_COLORMAPS,
+    Normalize,
+    _mpl,
+    apply_colormap_async,
+    apply_colormap_banded,
+    apply_colormap_normalized,
+    apply_colormap_packed,
+    apply_colormap_with_numpy,
+    clear_cache,
+    clear_mpl_cache,
+    get_colormaps,
+    get_cv_colormaps,
+    get_mpl_colormaps,
+    get_rgba_colormaps,
+    invert_colormap,
+    register_all_cmps2mpl,
+    resample_lut,
+    uint8_rgb_arr2mpl_cmp,
+)
+
+SHAPES = [(120, 160), (480, 640), (1080, 1920)]
+DTYPES = [np.uint8, np.uint16, np.float32]
+
+
+def run_python(code: str) -> None:
+    """Run code in a fresh interpreter."""
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+
+
+@pytest.mark.benchmark(group="import")
+def test_import_numpy(benchmark):
+    """Baseline for the cold import: a fresh interpreter importing numpy only."""
+    benchmark.pedantic(run_python, args=("import numpy",), rounds=10, warmup_rounds=1)
+
+
+@pytest.mark.benchmark(group="import")
+def test_import_colormap_tool(benchmark):
+    """Cold import of the package in a fresh interpreter."""
+    benchmark.pedantic(run_python, args=("import colormap_tool",), rounds=10, warmup_rounds=1)
+
+
+@pytest.mark.benchmark(group="get_colormaps")
+def test_get_colormaps(benchmark):
+    """Look up a stored colormap."""
+    benchmark(get_colormaps, "mpl.viridis")
+
+
+@pytest.mark.benchmark(group="get_colormaps")
+def test_get_colormaps_resampled(benchmark):
+    """Look up a resampled colormap from the LUT cache."""
+    benchmark(get_colormaps, "mpl.viridis", n=1024)
+
+
+@pytest.mark.benchmark(group="get_colormaps")
+def test_get_colormaps_resampled_first_call(benchmark):
+    """Resample a colormap on the first call, with an empty LUT cache."""
+    benchmark.pedantic(get_colormaps, args=("mpl.viridis",), kwargs={"n": 1024}, setup=clear_cache, rounds=100)
+
+
+@pytest.mark.benchmark(group="resample_lut")
+@pytest.mark.parametrize("n", [16, 1024, 4096])
+def test_resample_lut(benchmark, n):
+    """Resample a 256-entry LUT."""
+    lut = get_colormaps("mpl.viridis")
+    benchmark(resample_lut, lut, n)
+
+
+@pytest.mark.benchmark(group="get_cv_colormaps")
+@pytest.mark.parametrize("name", ["cv.jet", "mpl.viridis", "mpl.viridis_r"])
+def test_get_cv_colormaps(benchmark, name):
+    """Return an OpenCV constant or a precomputed BGR LUT."""
+    benchmark(get_cv_colormaps, name)
+
+
+def make_frame(shape, dtype):
+    """Return a random frame of the given shape and dtype."""
+    rng = np.random.default_rng(0)
+    if dtype == np.uint8:
+        return rng.integers(0, 256, size=shape, dtype=dtype)
+    if dtype == np.uint16:
+        return rng.integers(0, 65536, size=shape, dtype=dtype)
+    return rng.uniform(20.0, 40.0, size=shape).astype(dtype)
+
+
+def value_range(frame):
+    """Return the (vmin, vmax) range used to scale non-uint8 frames, or (None, None)."""
+    if frame.dtype == np.uint8:
+        return None, None
+    return float(frame.min()), float(frame.max())
+
+
+@pytest.mark.parametrize("dtype", DTYPES, ids=lambda dtype: np.dtype(dtype).name)
+@pytest.mark.parametrize("shape", SHAPES, ids=lambda shape: f"{shape[0]}x{shape[1]}")
+def test_apply_colormap_with_numpy(benchmark, shape, dtype):
+    """Colorize a frame with the numpy engine into a reused output buffer."""
+    benchmark.group = f"apply {shape[0]}x{shape[1]} {np.dtype(dtype).name}"
+    src = make_frame(shape, dtype)
+    vmin, vmax = value_range(src)
+    lut = get_cv_colormaps("mpl.inferno")
+    dst = np.empty((*shape, 3), dtype=np.uint8)
+    benchmark(apply_colormap_with_numpy, src, lut, dst=dst, vmin=vmin, vmax=vmax)
+
+
+@pytest.mark.parametrize("dtype", DTYPES, ids=lambda dtype: np.dtype(dtype).name)
+@pytest.mark.parametrize("shape", SHAPES, ids=lambda shape: f"{shape[0]}x{shape[1]}")
+def test_apply_colormap_packed(benchmark, shape, dtype):
+    """Colorize a frame into 4-byte BGRA pixels, gathering one uint32 word per pixel."""
+    benchmark.group = f"apply {shape[0]}x{shape[1]} {np.dtype(dtype).name}"
+    src = make_frame(shape, dtype)
+    vmin, vmax = value_range(src)
+    lut = get_rgba_colormaps("mpl.inferno", order="bgra")
+    dst = np.empty((*shape, 4), dtype=np.uint8)
+    benchmark(apply_colormap_packed, src, lut, dst=dst, vmin=vmin, vmax=vmax)
+
+
+@pytest.mark.parametrize("dtype", DTYPES, ids=lambda dtype: np.dtype(dtype).name)
+@pytest.mark.parametrize("shape", SHAPES, ids=lambda shape: f"{shape[0]}x{shape[1]}")
+def test_apply_colormap_cv2(benchmark, shape, dtype):
+    """Colorize a frame with OpenCV; non-uint8 frames are scaled to uint8 first."""
+    benchmark.group = f"apply {shape[0]}x{shape[1]} {np.dtype(dtype).name}"
+    src = make_frame(shape, dtype)
+    vmin, vmax = value_range(src)
+    lut = get_cv_colormaps("mpl.inferno")
+    dst = np.empty((*shape, 3), dtype=np.uint8)
+
+    if vmin is None:
+        benchmark(cv2.applyColorMap, src, lut, dst)
+        return
+
+    alpha = 255.0 / (vmax - vmin)
+    beta = -vmin * alpha
+
+    def apply():
+        return cv2.applyColorMap(cv2.convertScaleAbs(src, alpha=alpha, beta=beta), lut, dst)
+
+    benchmark(apply)
+
+
+@pytest.mark.parametrize("workers", sorted({1, 2, 4, os.cpu_count() or 1}))
+@pytest.mark.parametrize("shape", [(2160, 3840), (8, 480, 640)], ids=["4K", "8x480p stack"])
+def test_apply_colormap_threads(benchmark, shape, workers):
+    """Colorize a large uint8 frame or a stack of frames with a tiled gather on several threads."""
+    benchmark.group = f"threads {'x'.join(map(str, shape))}"
+    src = make_frame(shape, np.uint8)
+    lut = get_cv_colormaps("mpl.viridis")
+    dst = np.empty((*shape, 3), dtype=np.uint8)
+    benchmark(apply_colormap_with_numpy, src, lut, dst=dst, workers=workers)
+
+
+@pytest.mark.benchmark(group="strided LUT 1080x1920")
+@pytest.mark.parametrize("engine", ["cv2", "numpy"])
+@pytest.mark.parametrize("layout", ["strided", "contiguous"])
+def test_apply_colormap_lut_layout(benchmark, engine, layout):
+    """Colorize with a negative-stride BGR view of a LUT or with the contiguous LUT of get_cv_colormaps."""
+    src = make_frame((1080, 1920), np.uint8)
+    lut = MPL_COLORMAPS["viridis"][:, :, ::-1] if layout == "strided" else get_cv_colormaps("mpl.viridis")
+    if engine == "cv2":
+        benchmark(cv2.applyColorMap, src, lut)
+    else:
+        benchmark(apply_colormap_with_numpy, src, lut)
+
+
+async def request_frames(frame, clients, requests, tick=0.001):
+    """Run concurrent clients that each request colorized frames, and return the longest event loop stall."""
+    stalls = []
+    stop = asyncio.Event()
+
+    async def client():
+        for _ in range(requests):
+            await apply_colormap_async(frame, "mpl.inferno")
+
+    async def ticker():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(tick)
+            stalls.append(time.perf_counter() - start - tick)
+
+    ticking = asyncio.ensure_future(ticker())
+    await asyncio.gather(*(client() for _ in range(clients)))
+    stop.set()
+    await ticking
+    return max(stalls, default=0.0)
+
+
+@pytest.mark.benchmark(group="async 1080x1920")
+@pytest.mark.parametrize("clients", [1, 4, 16])
+def test_apply_colormap_async(benchmark, clients):
+    """Serve 8 frames to each of several concurrent asyncio clients; the longest loop stall is recorded."""
+    frame = make_frame((1080, 1920), np.uint8)
+    stall = benchmark.pedantic(lambda: asyncio.run(request_frames(frame, clients, 8)), rounds=5)
+    benchmark.extra_info["max_loop_stall_ms"] = stall * 1e3
+
+
+@pytest.mark.benchmark(group="normalize 1080x1920 uint16")
+@pytest.mark.parametrize("composed", [True, False], ids=["composed", "separate"])
+def test_apply_colormap_normalized(benchmark, composed):
+    """Colorize a uint16 frame through a gamma window, as one composed LUT or as two passes."""
+    src = make_frame((1080, 1920), np.uint16)
+    norm = Normalize.window(level=32768, width=32768, mode="gamma", gamma=2.2)
+    dst = np.empty((1080, 1920, 3), dtype=np.uint8)
+    if composed:
+        benchmark(apply_colormap_normalized, src, "mpl.inferno", norm, dst=dst)
+        return
+
+    lut = get_cv_colormaps("mpl.inferno")
+    benchmark(lambda: apply_colormap_with_numpy(norm(src), lut, dst=dst, vmin=0, vmax=1))
+
+
+@pytest.mark.parametrize("dtype", DTYPES, ids=lambda dtype: np.dtype(dtype).name)
+def test_apply_colormap_banded(benchmark, dtype):
+    """Colorize a 1080p frame with ten bands between explicit boundaries."""
+    benchmark.group = f"apply 1080x1920 {np.dtype(dtype).name}"
+    src = make_frame((1080, 1920), dtype)
+    vmin, vmax = value_range(src)
+    boundaries = np.linspace(vmin or 0, vmax or 255, 11)
+    dst = np.empty((1080, 1920, 3), dtype=np.uint8)
+    benchmark(apply_colormap_banded, src, "mpl.inferno", boundaries, dst=dst)
+
+
+@pytest.mark.benchmark(group="invert_colormap")
+@pytest.mark.parametrize("noise", [0, 3])
+def test_invert_colormap(benchmark, noise):
+    """Decode a 640x480 colorized frame; noisy colors miss the exact lookup and are refined."""
+    rng = np.random.default_rng(0)
+    lut = get_colormaps("mpl.inferno").reshape(-1, 3)
+    frame = lut[make_frame((480, 640), np.uint8)].astype(np.int16)
+    frame = np.clip(frame + rng.integers(-noise, noise + 1, size=frame.shape), 0, 255).astype(np.uint8)
+    benchmark(invert_colormap, frame, "mpl.inferno")
+
+
+@pytest.mark.benchmark(group="matplotlib")
+@pytest.mark.parametrize("mode", ["listed", "linear"])
+def test_uint8_rgb_arr2mpl_cmp(benchmark, mode):
+    """Convert a uint8 LUT to a Matplotlib colormap."""
+    lut = get_colormaps("cv.jet")
+    benchmark(uint8_rgb_arr2mpl_cmp, lut, "cv.jet", mode=mode)
+
+
+@pytest.mark.benchmark(group="matplotlib")
+def test_get_mpl_colormaps_first_call(benchmark):
+    """Build a Matplotlib colormap on the first call, with an empty Colormap cache."""
+    benchmark.pedantic(get_mpl_colormaps, args=("cv.jet",), setup=clear_mpl_cache, rounds=100)
+
+
+def unregister_all():
+    """Undo register_all_cmps2mpl, so that the next call registers every colormap again."""
+    for name in list(mpl.colormaps):
+        if name.startswith("cv."):
+            mpl.colormaps.unregister(name)
+    _mpl._is_registered = False
+
+
+@pytest.mark.benchmark(group="matplotlib")
+def test_register_all_cmps2mpl(benchmark):
+    """Register all non-matplotlib colormaps with the matplotlib registry."""
+    benchmark.pedantic(register_all_cmps2mpl, setup=unregister_all, rounds=20)
+    assert "cv.jet" in mpl.colormaps
@@ -1,4 +1,4 @@
-import pickle
+import json
 from pathlib import Path
 
 import cv2
@@ -8,12 +8,13 @@ PACKAGE_DIR = Path(__file__).resolve().parent.parent
 if not (PACKAGE_DIR / "pyproject.toml").exists():
     raise FileNotFoundError("This script must be run from the current package directory.")
 
-RESOURCES_DIR = PACKAGE_DIR / "src" / "colormap_tools" / "resources"
+RESOURCES_DIR = PACKAGE_DIR / "src" / "colormap_tool" / "resources"
 
 if not RESOURCES_DIR.exists():
     raise FileNotFoundError("Resources directory does not exist.")
 
-CV_COLORMAP_FILE = RESOURCES_DIR / "cv_colormaps.pickle"
+CV_COLORMAP_FILE = RESOURCES_DIR / "cv_colormaps.npy"
+INDEX_FILE = RESOURCES_DIR / "colormaps.json"
 
 
 def extract_cv_colormaps(cv_cmp: int, len_: int = 256):
@@ -35,8 +36,13 @@ def main():
     for cmp in _CV_CMPS:
         CV_CMPS[cmp] = extract_cv_colormaps(_CV_CMPS[cmp])
 
-    with (RESOURCES_DIR / "cv_colormaps.pickle").open("wb") as f:
-        pickle.dump(CV_CMPS, f)
+    # Pack all colormaps into one contiguous (N, 256, 3) block, which is memory-mapped at runtime.
+    block = np.stack([cmp_arr.reshape(-1, 3) for cmp_arr in CV_CMPS.values()])
+    np.save(CV_COLORMAP_FILE, np.ascontiguousarray(block, dtype=np.uint8))
+
+    index = json.loads(INDEX_FILE.read_text(encoding="utf-8")) if INDEX_FILE.exists() else {}
+    index["cv"] = list(CV_CMPS)
+    INDEX_FILE.write_text(json.dumps(index, indent=2) + "\n", encoding="utf-8")
 
     print(f"Colormaps extracted and saved to {RESOURCES_DIR}.")
 
@@ -1,4 +1,4 @@
-import pickle
+import json
 from pathlib import Path
 
 import matplotlib.cm as cm
@@ -9,12 +9,13 @@ PACKAGE_DIR = Path(__file__).resolve().parent.parent
 if not (PACKAGE_DIR / "pyproject.toml").exists():
     raise FileNotFoundError("This script must be run from the current package directory.")
 
-RESOURCES_DIR = PACKAGE_DIR / "src" / "colormap_tools" / "resources"
+RESOURCES_DIR = PACKAGE_DIR / "src" / "colormap_tool" / "resources"
 
 if not RESOURCES_DIR.exists():
     raise FileNotFoundError("Resources directory does not exist.")
 
-MPL_COLORMAP_FILE = RESOURCES_DIR / "mpl_colormaps.pickle"
+MPL_COLORMAP_FILE = RESOURCES_DIR / "mpl_colormaps.npy"
+INDEX_FILE = RESOURCES_DIR / "colormaps.json"
 
 MPL_CMPS = list(colormaps)
 
@@ -48,8 +49,13 @@ def main():
         mpl_colormaps[cmp] = extract_mpl_colormaps(cmp)
         print(f"Extracted: {cmp}")
 
-    with (RESOURCES_DIR / "mpl_colormaps.pickle").open("wb") as f:
-        pickle.dump(mpl_colormaps, f)
+    # Pack all colormaps into one contiguous (N, 256, 3) block, which is memory-mapped at runtime.
+    block = np.stack([cmp_arr.reshape(-1, 3) for cmp_arr in mpl_colormaps.values()])
+    np.save(MPL_COLORMAP_FILE, np.ascontiguousarray(block, dtype=np.uint8))
+
+    index = json.loads(INDEX_FILE.read_text(encoding="utf-8")) if INDEX_FILE.exists() else {}
+    index["mpl"] = list(mpl_colormaps)
+    INDEX_FILE.write_text(json.dumps(index, indent=2) + "\n", encoding="utf-8")
 
     print(f"Colormaps extracted and saved to {RESOURCES_DIR}.")
 
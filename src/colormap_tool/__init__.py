@@ -4,30 +4,134 @@ This package provides utilities for loading, converting, and using colormaps fro
 (matplotlib, OpenCV) in a consistent way. It allows using colormaps from one library in another,
 for example using a matplotlib colormap in OpenCV or vice versa.
 
-The package loads colormaps from pickle files that store them as numpy arrays with shape (256, 1, 3)
-and dtype uint8. These colormaps can then be converted to the appropriate format for each visualization
-library.
+The package stores colormaps as packed numpy blocks that are memory-mapped on first use and exposed as
+arrays with shape (256, 1, 3) and dtype uint8. These colormaps can then be converted to the appropriate
+format for each visualization library.
 
 Main components:
 
-  - _cmps.py: Loads and stores colormap data from pickle files, provides RGB format colormaps and resampling utilities
-  - _cv.py: Provides colormaps in OpenCV format (BGR)
-  - _mpl.py: Provides colormaps in Matplotlib format
+  - _cmps.py: Loads and stores colormap data from packed resource files, provides RGB format colormaps,
+    resampling utilities and a cache of resampled LUTs
+  - _cv.py: Provides colormaps in OpenCV format (BGR) and a numpy colormap engine for images, batches and
+    packed 4-byte output
+  - _mpl.py: Provides colormaps in Matplotlib format, with a bounded cache of Colormap objects
+  - _norm.py: Composes window/level, gamma, power, log and symlog normalizations with colormaps into
+    cached LUTs indexed by raw uint8 or uint16 values, and applies banded colormaps with explicit boundaries
+  - _invert.py: Decodes colorized images back to colormap indices or values
+  - _metrics.py: Computes perceptual metrics of colormaps in CIELAB, with a disk cache
+  - _indexed.py: Saves frames as colormap indices (indexed PNG or npz) and colorizes them on load
+  - _async.py: Provides an asyncio counterpart of the numpy colormap engine, with request batching
+  - _stream.py: Colorizes streams of frames with reused output buffers and optional background threads,
+    and incrementally recolors the changed tiles of mostly-static scenes
+  - _autorange.py: Estimates smoothed display ranges of video frames from histogram percentiles
+
+The submodules are imported lazily: ``import colormap_tool`` does not import numpy or load any
+resource file, and each public name is imported from its submodule on first access.
 """
 
-from colormap_tool._cmps import CMPSPACE, CV_COLORMAPS, MPL_COLORMAPS, get_colormaps, resample_lut
-from colormap_tool._cv import apply_colormap_with_numpy, get_cv_colormaps
-from colormap_tool._mpl import get_mpl_colormaps, register_all_cmps2mpl, uint8_rgb_arr2mpl_cmp
-
-__all__ = [
-    "CMPSPACE",
-    "CV_COLORMAPS",
-    "MPL_COLORMAPS",
-    "apply_colormap_with_numpy",
-    "get_colormaps",
-    "get_cv_colormaps",
-    "get_mpl_colormaps",
-    "register_all_cmps2mpl",
-    "resample_lut",
-    "uint8_rgb_arr2mpl_cmp",
-]
+from __future__ import annotations
+
+import importlib
+
+# typing is not imported at runtime, since it alone would double the import time of the package.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+    from colormap_tool._async import apply_colormap_async, set_async_executor
+    from colormap_tool._autorange import AutoRange
+    from colormap_tool._cmps import (
+        CMPSPACE,
+        CV_COLORMAPS,
+        MPL_COLORMAPS,
+        cache_info,
+        clear_cache,
+        get_colormaps,
+        get_rgba_colormaps,
+        resample_all,
+        resample_lut,
+        set_cache_size,
+    )
+    from colormap_tool._cv import (
+        apply_colormap_batch,
+        apply_colormap_packed,
+        apply_colormap_with_numpy,
+        blend_colormap,
+        get_cv_colormaps,
+    )
+    from colormap_tool._indexed import IndexedFrames, load_indexed, save_indexed
+    from colormap_tool._invert import invert_colormap
+    from colormap_tool._metrics import colormap_metrics, simulate_cvd
+    from colormap_tool._mpl import (
+        clear_mpl_cache,
+        get_mpl_colormaps,
+        mpl_cache_info,
+        register_all_cmps2mpl,
+        set_mpl_cache_size,
+        uint8_rgb_arr2mpl_cmp,
+    )
+    from colormap_tool._norm import (
+        Normalize,
+        apply_colormap_banded,
+        apply_colormap_normalized,
+        get_banded_lut,
+        get_normalized_lut,
+    )
+    from colormap_tool._stream import IncrementalColorizer, colorize_stream
+
+# The submodule that defines each public name, in the sorted order of __all__.
+_EXPORTS = {
+    "CMPSPACE": "_cmps",
+    "CV_COLORMAPS": "_cmps",
+    "MPL_COLORMAPS": "_cmps",
+    "AutoRange": "_autorange",
+    "IncrementalColorizer": "_stream",
+    "IndexedFrames": "_indexed",
+    "Normalize": "_norm",
+    "apply_colormap_async": "_async",
+    "apply_colormap_banded": "_norm",
+    "apply_colormap_batch": "_cv",
+    "apply_colormap_normalized": "_norm",
+    "apply_colormap_packed": "_cv",
+    "apply_colormap_with_numpy": "_cv",
+    "blend_colormap": "_cv",
+    "cache_info": "_cmps",
+    "clear_cache": "_cmps",
+    "clear_mpl_cache": "_mpl",
+    "colorize_stream": "_stream",
+    "colormap_metrics": "_metrics",
+    "get_banded_lut": "_norm",
+    "get_colormaps": "_cmps",
+    "get_cv_colormaps": "_cv",
+    "get_mpl_colormaps": "_mpl",
+    "get_normalized_lut": "_norm",
+    "get_rgba_colormaps": "_cmps",
+    "invert_colormap": "_invert",
+    "load_indexed": "_indexed",
+    "mpl_cache_info": "_mpl",
+    "register_all_cmps2mpl": "_mpl",
+    "resample_all": "_cmps",
+    "resample_lut": "_cmps",
+    "save_indexed": "_indexed",
+    "set_async_executor": "_async",
+    "set_cache_size": "_cmps",
+    "set_mpl_cache_size": "_mpl",
+    "simulate_cvd": "_metrics",
+    "uint8_rgb_arr2mpl_cmp": "_mpl",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name from its submodule on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,198 @@
+"""Asyncio colorization utilities.
+
+This module provides an ``async`` counterpart of ``apply_colormap_with_numpy`` for use in
+asyncio services. The LUT gather runs on a shared thread pool instead of the event loop, and
+concurrent requests for the same colormap are batched, so that they build its gather table
+once and then run in parallel on that pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from colormap_tool._cmps import _get_bgr_lut, _resolve
+from colormap_tool._cv import apply_colormap_with_numpy
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import numpy as np
+
+__all__ = ["apply_colormap_async", "set_async_executor"]
+
+# Requests waiting for the next flush, keyed by (id(event loop), id(LUT)). Each key is only
+# touched from the thread running its event loop.
+_pending: dict[tuple[int, int], list[_Request]] = {}
+
+
+class _Request(NamedTuple):
+    src: np.ndarray
+    lut: np.ndarray
+    dst: np.ndarray | None
+    kwargs: dict[str, Any]
+    future: asyncio.Future
+
+
+class _ExecutorSlot:
+    """The executor of ``apply_colormap_async``, a default thread pool unless one is set."""
+
+    def __init__(self) -> None:
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+    def set(self, executor: Executor | None) -> None:
+        with self._lock:
+            self._executor = executor
+
+    def get(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                workers = os.cpu_count() or 1
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="colormap_tool-async")
+            return self._executor
+
+
+_executor = _ExecutorSlot()
+
+
+def set_async_executor(executor: Executor | None) -> None:
+    """Set the executor that runs the colormap jobs of ``apply_colormap_async``.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor or None
+        The executor to use, e.g. a ``ThreadPoolExecutor`` shared with other blocking work of
+        the service. It must not be the pool used by ``apply_colormap_with_numpy`` for
+        ``workers > 1``, since a job would then wait on tiles queued behind it. None restores
+        the default, a thread pool with one thread per CPU core created on first use.
+
+    """
+    _executor.set(executor)
+
+
+def _set_future(future: asyncio.Future, result: np.ndarray | None, error: BaseException | None) -> None:
+    """Complete a request future on its event loop, unless it was cancelled meanwhile."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _run(loop: asyncio.AbstractEventLoop, request: _Request) -> None:
+    """Colorize one request on an executor thread and hand the result back to the loop."""
+    if request.future.cancelled():
+        return
+    result = error = None
+    try:
+        result = apply_colormap_with_numpy(request.src, request.lut, dst=request.dst, **request.kwargs)
+    except Exception as err:
+        error = err
+    try:
+        loop.call_soon_threadsafe(_set_future, request.future, result, error)
+    except RuntimeError:  # the event loop was closed meanwhile
+        return
+
+
+def _run_batch(loop: asyncio.AbstractEventLoop, requests: list[_Request]) -> None:
+    """Colorize the first request of a batch, then dispatch the others to the executor.
+
+    The first request builds the gather table of the colormap, e.g. the composed table of
+    uint16 input, which the others then find in the LUT cache instead of each building it
+    at the same time. They run in parallel, one executor job each.
+    """
+    _run(loop, requests[0])
+    executor = _executor.get()
+    try:
+        for request in requests[1:]:
+            executor.submit(_run, loop, request)
+    except RuntimeError as err:  # e.g. the executor was shut down
+        for request in requests[1:]:
+            loop.call_soon_threadsafe(_set_future, request.future, None, err)
+
+
+def _flush(loop: asyncio.AbstractEventLoop, key: tuple[int, int]) -> None:
+    """Submit all requests queued for one colormap during the last event loop iteration."""
+    requests = [request for request in _pending.pop(key) if not request.future.cancelled()]
+    if not requests:
+        return
+    try:
+        _executor.get().submit(_run_batch, loop, requests)
+    except RuntimeError as err:  # e.g. the executor was shut down
+        for request in requests:
+            _set_future(request.future, None, err)
+
+
+async def apply_colormap_async(
+    src: np.ndarray,
+    cmp: str | np.ndarray,
+    dst: np.ndarray | None = None,
+    workers: int | None = 1,
+    vmin: float | None = None,
+    vmax: float | None = None,
+    n: int | None = None,
+    under: Sequence[int] | None = None,
+    over: Sequence[int] | None = None,
+    bad: Sequence[int] | None = None,
+) -> np.ndarray:
+    """Apply a colormap to an image without blocking the event loop.
+
+    The work is done by ``apply_colormap_with_numpy`` on a shared executor (see
+    ``set_async_executor``). Requests for the same colormap made during the same event loop
+    iteration are batched: the first one runs alone and builds the gather table, e.g. the
+    composed table of uint16 input with an explicit range, and the others then run in
+    parallel, reusing it from the LUT cache.
+
+    Cancelling the awaiting task drops a request that has not started yet. A request that is
+    already running finishes in the background, and its result is discarded.
+
+    Parameters
+    ----------
+    src : numpy.ndarray
+        The image to apply the colormap to, see ``apply_colormap_with_numpy``. May be a masked
+        array, whose masked elements get the bad color.
+    cmp : str or numpy.ndarray
+        A colormap name accepted by ``get_cv_colormaps`` (the output is then in BGR order, as
+        with OpenCV), or a (256, 1, 3) uint8 LUT.
+    dst : numpy.ndarray, optional
+        The output array to store the result. It must not be used until the call returns.
+    workers, vmin, vmax, n, under, over, bad : optional
+        Passed to ``apply_colormap_with_numpy``.
+
+    Returns
+    -------
+    numpy.ndarray
+        The output array with the colormap applied.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not found, or the input is rejected by ``apply_colormap_with_numpy``.
+
+    Examples
+    --------
+    >>> async def preview(request):
+    ...     frame = await load_frame(request)
+    ...     color = await apply_colormap_async(frame, "mpl.inferno", vmin=20.0, vmax=80.0)
+    ...     return encode_jpeg(color)
+
+    """
+    lut = _get_bgr_lut(*_resolve(cmp)) if isinstance(cmp, str) else cmp
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    key = (id(loop), id(lut))
+    batch = _pending.get(key)
+    if batch is None:
+        batch = _pending[key] = []
+        loop.call_soon(_flush, loop, key)
+    kwargs = {"workers": workers, "vmin": vmin, "vmax": vmax, "n": n, "under": under, "over": over, "bad": bad}
+    batch.append(_Request(src, lut, dst, kwargs, future))
+
+    result: np.ndarray = await future
+    return result
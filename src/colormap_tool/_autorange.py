@@ -0,0 +1,144 @@
+"""Automatic value ranges for video.
+
+This module estimates the display range of a stream of frames from low and high percentiles,
+e.g. to auto-contrast thermal video. Percentiles are read from a histogram of a strided
+subsample of each frame, instead of sorting the whole frame as ``np.percentile`` does, and are
+smoothed over time so that the colors do not flicker from frame to frame.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from colormap_tool._cv import _FLOAT_DTYPES, _INT_DTYPES, _split_masked
+
+__all__ = ["AutoRange"]
+
+# Default number of elements of each frame that the percentiles are estimated from.
+_DEFAULT_SAMPLES = 1 << 16
+
+
+class AutoRange:
+    """Estimate a smoothed (vmin, vmax) display range from percentiles of each frame.
+
+    Each call to ``update`` samples about ``samples`` elements of the frame with a fixed
+    stride. uint8 and uint16 samples are counted with ``np.bincount`` and the percentiles
+    are read from the cumulative histogram; float samples are partitioned, skipping NaN
+    values. The new range is blended into the previous one with an exponential moving
+    average, ``range += alpha * (new - range)``.
+
+    The range can be passed as vmin and vmax to any colorization function, or the instance
+    itself to ``colorize_stream``.
+
+    Parameters
+    ----------
+    low, high : float, optional
+        The percentiles, in [0, 100], mapped to vmin and vmax. Default is 1 and 99.
+    alpha : float, optional
+        The weight of the newest frame, in (0, 1]. 1 disables smoothing. Default is 0.2.
+    samples : int, optional
+        The approximate number of elements sampled per frame. None uses every element,
+        which is exact but several times slower at high resolutions. Default is 65536.
+
+    Raises
+    ------
+    ValueError
+        If one of the parameters is invalid.
+
+    Examples
+    --------
+    >>> autorange = AutoRange(low=2, high=98, alpha=0.1)
+    >>> for frame in frames:
+    ...     vmin, vmax = autorange.update(frame)
+    ...     apply_colormap_with_numpy(frame, lut, dst=frame_buf, vmin=vmin, vmax=vmax)
+
+    """
+
+    def __init__(
+        self,
+        low: float = 1.0,
+        high: float = 99.0,
+        *,
+        alpha: float = 0.2,
+        samples: int | None = _DEFAULT_SAMPLES,
+    ) -> None:
+        if not 0 <= low <= high <= 100:
+            raise ValueError(f"The percentiles must satisfy 0 <= low <= high <= 100, got {low} and {high}.")
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}.")
+        if samples is not None and samples < 1:
+            raise ValueError(f"The number of samples must be at least 1, got {samples}.")
+        self.low = low
+        self.high = high
+        self.alpha = alpha
+        self.samples = samples
+        self._range: tuple[float, float] | None = None
+
+    def reset(self) -> None:
+        """Forget the smoothed range, so the next frame sets it directly."""
+        self._range = None
+
+    @property
+    def range(self) -> tuple[float, float] | None:
+        """The current (vmin, vmax), or None before the first frame."""
+        return self._range
+
+    def _sample(self, frame: np.ndarray) -> np.ndarray:
+        """Return a flat strided subsample of the unmasked, non-NaN elements of a frame."""
+        data, mask = _split_masked(frame)
+        if data.dtype not in _INT_DTYPES + _FLOAT_DTYPES:
+            raise ValueError(f"The dtype of the input array {data.dtype} is not uint8, uint16, float32 or float64.")
+        step = 1 if self.samples is None else max(data.size // self.samples, 1)
+        if step > 1:
+            # An odd stride does not land on the same column of every row of even-width frames.
+            step |= 1
+        sample = data.reshape(-1)[::step]
+        if mask is not None:
+            sample = sample[~mask.reshape(-1)[::step]]
+        if sample.dtype in _FLOAT_DTYPES:
+            sample = sample[~np.isnan(sample)]
+        return sample
+
+    def _percentiles(self, sample: np.ndarray) -> tuple[float, float]:
+        """Return the low and high percentiles of a non-empty sample, as ``np.percentile(method="lower")``."""
+        ranks = np.floor(np.array([self.low, self.high]) / 100 * (sample.size - 1)).astype(np.intp)
+        if sample.dtype in _INT_DTYPES:
+            cdf = np.cumsum(np.bincount(sample, minlength=np.iinfo(sample.dtype).max + 1))
+            lo, hi = np.searchsorted(cdf, ranks, side="right")
+        else:
+            lo, hi = np.partition(sample, ranks)[ranks]
+        return float(lo), float(hi)
+
+    def update(self, frame: np.ndarray) -> tuple[float, float]:
+        """Add a frame and return the smoothed (vmin, vmax).
+
+        Parameters
+        ----------
+        frame : numpy.ndarray
+            The frame, with dtype uint8, uint16, float32 or float64. May be a masked array,
+            whose masked elements are ignored, as are NaN values.
+
+        Returns
+        -------
+        tuple of float
+            The smoothed range. A frame without any valid sample leaves it unchanged.
+
+        Raises
+        ------
+        ValueError
+            If the dtype is invalid, or the first frame has no valid sample.
+
+        """
+        sample = self._sample(frame)
+        if sample.size == 0:
+            if self._range is None:
+                raise ValueError("The frame has no valid values to estimate a range from.")
+            return self._range
+
+        lo, hi = self._percentiles(sample)
+        if self._range is not None:
+            vmin, vmax = self._range
+            lo = vmin + self.alpha * (lo - vmin)
+            hi = vmax + self.alpha * (hi - vmax)
+        self._range = (lo, hi)
+        return self._range
@@ -1,27 +1,150 @@
 """Colormap storage and loading module.
 
-This module loads colormap data from pickle files stored in the resources directory.
-Each colormap is stored as a numpy array with shape (256, 1, 3) and dtype uint8.
-The module provides access to colormaps from different sources (matplotlib, OpenCV).
-
-The colormaps are loaded at import time and stored in dictionaries for easy access.
+This module provides access to colormap data stored in the resources directory.
+Each namespace (matplotlib, OpenCV) is stored as one packed ``.npy`` block of shape
+(N, 256, 3) and dtype uint8, together with a JSON index of the colormap names.
+
+Only the small name index is read at import time. The packed block of a namespace is
+memory-mapped read-only the first time one of its colormaps is accessed, and each
+colormap is exposed as a (256, 1, 3) view into that block. Processes that map the same
+resource file therefore share the same physical pages.
 """
 
 from __future__ import annotations
 
+import functools
 import importlib.resources
-import pickle
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import ItemsView, ValuesView
+from typing import TYPE_CHECKING, Any, Callable, Literal, NamedTuple
 
 import numpy as np
 
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
 RESOURCES_DIR = importlib.resources.files("colormap_tool").joinpath("resources")
 
-with (RESOURCES_DIR / "mpl_colormaps.pickle").open("rb") as f:
-    MPL_COLORMAPS: dict[str, np.ndarray] = pickle.load(f)
+with (RESOURCES_DIR / "colormaps.json").open("r", encoding="utf-8") as f:
+    _INDEX: dict[str, list[str]] = json.load(f)
+
+
+def _load_block(namespace: str) -> np.ndarray:
+    """Load the packed (N, 256, 3) colormap block of a namespace.
+
+    The block is memory-mapped read-only when the resource is a regular file. Otherwise
+    (e.g. the package is imported from a zip archive) it is read into memory once.
+    """
+    resource = RESOURCES_DIR / f"{namespace}_colormaps.npy"
+    block: np.ndarray
+    if isinstance(resource, os.PathLike):
+        block = np.load(resource, mmap_mode="r")
+        return block
+    with resource.open("rb") as f:
+        block = np.load(f)
+    block.flags.writeable = False
+    return block
+
+
+class _LazyColormapDict(dict):
+    """A dict of colormap name to (256, 1, 3) uint8 LUT, materialized on first access.
+
+    The keys are known up front from the name index. A value is ``None`` until it is
+    first requested, at which point the packed block of the namespace is mapped and the
+    value is replaced by a read-only view into it. Colormaps added by the user are
+    stored as regular dict entries. Every method that returns values, including the
+    ``values()`` and ``items()`` views, materializes them first.
+    """
+
+    def __init__(self, namespace: str, names: list[str]) -> None:
+        super().__init__(dict.fromkeys(names))
+        self._namespace = namespace
+        self._positions = {name: i for i, name in enumerate(names)}
+        self._block: np.ndarray | None = None
+
+    def _materialize(self, key: str) -> np.ndarray:
+        if self._block is None:
+            self._block = _load_block(self._namespace)
+        lut: np.ndarray = np.asarray(self._block[self._positions[key]]).reshape(256, 1, 3)
+        super().__setitem__(key, lut)
+        return lut
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        value: np.ndarray | None = super().__getitem__(key)
+        if value is None:
+            value = self._materialize(key)
+        return value
+
+    def __iter__(self) -> Any:
+        # Overriding __iter__ makes dict(self) and {**self} go through __getitem__.
+        return iter(self.keys())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key: str, *args: Any) -> Any:
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return super().pop(key, *args)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return super().setdefault(key, default)
+
+    def popitem(self) -> tuple[str, np.ndarray]:
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(self.keys()))
+        return key, self.pop(key)
+
+    def values(self) -> Any:
+        return ValuesView(self)
+
+    def items(self) -> Any:
+        return ItemsView(self)
+
+    def copy(self) -> dict[str, np.ndarray]:
+        return dict(self.items())
+
+    __hash__ = None  # unhashable, like dict
+
+    def __eq__(self, other: object) -> bool:
+        return self.copy() == other
+
+    def __ne__(self, other: object) -> bool:
+        return self.copy() != other
+
+    def __or__(self, other: Any) -> Any:
+        if not isinstance(other, dict):
+            return NotImplemented
+        merged = self.copy()
+        merged.update(other)
+        return merged
 
+    def __ror__(self, other: Any) -> Any:
+        if not isinstance(other, dict):
+            return NotImplemented
+        merged = dict(other)
+        merged.update(self.items())
+        return merged
 
-with (RESOURCES_DIR / "cv_colormaps.pickle").open("rb") as f:
-    CV_COLORMAPS: dict[str, np.ndarray] = pickle.load(f)
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} namespace={self._namespace!r} with {len(self)} colormaps>"
+
+
+MPL_COLORMAPS: dict[str, np.ndarray] = _LazyColormapDict("mpl", _INDEX["mpl"])
+
+CV_COLORMAPS: dict[str, np.ndarray] = _LazyColormapDict("cv", _INDEX["cv"])
 
 
 CMPSPACE = {
@@ -29,18 +152,374 @@ CMPSPACE = {
     "mpl": MPL_COLORMAPS,
 }
 
+# Accepted spellings of each namespace, lower case.
+_NAMESPACE_ALIASES = {
+    "cv": "cv",
+    "cv2": "cv",
+    "opencv": "cv",
+    "mpl": "mpl",
+    "matplotlib": "mpl",
+}
+
+# Suffix of reversed colormaps, following the matplotlib convention.
+_REVERSED_SUFFIX = "_r"
+
+# Resolved (namespace, name) handles, keyed by the exact strings callers pass in. Each spelling
+# is resolved once; after that a lookup is a single dict hit that allocates nothing. A memo is
+# emptied when it reaches _RESOLVED_MAXSIZE spellings, and by clear_cache.
+_RESOLVED: dict[str, tuple[str, str]] = {}
+_RESOLVED_BY_NAMESPACE: dict[str, dict[str, tuple[str, str]]] = {}
+_RESOLVED_MAXSIZE = 1024
+
+
+def _find_name(namespace: str, name: str) -> str | None:
+    """Return the canonical name of a colormap in a namespace, or None if it does not exist.
+
+    Names are matched case-insensitively. A name ending in ``_r`` that is not stored in the
+    namespace refers to the reversed version of the colormap without the suffix.
+    """
+    colormaps = CMPSPACE[namespace]
+    if name in colormaps:
+        return name
+
+    lowered = name.lower()
+    by_lower = {key.lower(): key for key in colormaps}
+    if lowered in by_lower:
+        return by_lower[lowered]
+
+    if lowered.endswith(_REVERSED_SUFFIX):
+        base = _find_name(namespace, name[: -len(_REVERSED_SUFFIX)])
+        if base is not None and not base.endswith(_REVERSED_SUFFIX):
+            return base + _REVERSED_SUFFIX
+    return None
+
+
+def _resolve_namespace(namespace: str) -> str:
+    """Return the canonical namespace of any accepted spelling, e.g. "cv" for "OpenCV".
+
+    Raises
+    ------
+    ValueError
+        If the namespace is not recognized.
+
+    """
+    canonical = _NAMESPACE_ALIASES.get(namespace.lower())
+    if canonical is None:
+        raise ValueError(f"Namespace {namespace.lower()} is not recognized.")
+    return canonical
+
 
-def resample_lut(lut: np.ndarray, n: int) -> np.ndarray:
+def _memoize(memo: dict[str, tuple[str, str]], key: str, handle: tuple[str, str]) -> None:
+    """Store a resolved handle, emptying the memo first if it is full."""
+    if len(memo) >= _RESOLVED_MAXSIZE:
+        memo.clear()
+    memo[key] = handle
+
+
+def _resolve(name: str, namespace: str | None = None) -> tuple[str, str]:
+    """Resolve a user-facing colormap name to its canonical, interned (namespace, name) handle.
+
+    This is the name lookup shared by ``get_colormaps``, ``get_cv_colormaps`` and
+    ``get_mpl_colormaps``. Namespace aliases (e.g. "opencv.jet"), any letter case and ``_r``
+    reversed variants are accepted. Handles are memoized per spelling until ``clear_cache``
+    is called, which is required after removing a colormap from ``CMPSPACE``.
+
+    Raises
+    ------
+    ValueError
+        If the name is malformed, or the namespace or colormap is not found.
+
+    """
+    if namespace is None:
+        handle = _RESOLVED.get(name)
+    else:
+        resolved = _RESOLVED_BY_NAMESPACE.get(namespace)
+        handle = resolved.get(name) if resolved is not None else None
+    if handle is not None:
+        return handle
+
+    if namespace is not None:
+        if "." in name:
+            raise ValueError(f"Namespace {namespace} is provided, so name {name} should not include a dot.")
+        namespace_part, name_part = namespace, name
+    else:
+        namespace_part, dot, name_part = name.partition(".")
+        if not dot:
+            raise ValueError(f"Colormap {name} should be in the 'namespace.name' format when no namespace is provided.")
+
+    canonical_namespace = _resolve_namespace(namespace_part)
+    canonical_name = _find_name(canonical_namespace, name_part)
+    if canonical_name is None:
+        raise ValueError(f"Colormap {name_part} is not found in namespace {canonical_namespace}.")
+
+    handle = (sys.intern(canonical_namespace), sys.intern(canonical_name))
+    if namespace is None:
+        _memoize(_RESOLVED, name, handle)
+    else:
+        resolved = _RESOLVED_BY_NAMESPACE.get(namespace)
+        if resolved is None:
+            if len(_RESOLVED_BY_NAMESPACE) >= _RESOLVED_MAXSIZE:
+                _RESOLVED_BY_NAMESPACE.clear()
+            resolved = _RESOLVED_BY_NAMESPACE[namespace] = {}
+        _memoize(resolved, name, handle)
+    return handle
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a colormap cache, in the style of ``functools.lru_cache``."""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class _LRUCache:
+    """A thread-safe, bounded least-recently-used cache.
+
+    Values are built outside the lock, so two threads missing on the same key at the same
+    time may both build it; the last one wins. A maxsize of 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return self._data[key]
+            self._misses += 1
+
+        value = factory()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+        return value
+
+    def _evict(self) -> None:
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def resize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError(f"The cache size must be non-negative, got {maxsize}.")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def invalidate(self, predicate: Callable[[Any], bool]) -> int:
+        """Remove the entries whose key matches ``predicate``, keeping the statistics."""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+        return len(stale)
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self._maxsize, len(self._data))
+
+
+_LUT_CACHE = _LRUCache(maxsize=128)
+
+
+def cache_info() -> CacheInfo:
+    """Return hit, miss and eviction statistics of the LUT cache, see ``clear_cache``.
+
+    Returns
+    -------
+    CacheInfo
+        A named tuple ``(hits, misses, evictions, maxsize, currsize)``.
+
+    """
+    return _LUT_CACHE.info()
+
+
+def clear_cache() -> None:
+    """Remove all LUTs from the LUT cache and reset its statistics.
+
+    The LUT cache holds the resampled LUTs of ``get_colormaps``, the RGBA LUTs of
+    ``get_rgba_colormaps``, the normalized and banded LUTs, and the gather tables built from
+    them. Call this after replacing or removing a colormap in ``CMPSPACE``, so that stale
+    versions of it are not returned. It also forgets the memoized name lookups. The lookup
+    structures of ``invert_colormap`` are kept in a separate cache and are rebuilt
+    automatically for a replaced colormap.
+    """
+    _LUT_CACHE.clear()
+    _RESOLVED.clear()
+    _RESOLVED_BY_NAMESPACE.clear()
+
+
+def set_cache_size(maxsize: int) -> None:
+    """Set the maximum number of LUTs kept in the LUT cache, see ``clear_cache``.
+
+    Least recently used LUTs are evicted when the cache is full. 0 disables caching.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of cached LUTs. Default is 128.
+
+    Raises
+    ------
+    ValueError
+        If maxsize is negative.
+
+    """
+    _LUT_CACHE.resize(maxsize)
+
+
+def _get_lut(namespace: str, name: str, n: int | None = None) -> np.ndarray:
+    """Return the (m, 3) RGB LUT of a resolved colormap, resampled to n entries through the cache.
+
+    The returned array is read-only, since it is either a view of the packed colormap
+    block or shared by every caller requesting the same (namespace, name, n).
+    """
+    lut = _lookup(namespace, name).reshape(-1, 3)
+    if n is None or n == lut.shape[0]:
+        return lut
+
+    def resample() -> np.ndarray:
+        resampled = resample_lut(lut, n)
+        resampled.flags.writeable = False
+        return resampled
+
+    cached: np.ndarray = _LUT_CACHE.get_or_create((namespace, name, n), resample)
+    return cached
+
+
+# (kind, namespace, name) -> (source LUT, derived LUT). The source is kept to detect
+# colormaps that were replaced in CMPSPACE after their derived LUT was built.
+_DERIVED_LUTS: dict[tuple[str, str, str], tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _derived_lut(
+    kind: str,
+    namespace: str,
+    name: str,
+    source: np.ndarray,
+    build: Callable[[np.ndarray], np.ndarray],
+) -> np.ndarray:
+    """Return ``build(source)`` as a read-only array, built once per colormap and source LUT."""
+    cached = _DERIVED_LUTS.get((kind, namespace, name))
+    if cached is not None and cached[0] is source:
+        return cached[1]
+
+    derived = build(source)
+    derived.flags.writeable = False
+    _DERIVED_LUTS[kind, namespace, name] = (source, derived)
+    return derived
+
+
+def _lookup(namespace: str, name: str) -> np.ndarray:
+    """Return the (m, 1, 3) RGB LUT of a resolved colormap.
+
+    Reversed variants that are not stored in the namespace are built once from their base
+    colormap as C-contiguous, read-only LUTs.
+    """
+    colormaps = CMPSPACE[namespace]
+    if name in colormaps:
+        return colormaps[name]
+
+    base = colormaps[name[: -len(_REVERSED_SUFFIX)]]
+    return _derived_lut("reversed", namespace, name, base, lambda lut: np.ascontiguousarray(lut[::-1]))
+
+
+def _get_bgr_lut(namespace: str, name: str) -> np.ndarray:
+    """Return the C-contiguous, read-only (m, 1, 3) BGR LUT of a resolved colormap.
+
+    The BGR LUT is built once per colormap on first use, so callers never get a
+    negative-stride view that OpenCV or numpy would have to copy on every call.
+    """
+    rgb = _lookup(namespace, name)
+    return _derived_lut(
+        "bgr",
+        namespace,
+        name,
+        rgb,
+        lambda lut: np.ascontiguousarray(lut.reshape(-1, 1, 3)[:, :, ::-1]),
+    )
+
+
+# Channel counts of RGB and RGBA LUTs.
+_LUT_CHANNELS = (3, 4)
+
+# Number of float64 elements resampled per block in _resample_stack.
+_RESAMPLE_BLOCK_SIZE = 1 << 15
+
+
+@functools.lru_cache(maxsize=32)
+def _interp_weights(m: int, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the lower sample indices and weights for linearly resampling m points to n points.
+
+    Element i of the result is ``lut[idx[i]] + (lut[idx[i] + 1] - lut[idx[i]]) * weights[i]``,
+    which is what ``np.interp`` computes for each channel. The indices are cached per (m, n),
+    so resampling many LUTs to the same length computes them only once.
+    """
+    x_old = np.linspace(0, 1, m)
+    x_new = np.linspace(0, 1, n)
+    idx = np.clip(np.searchsorted(x_old, x_new, side="right") - 1, 0, m - 2)
+    weights = (x_new - x_old[idx]) / (x_old[idx + 1] - x_old[idx])
+    if n > 1:
+        # The last point lies exactly on the last sample. A single point is the first sample.
+        weights[-1] = 1.0
+    return idx, weights[:, None]
+
+
+def _resample_stack(luts: np.ndarray, n: int) -> np.ndarray:
+    """Resample a (k, m, c) stack of LUTs to (k, n, c) uint8 in one vectorized pass.
+
+    The float64 temporaries are computed for a few LUTs at a time so that they stay in cache.
+    """
+    k, m, c = luts.shape
+    if m == 1:
+        return np.repeat(luts, n, axis=1).astype(np.uint8)
+
+    idx, weights = _interp_weights(m, n)
+    values = luts.astype(np.float64)
+    steps = np.diff(values, axis=1)
+    out = np.empty((k, n, c), dtype=np.uint8)
+    block = max(1, _RESAMPLE_BLOCK_SIZE // max(n * c, 1))
+    for start in range(0, k, block):
+        stop = start + block
+        resampled = np.take(steps[start:stop], idx, axis=1)
+        resampled *= weights
+        resampled += np.take(values[start:stop], idx, axis=1)
+        # Round through float32 and truncate, matching the historical per-channel np.interp implementation.
+        out[start:stop] = resampled.astype(np.float32)
+    return out
+
+
+def resample_lut(lut: np.ndarray, n: int, *, stack: bool = False) -> np.ndarray:
     """Resample a LUT to a new length.
 
-    Accepts (m, 3) or (m, 1, 3) uint8 arrays. Returns the same format with length n.
+    Accepts (m, c) or (m, 1, c) uint8 arrays with c = 3 (RGB) or 4 (RGBA) channels. Returns
+    the same format with length n. All channels are interpolated linearly in a single
+    vectorized pass. With ``stack=True``, a (k, m, c) stack of LUTs is resampled at once to (k, n, c).
 
     Parameters
     ----------
     lut : np.ndarray
-        Input LUT, shape (m, 3) or (m, 1, 3), dtype uint8.
+        Input LUT, shape (m, c) or (m, 1, c), dtype uint8. Shape (k, m, c) if ``stack`` is True.
     n : int
-        Target length.
+        Target length. 1 returns the first color, and 0 an empty LUT.
+    stack : bool, optional
+        Whether ``lut`` is a stack of k LUTs. Default is False.
 
     Returns
     -------
@@ -50,41 +529,90 @@ def resample_lut(lut: np.ndarray, n: int) -> np.ndarray:
     Raises
     ------
     TypeError, ValueError
-        If input is not a valid LUT.
+        If input is not a valid LUT, or n is negative.
 
     Examples
     --------
     >>> lut = np.array([[0, 0, 0], [255, 255, 255]], dtype=np.uint8)
     >>> resample_lut(lut, 5).shape
     (5, 3)
+    >>> resample_lut(np.stack([lut, lut[::-1]]), 5, stack=True).shape
+    (2, 5, 3)
 
     """
-    msg = "The shape of the lut must be (n, 3) or (n, 1, 3)."
+    if n < 0:
+        raise ValueError(f"The target length must be non-negative, got {n}.")
+    if stack:
+        if lut.ndim != 3 or lut.shape[2] not in _LUT_CHANNELS:
+            raise ValueError("The shape of the lut stack must be (k, n, 3) or (k, n, 4).")
+        return lut.copy() if lut.shape[1] == n else _resample_stack(lut, n)
+
+    msg = "The shape of the lut must be (n, c) or (n, 1, c) with c = 3 or 4."
+    channels = lut.shape[-1]
 
     if lut.ndim == 2:
-        if lut.shape[1] != 3:
+        if channels not in _LUT_CHANNELS:
             raise ValueError(msg)
         lut2d = lut
-        out_shape = (n, 3)
+        out_shape: tuple[int, ...] = (n, channels)
     elif lut.ndim == 3:
-        if lut.shape[1] != 1 or lut.shape[2] != 3:
+        if lut.shape[1] != 1 or channels not in _LUT_CHANNELS:
             raise ValueError(msg)
-        lut2d = lut.reshape(-1, 3)
-        out_shape = (n, 1, 3)
+        lut2d = lut.reshape(-1, channels)
+        out_shape = (n, 1, channels)
     else:
         raise ValueError(msg)
 
-    m = lut2d.shape[0]
-    if n == m:
-        return lut.copy() if lut.shape[0] == n else lut2d.reshape(out_shape)
+    if n == lut2d.shape[0]:
+        return lut.copy()
 
-    x_old = np.linspace(0, 1, m)
-    x_new = np.linspace(0, 1, n)
-    resampled = np.empty((n, 3), dtype=np.float32)
-    for c in range(3):
-        resampled[:, c] = np.interp(x_new, x_old, lut2d[:, c])
-    resampled = np.clip(resampled, 0, 255).astype(np.uint8)
-    return resampled.reshape(out_shape)
+    return _resample_stack(lut2d[np.newaxis], n).reshape(out_shape)
+
+
+def resample_all(namespace: str, n: int) -> dict[str, np.ndarray]:
+    """Resample every colormap of a namespace to a new length at once.
+
+    The colormaps are stacked and resampled in one vectorized pass, which is much faster
+    than resampling them one by one.
+
+    Parameters
+    ----------
+    namespace : str
+        "cv" (or "cv2", "opencv") for OpenCV, "mpl" (or "matplotlib") for Matplotlib.
+    n : int
+        Target length.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Colormap name to read-only (n, 3) uint8 RGB LUT.
+
+    Raises
+    ------
+    ValueError
+        If the namespace is not found.
+
+    Examples
+    --------
+    >>> luts = resample_all("mpl", 1024)
+    >>> luts["viridis"].shape
+    (1024, 3)
+
+    """
+    namespace = _resolve_namespace(namespace)
+
+    # Colormaps added by the user may have other lengths, so stack the colormaps by length.
+    by_length: dict[int, list[str]] = {}
+    for name, lut in CMPSPACE[namespace].items():
+        by_length.setdefault(lut.shape[0], []).append(name)
+
+    result: dict[str, np.ndarray] = {}
+    for names in by_length.values():
+        luts = np.stack([CMPSPACE[namespace][name].reshape(-1, 3) for name in names])
+        resampled = resample_lut(luts, n, stack=True)
+        resampled.flags.writeable = False
+        result.update(zip(names, resampled))
+    return {name: result[name] for name in CMPSPACE[namespace]}
 
 
 def get_colormaps(name: str, namespace: str | None = None, n: int | None = None) -> np.ndarray:
@@ -93,19 +621,24 @@ def get_colormaps(name: str, namespace: str | None = None, n: int | None = None)
     Returns a (n, 3) uint8 array in RGB order, resampled to length n if specified.
     Useful for custom visualization, further conversion, or as a base for other formats.
 
+    The returned array is read-only. Resampled LUTs are kept in a bounded LRU cache keyed by
+    (namespace, name, n), so repeated requests do not resample again; see ``cache_info``,
+    ``clear_cache`` and ``set_cache_size``. Copy the array before modifying it.
+
     Parameters
     ----------
     name : str
-        Colormap name. If namespace is None, use "namespace.name" format.
+        Colormap name. If namespace is None, use "namespace.name" format. Names are
+        case-insensitive, and a ``_r`` suffix selects the reversed colormap.
     namespace : str, optional
-        "cv" for OpenCV, "mpl" for Matplotlib.
+        "cv" (or "cv2", "opencv") for OpenCV, "mpl" (or "matplotlib") for Matplotlib.
     n : int, optional
         Number of LUT entries. If None, defaults to 256.
 
     Returns
     -------
     np.ndarray
-        (n, 3) uint8 RGB LUT.
+        (n, 3) uint8 RGB LUT, read-only.
 
     Raises
     ------
@@ -118,27 +651,89 @@ def get_colormaps(name: str, namespace: str | None = None, n: int | None = None)
     >>> plt.imshow(data, cmap=colormap_tools.uint8_rgb_arr2mpl_cmp(lut))
 
     """
-    if namespace is not None:
-        if "." in name:
-            raise ValueError(f"Namespace {namespace} is provided, so name {name} should not include a dot.")
-    else:
-        namespace, name = name.split(".")
+    namespace, name = _resolve(name, namespace)
+    return _get_lut(namespace, name, n)
+
+
+def _premultiply(rgba: np.ndarray) -> np.ndarray:
+    """Return a (..., 4) uint8 RGBA array with its color channels multiplied by alpha, rounded."""
+    out = rgba.copy()
+    out[..., :3] = (rgba[..., :3] * rgba[..., 3:].astype(np.uint16) + 127) // 255
+    return out
+
+
+def _build_rgba(rgb: np.ndarray, alpha: float | np.ndarray, premultiplied: bool, order: str) -> np.ndarray:
+    """Build a read-only (m, 1, 4) uint8 LUT from an (m, 3) RGB LUT and an alpha value or ramp."""
+    m = rgb.shape[0]
+    alpha = np.asarray(alpha, dtype=np.float64)
+    if alpha.ndim not in (0, 1) or (alpha.ndim == 1 and alpha.shape[0] != m):
+        raise ValueError(f"alpha must be a scalar or have shape ({m},), got shape {alpha.shape}.")
+    if np.any((alpha < 0) | (alpha > 1)):
+        raise ValueError("alpha must be in the range [0, 1].")
+
+    rgba = np.empty((m, 4), dtype=np.uint8)
+    rgba[:, :3] = rgb[:, ::-1] if order == "bgra" else rgb
+    rgba[:, 3] = np.rint(alpha * 255)
+    if premultiplied:
+        rgba = _premultiply(rgba)
+    lut = rgba.reshape(m, 1, 4)
+    lut.flags.writeable = False
+    return lut
 
-    namespace = namespace.lower()
-    name = name.lower()
-    if namespace not in CMPSPACE:
-        raise ValueError(f"Namespace {namespace} is not recognized.")
-    if name not in CMPSPACE[namespace]:
-        raise ValueError(f"Colormap {name} is not found in namespace {namespace}.")
 
-    # Get the original LUT
-    lut = CMPSPACE[namespace][name]
+def get_rgba_colormaps(
+    name: str,
+    namespace: str | None = None,
+    alpha: float | np.ndarray = 1.0,
+    premultiplied: bool = False,
+    order: Literal["rgba", "bgra"] = "rgba",
+) -> np.ndarray:
+    """Return a colormap as a 4-channel LUT with an alpha channel.
 
-    # Reshape to (256, 3)
-    lut = lut.reshape(-1, 3)
+    Use the result with ``blend_colormap`` to colorize data and composite it onto a
+    background frame in one pass, e.g. to overlay thermal data on visible-light video.
 
-    # Resample if requested
-    if n is not None and n != lut.shape[0]:
-        lut = resample_lut(lut, n)
+    LUTs with a scalar alpha are kept in the LUT cache, like resampled LUTs (see
+    ``cache_info``). The returned array is read-only.
 
-    return lut
+    Parameters
+    ----------
+    name : str
+        Colormap name. If namespace is None, use "namespace.name" format. Names are
+        case-insensitive, and a ``_r`` suffix selects the reversed colormap.
+    namespace : str, optional
+        "cv" (or "cv2", "opencv") for OpenCV, "mpl" (or "matplotlib") for Matplotlib.
+    alpha : float or numpy.ndarray, optional
+        The opacity in [0, 1], either one value for every entry or a ramp with one value per
+        entry, e.g. ``np.linspace(0, 1, 256)`` to fade in towards the high end. Default is 1.0.
+    premultiplied : bool, optional
+        Whether the color channels are multiplied by alpha. Default is False.
+    order : {"rgba", "bgra"}, optional
+        The channel order. Use "bgra" with OpenCV frames. Default is "rgba".
+
+    Returns
+    -------
+    np.ndarray
+        (256, 1, 4) uint8 LUT, read-only.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not found, or alpha or order is invalid.
+
+    Examples
+    --------
+    >>> lut = get_rgba_colormaps("mpl.inferno", alpha=np.linspace(0, 1, 256), order="bgra")
+    >>> blend_colormap(thermal, lut, visible_frame, vmin=20.0, vmax=40.0)
+
+    """
+    if order not in ("rgba", "bgra"):
+        raise ValueError(f"order must be 'rgba' or 'bgra', got {order!r}.")
+    namespace, name = _resolve(name, namespace)
+    rgb = _lookup(namespace, name).reshape(-1, 3)
+    if np.ndim(alpha) != 0:
+        return _build_rgba(rgb, alpha, premultiplied, order)
+
+    key = ("rgba", namespace, name, float(alpha), premultiplied, order)
+    cached: np.ndarray = _LUT_CACHE.get_or_create(key, lambda: _build_rgba(rgb, alpha, premultiplied, order))
+    return cached
@@ -7,13 +7,441 @@ from other sources (as numpy arrays).
 
 from __future__ import annotations
 
-from typing import Optional
+import atexit
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Literal, NamedTuple, Union
 
 import numpy as np
 
-from colormap_tool._cmps import CMPSPACE
+from colormap_tool._cmps import _LUT_CACHE, _get_bgr_lut, _premultiply, _resolve, resample_lut
 
-__all__ = ["get_cv_colormaps"]
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterator, Sequence
+
+    from numpy.typing import DTypeLike
+
+__all__ = [
+    "apply_colormap_batch",
+    "apply_colormap_packed",
+    "apply_colormap_with_numpy",
+    "blend_colormap",
+    "get_cv_colormaps",
+]
+
+# A gather target: a (P, 3) channel-last array, or a tuple of one flat (P,) plane per channel.
+_Target = Union[np.ndarray, tuple[np.ndarray, ...]]
+
+# Integer input dtypes are mapped through a LUT with one entry per possible value; float
+# input dtypes are scaled and quantized chunk by chunk.
+_INT_DTYPES = (np.uint8, np.uint16)
+_FLOAT_DTYPES = (np.float32, np.float64)
+
+# Output dtypes of apply_colormap_batch. Float outputs are scaled to [0, 1].
+_OUT_DTYPES = (np.uint8, np.float16, np.float32)
+
+# Default number of LUT entries that the colormap is resampled to for high-bit-depth input.
+_DEFAULT_N = 4096
+
+# Number of pixels gathered per np.take call. np.take converts uint8 indices to an intp array
+# internally, so chunking bounds that temporary to a small, cache-resident block instead of a
+# full frame. It is also the smallest amount of work worth dispatching to another thread.
+_CHUNK_SIZE = 1 << 16
+
+
+class _GatherPool:
+    """The thread pool of tiled LUT gathers, created on first use and shut down at exit."""
+
+    def __init__(self) -> None:
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                workers = os.cpu_count() or 1
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="colormap_tool")
+            return self._executor
+
+    def shutdown(self) -> None:
+        """Shut the pool down; the next gather creates a new one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+_pool = _GatherPool()
+atexit.register(_pool.shutdown)
+
+
+def _check_dst(dst: np.ndarray, shape: tuple[int, ...], dtype: DTypeLike = np.uint8) -> None:
+    """Validate a caller-provided output buffer."""
+    if dst.shape != shape:
+        raise ValueError(f"The shape of the output array {dst.shape} is not {shape}.")
+    if dst.dtype != dtype:
+        raise ValueError(f"The dtype of the output array {dst.dtype} is not {np.dtype(dtype)}.")
+    if not dst.flags.c_contiguous:
+        raise ValueError("The output array must be C-contiguous.")
+    if not dst.flags.writeable:
+        raise ValueError("The output array is read-only.")
+
+
+def _slice(dst: _Target, start: int, stop: int) -> _Target:
+    """Return rows ``start:stop`` of a gather target."""
+    if isinstance(dst, tuple):
+        return tuple(plane[start:stop] for plane in dst)
+    return dst[start:stop]
+
+
+def _take(lut: _Target, indices: np.ndarray, dst: _Target) -> None:
+    """Gather ``lut[indices]`` into ``dst``.
+
+    ``lut`` is either an (m, 3) table gathered into a (P, 3) ``dst``, or a tuple of (m,) channel
+    tables gathered into a tuple of flat planes, which writes channel-first output directly.
+    ``mode="clip"`` avoids the internal output buffer that ``mode="raise"`` would allocate;
+    it never changes the result because the LUTs cover every index.
+    """
+    if isinstance(dst, tuple):
+        for channel, plane in zip(lut, dst):
+            np.take(channel, indices, out=plane, mode="clip")
+    else:
+        np.take(lut, indices, axis=0, out=dst, mode="clip")
+
+
+class _Extremes(NamedTuple):
+    """Colors for values below vmin, above vmax and bad (NaN or masked) values.
+
+    ``colors`` holds the three colors as a (3, c) array that is appended to the gather table,
+    and the flags tell which of them were set, so that unset ones cost nothing.
+    """
+
+    colors: np.ndarray
+    under: bool
+    over: bool
+    bad: bool
+
+
+class _Scaling(NamedTuple):
+    """How float input is mapped onto a table of ``size`` entries, see ``_iter_indices``."""
+
+    vmin: float
+    vmax: float
+    scale: float
+    size: int
+    extremes: _Extremes | None
+
+
+def _iter_indices(
+    src: np.ndarray,
+    scaling: _Scaling | None,
+    mask: np.ndarray | None = None,
+    bad_index: int = 0,
+) -> Iterator[tuple[int, int, np.ndarray]]:
+    """Yield ``(start, stop, indices)`` for each chunk of flat ``src``.
+
+    Integer input without scaling indexes the table directly. Float input is mapped to
+    ``rint(clip((src - vmin) * scale, 0, size - 1))`` in chunk-sized scratch buffers, so no
+    full-size intermediate array is allocated; NaN values map to entry 0. With extreme colors,
+    values below vmin, above vmax and NaN values are sent to the entries ``size``, ``size + 1``
+    and ``size + 2`` instead. Masked elements are sent to ``bad_index``.
+    """
+    if scaling is None and mask is None:
+        for start in range(0, src.shape[0], _CHUNK_SIZE):
+            stop = start + _CHUNK_SIZE
+            yield start, stop, src[start:stop]
+        return
+
+    size = min(src.shape[0], _CHUNK_SIZE)
+    indices = np.empty(size, dtype=np.intp)
+    scratch = 0 if scaling is None else size
+    values = np.empty(scratch, dtype=np.result_type(src.dtype, np.float32))
+    flags = np.empty(scratch, dtype=bool)
+    for start in range(0, src.shape[0], _CHUNK_SIZE):
+        chunk = src[start : start + _CHUNK_SIZE]
+        stop = start + chunk.shape[0]
+        i = indices[: chunk.shape[0]]
+        if scaling is None:
+            np.copyto(i, chunk)
+        else:
+            v = values[: chunk.shape[0]]
+            np.subtract(chunk, scaling.vmin, out=v)
+            np.multiply(v, scaling.scale, out=v)
+            # fmax and fmin clip like np.clip, and also replace NaN with 0.
+            np.fmax(v, 0, out=v)
+            np.fmin(v, scaling.size - 1, out=v)
+            np.rint(v, out=v)
+            np.copyto(i, v, casting="unsafe")
+            extremes = scaling.extremes
+            f = flags[: chunk.shape[0]]
+            if extremes is not None and extremes.under:
+                np.less(chunk, scaling.vmin, out=f)
+                np.copyto(i, scaling.size, where=f)
+            if extremes is not None and extremes.over:
+                np.greater(chunk, scaling.vmax, out=f)
+                np.copyto(i, scaling.size + 1, where=f)
+            if extremes is not None and extremes.bad:
+                np.isnan(chunk, out=f)
+                np.copyto(i, scaling.size + 2, where=f)
+        if mask is not None:
+            np.copyto(i, bad_index, where=mask[start:stop])
+        yield start, stop, i
+
+
+def _take_chunks(
+    lut: _Target,
+    scaling: _Scaling | None,
+    src: np.ndarray,
+    dst: _Target,
+    mask: np.ndarray | None,
+) -> None:
+    """Map flat ``src`` to indices and gather ``lut`` into ``dst``, one chunk at a time.
+
+    Masked elements get the last entry of ``lut``, the bad color.
+    """
+    bad_index = (lut[0] if isinstance(lut, tuple) else lut).shape[0] - 1
+    for start, stop, indices in _iter_indices(src, scaling, mask, bad_index):
+        _take(lut, indices, _slice(dst, start, stop))
+
+
+def _blend_chunks(
+    lut: np.ndarray,
+    scaling: _Scaling | None,
+    src: np.ndarray,
+    dst: np.ndarray,
+    mask: np.ndarray | None,
+) -> None:
+    """Gather a premultiplied (m, 4) RGBA ``lut`` and composite it over the (P, 3) ``dst`` in place.
+
+    Each pixel becomes ``color + round(dst * (255 - alpha) / 255)`` in 16-bit integer
+    arithmetic. The gathered colors only live in a chunk-sized scratch buffer, so no
+    full-size RGBA frame is allocated. Masked elements get the last entry of ``lut``.
+    """
+    size = min(src.shape[0], _CHUNK_SIZE)
+    colors = np.empty((size, 4), dtype=np.uint8)
+    weights = np.empty((size, 1), dtype=np.uint16)
+    blended = np.empty((size, 3), dtype=np.uint16)
+    carry = np.empty((size, 3), dtype=np.uint16)
+    for start, stop, indices in _iter_indices(src, scaling, mask, lut.shape[0] - 1):
+        k = indices.shape[0]
+        c, w, b, t = colors[:k], weights[:k], blended[:k], carry[:k]
+        np.take(lut, indices, axis=0, out=c, mode="clip")
+        np.subtract(255, c[:, 3:], out=w)
+        np.multiply(dst[start:stop], w, out=b)
+        # Exact round(b / 255) for 16-bit b.
+        b += 128
+        np.right_shift(b, 8, out=t)
+        b += t
+        b >>= 8
+        b += c[:, :3]
+        # Only exceeds 255 for "premultiplied" LUTs with colors above their alpha.
+        np.minimum(b, 255, out=b)
+        np.copyto(dst[start:stop], b, casting="unsafe")
+
+
+def _run_tiles(
+    take: Callable[[np.ndarray, _Target, np.ndarray | None], None],
+    src: np.ndarray,
+    dst: _Target,
+    workers: int,
+    mask: np.ndarray | None = None,
+) -> None:
+    """Run ``take(src_tile, dst_tile, mask_tile)`` over the C-contiguous ``dst``, splitting the input into row tiles.
+
+    ``dst`` is a channel-last array with one pixel per input element, or a tuple of flat
+    channel planes. ``mask`` is an optional boolean array of bad elements with the shape of
+    ``src``. ``np.take`` and the ufuncs used by the gathers release the GIL, so the tiles are
+    processed in parallel on the module-level thread pool.
+    """
+    flat_src = src.reshape(-1)
+    flat_dst = dst if isinstance(dst, tuple) else dst.reshape(src.size, -1)
+    flat_mask = None if mask is None else mask.reshape(-1)
+
+    n_tiles = min(workers, -(-src.size // _CHUNK_SIZE))
+    if n_tiles <= 1:
+        take(flat_src, flat_dst, flat_mask)
+        return
+
+    row = src.shape[-1] if src.ndim > 1 else 1
+    bounds = np.linspace(0, src.size // row, n_tiles + 1).astype(np.intp) * row
+    futures = [
+        _pool.get().submit(
+            take,
+            flat_src[start:stop],
+            _slice(flat_dst, start, stop),
+            None if flat_mask is None else flat_mask[start:stop],
+        )
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+    for future in futures:
+        future.result()
+
+
+def _value_range(
+    src: np.ndarray,
+    vmin: float | None,
+    vmax: float | None,
+    mask: np.ndarray | None = None,
+) -> tuple[float, float]:
+    """Return the (vmin, vmax) range of the input, computing missing bounds from the unmasked data.
+
+    If every value is masked or NaN, all of them get the bad color whatever the range, and a
+    missing bound is set to the other bound, or to 0.
+    """
+    if vmin is None or vmax is None:
+        valid = src if mask is None else src[~mask]
+        # fmin and fmax skip NaN values, and return NaN only if every value is NaN.
+        if vmin is None:
+            vmin = float(np.fmin.reduce(valid, axis=None)) if valid.size else np.nan
+        if vmax is None:
+            vmax = float(np.fmax.reduce(valid, axis=None)) if valid.size else np.nan
+        if np.isnan(vmin) or np.isnan(vmax):
+            vmin = vmax = next((bound for bound in (vmin, vmax) if not np.isnan(bound)), 0.0)
+    if vmin > vmax:
+        raise ValueError(f"vmin {vmin} must be less than or equal to vmax {vmax}.")
+    return vmin, vmax
+
+
+def _compose_table(
+    dtype: np.dtype,
+    lut: np.ndarray,
+    vmin: float,
+    vmax: float,
+    n: int,
+    extremes: _Extremes | None,
+) -> np.ndarray:
+    """Return a read-only table indexed by every raw value of an integer dtype.
+
+    The table composes the scaling of [vmin, vmax] with the colormap resampled to n entries,
+    followed by the under, over and bad colors of ``extremes``.
+    """
+    resampled = resample_lut(lut, n)
+    if extremes is not None:
+        resampled = np.concatenate([resampled, extremes.colors])
+    scale = (n - 1) / (vmax - vmin) if vmax > vmin else 0.0
+    values = np.arange(np.iinfo(dtype).max + 1, dtype=np.float64)
+    indices = np.rint(np.clip((values - vmin) * scale, 0, n - 1)).astype(np.intp)
+    if extremes is None:
+        table = resampled[indices]
+    else:
+        if extremes.under:
+            indices[values < vmin] = n
+        if extremes.over:
+            indices[values > vmax] = n + 1
+        table = np.concatenate([resampled[indices], extremes.colors])
+    table.flags.writeable = False
+    return table
+
+
+def _resampled_table(lut: np.ndarray, n: int, extremes: _Extremes | None) -> np.ndarray:
+    """Return a read-only copy of the colormap resampled to n entries, followed by ``extremes``."""
+    table = resample_lut(lut, n)
+    if extremes is not None:
+        table = np.concatenate([table, extremes.colors])
+    table.flags.writeable = False
+    return table
+
+
+def _gather_table(
+    src: np.ndarray,
+    lut: np.ndarray,
+    vmin: float | None,
+    vmax: float | None,
+    n: int | None,
+    extremes: _Extremes | None = None,
+    mask: np.ndarray | None = None,
+) -> tuple[np.ndarray, _Scaling | None, Hashable | None]:
+    """Return the table that the input values index, the scaling of float input, and a cache key.
+
+    uint8 input without a range indexes the colormap directly. Integer input indexes a table
+    that composes the scaling with the colormap resampled to n entries, while float input is
+    scaled chunk by chunk onto the resampled colormap. With ``extremes``, the under, over and
+    bad colors are appended to the table, so the bad color is always its last entry.
+
+    Composed tables for an explicit range and the resampled tables of float input are kept in
+    the shared LUT cache, keyed by the colormap bytes, since building one costs more than a
+    small frame. Composed tables for ranges computed from the data change from frame to frame
+    and are not cached. The key is the LUT
+    cache key of the table, under which tables derived from it may be cached too, or None if
+    the table was built for this call only.
+    """
+    if src.dtype == np.uint8 and vmin is None and vmax is None:
+        return lut if extremes is None else np.concatenate([lut, extremes.colors]), None, None
+
+    explicit = vmin is not None and vmax is not None
+    vmin, vmax = _value_range(src, vmin, vmax, mask)
+    n = _DEFAULT_N if n is None else n
+    if n < 1:
+        raise ValueError(f"The number of LUT entries must be at least 1, got {n}.")
+
+    extremes_key = None if extremes is None else (extremes.colors.tobytes(), *extremes[1:])
+    if src.dtype in _INT_DTYPES:
+        build = partial(_compose_table, src.dtype, lut, vmin, vmax, n, extremes)
+        if not explicit:
+            return build(), None, None
+        key: Hashable = ("composed", src.dtype.str, lut.shape, lut.tobytes(), vmin, vmax, n, extremes_key)
+        table: np.ndarray = _LUT_CACHE.get_or_create(key, build)
+        return table, None, key
+
+    key = ("resampled", lut.shape, lut.tobytes(), n, extremes_key)
+    table = _LUT_CACHE.get_or_create(key, partial(_resampled_table, lut, n, extremes))
+    scale = (n - 1) / (vmax - vmin) if vmax > vmin else 0.0
+    return table, _Scaling(vmin, vmax, scale, n, extremes), key
+
+
+def _check_input(src: np.ndarray, cmp: np.ndarray, workers: int | None, channels: int = 3) -> int:
+    """Validate the input and colormap of the numpy engine and return the number of workers."""
+    if src.dtype not in _INT_DTYPES + _FLOAT_DTYPES:
+        raise ValueError(f"The dtype of the input array {src.dtype} is not uint8, uint16, float32 or float64.")
+    if cmp.shape != (256, 1, channels):
+        raise ValueError(f"The shape of the colormap array {cmp.shape} is not (256, 1, {channels}).")
+    if cmp.dtype != np.uint8:
+        raise ValueError(f"The dtype of the colormap array {cmp.dtype} is not uint8.")
+    return _check_workers(workers)
+
+
+def _check_workers(workers: int | None) -> int:
+    """Return the number of gather threads, with None meaning one per CPU core."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"The number of workers must be at least 1, got {workers}.")
+    return workers
+
+
+def _split_masked(src: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+    """Return the data and the boolean mask of a masked array, or the array and None."""
+    if not isinstance(src, np.ma.MaskedArray):
+        return src, None
+    mask = np.ma.getmask(src)
+    if mask is np.ma.nomask:
+        return np.ma.getdata(src), None
+    return np.ma.getdata(src), np.asarray(mask)
+
+
+def _extreme_colors(
+    lut: np.ndarray,
+    under: Sequence[int] | None,
+    over: Sequence[int] | None,
+    bad: Sequence[int] | None,
+    masked: bool,
+) -> _Extremes | None:
+    """Return the under, over and bad colors for a gather, or None if none is needed.
+
+    Unset colors default to the first and last colormap entries, and to the first entry for
+    bad values, which is also where NaN values end up without a bad color.
+    """
+    if under is None and over is None and bad is None and not masked:
+        return None
+    colors = np.empty((3, lut.shape[1]), dtype=np.uint8)
+    for row, color, default in zip(colors, (under, over, bad), (lut[0], lut[-1], lut[0])):
+        value = default if color is None else np.asarray(color)
+        if value.shape != (lut.shape[1],) or np.any((value < 0) | (value > 255)):
+            raise ValueError(f"Colors must have {lut.shape[1]} values in the range [0, 255], got {color}.")
+        row[:] = value
+    return _Extremes(colors, under is not None, over is not None, bad is not None)
 
 
 def get_cv_colormaps(name: str, namespace: str | None = None) -> int | np.ndarray:
@@ -23,13 +451,16 @@ def get_cv_colormaps(name: str, namespace: str | None = None) -> int | np.ndarra
     ----------
     name : str
         Colormap name. If namespace is None, use "namespace.name" format (e.g., "cv.jet", "mpl.viridis").
+        Names are case-insensitive, and a ``_r`` suffix selects the reversed colormap.
     namespace : str, optional
-        "cv" for OpenCV, "mpl" for Matplotlib. If provided, name should not include a dot.
+        "cv" (or "cv2", "opencv") for OpenCV, "mpl" (or "matplotlib") for Matplotlib.
+        If provided, name should not include a dot.
 
     Returns
     -------
     int or np.ndarray
-        OpenCV colormap constant or a (256, 1, 3) uint8 LUT in BGR order.
+        OpenCV colormap constant or a (256, 1, 3) uint8 LUT in BGR order. The LUT is
+        C-contiguous and read-only; it is built once per colormap and shared by all callers.
 
     Raises
     ------
@@ -44,58 +475,402 @@ def get_cv_colormaps(name: str, namespace: str | None = None) -> int | np.ndarra
     >>> img_color2 = cv2.applyColorMap(gray_img, lut2)
 
     """
-    if namespace is not None:
-        if "." in name:
-            raise ValueError(f"Namespace {namespace} is provided, so name {name} should not include a dot.")
-    else:
-        namespace, name = name.split(".")
+    namespace, name = _resolve(name, namespace)
+    return _get_bgr_lut(namespace, name)
 
-    namespace = namespace.lower()
-    name = name.lower()
-    if namespace not in CMPSPACE:
-        raise ValueError(f"Namespace {namespace} is not recognized.")
-    if name not in CMPSPACE[namespace]:
-        raise ValueError(f"Colormap {name} is not found in namespace {namespace}.")
 
-    rgb_arr = CMPSPACE[namespace][name]
-    bgr_arr = rgb_arr[:, :, ::-1]
-    return bgr_arr
+def apply_colormap_with_numpy(
+    src: np.ndarray,
+    cmp: np.ndarray,
+    dst: np.ndarray | None = None,
+    workers: int | None = 1,
+    vmin: float | None = None,
+    vmax: float | None = None,
+    n: int | None = None,
+    under: Sequence[int] | None = None,
+    over: Sequence[int] | None = None,
+    bad: Sequence[int] | None = None,
+) -> np.ndarray:
+    """Apply a colormap to an image using numpy instead of OpenCV.
 
+    uint8 input indexes the colormap directly. uint16, float32 and float64 input is scaled
+    from [vmin, vmax] onto a copy of the colormap resampled to ``n`` entries. Scaling,
+    clipping, quantization and lookup are fused into one chunked pass: uint16 input goes
+    through a 65536-entry table, and float input through a chunk-sized scratch buffer, so
+    no full-size intermediate array is created.
 
-def apply_colormap_with_numpy(src: np.ndarray, cmp: np.ndarray, dst: np.ndarray | None = None) -> np.ndarray:
-    """Apply a colormap to an image using numpy instead of OpenCV.
+    Like matplotlib's ``set_under``, ``set_over`` and ``set_bad``, values below vmin, above
+    vmax, NaN values and masked elements can get their own colors. These colors are extra
+    entries of the lookup table, so they are handled in the same pass.
 
     Parameters
     ----------
     src : numpy.ndarray
-        The image to apply the colormap to.
+        The image to apply the colormap to, with dtype uint8, uint16, float32 or float64. May
+        be a masked array, whose masked elements get the bad color.
     cmp : numpy.ndarray
         The colormap to apply. Should have shape (256, 1, 3) and dtype uint8.
     dst : numpy.ndarray, optional
-        The output array to store the result. If None, a new array will be created.
+        The output array to store the result, with shape ``src.shape + (3,)``, dtype uint8 and
+        C-contiguous memory. The colormap is gathered directly into it, so reusing the same
+        buffer across frames avoids any per-frame allocation. If None, a new array will be created.
+    workers : int, optional
+        Number of threads used for the LUT gather. The input is split into row tiles that are
+        processed on a shared thread pool, which helps for large frames and (N, H, W) stacks.
+        None uses one thread per CPU core. Default is 1 (no threading).
+    vmin, vmax : float, optional
+        The data range mapped onto the colormap. Values outside it are clipped to the end colors.
+        A missing bound is taken from the minimum or maximum of ``src``. For uint8 input
+        without either bound, the colormap is indexed directly.
+    n : int, optional
+        Number of entries the colormap is resampled to with ``resample_lut`` when the input is
+        scaled. Default is 4096.
+    under, over : sequence of int, optional
+        Colors, in the channel order of ``cmp``, for values below vmin and above vmax. By
+        default, these values get the end colors of the colormap.
+    bad : sequence of int, optional
+        Color for NaN values and masked elements. Default is the first color of the colormap.
 
     Returns
     -------
     numpy.ndarray
-        The output array with the colormap applied.
+        The output array with the colormap applied. This is ``dst`` when it is provided.
+
+    Raises
+    ------
+    ValueError
+        If the input, colormap or output array has an invalid shape, dtype or memory layout.
+
+    Examples
+    --------
+    >>> lut = get_cv_colormaps("mpl.inferno")
+    >>> frame_buf = np.empty((480, 640, 3), dtype=np.uint8)
+    >>> for frame in frames:
+    ...     apply_colormap_with_numpy(frame, lut, dst=frame_buf)
+
+    >>> # Dead pixels masked, out-of-range temperatures in gray
+    >>> frame = np.ma.masked_array(frame, mask=dead_pixels)
+    >>> apply_colormap_with_numpy(frame, lut, vmin=20.0, vmax=40.0, under=(64, 64, 64), over=(192, 192, 192))
 
     """
+    src, mask = _split_masked(src)
+    workers = _check_input(src, cmp, workers)
+
     if dst is None:
-        dst = np.zeros_like(src)
+        dst = np.empty((*src.shape, 3), dtype=np.uint8)
     else:
-        if dst.shape != src.shape:
-            raise ValueError(
-                f"The shape of the output array {dst.shape} does not match the shape of the input array {src.shape}.",
-            )
-
-    if src.dtype != np.uint8:
-        raise ValueError(f"The dtype of the input array {src.dtype} is not uint8.")
-    if cmp.shape != (256, 1, 3):
-        raise ValueError(f"The shape of the colormap array {cmp.shape} is not (256, 1, 3).")
-    if cmp.dtype != np.uint8:
-        raise ValueError(f"The dtype of the colormap array {cmp.dtype} is not uint8.")
+        _check_dst(dst, (*src.shape, 3))
 
-    dst = cmp.copy().squeeze()
-    dst = dst[src]
+    if src.size == 0:
+        return dst
 
+    # A view for contiguous colormaps, so the LUT itself is never copied.
+    lut = cmp.reshape(256, 3)
+    extremes = _extreme_colors(lut, under, over, bad, mask is not None)
+    table, scaling, _ = _gather_table(src, lut, vmin, vmax, n, extremes, mask)
+    _run_tiles(partial(_take_chunks, table, scaling), src, dst, workers, mask)
     return dst
+
+
+def _pack_table(table: np.ndarray) -> np.ndarray:
+    """Return an (m, 3) or (m, 4) uint8 table as an (m, 1) uint32 table of 4-byte pixels.
+
+    3-channel colors get a fourth byte of 255. A C-contiguous (m, 4) table, such as a LUT from
+    ``get_rgba_colormaps``, is viewed without a copy.
+    """
+    if table.shape[1] == 3:
+        table = np.concatenate([table, np.full((table.shape[0], 1), 255, dtype=np.uint8)], axis=1)
+    packed: np.ndarray = np.ascontiguousarray(table).view(np.uint32)
+    return packed
+
+
+def _cached_packed_table(table: np.ndarray, key: Hashable | None) -> np.ndarray:
+    """Return ``_pack_table(table)``, kept in the LUT cache if the table is cached under ``key``.
+
+    Tables built for a single call, such as those of a range computed from the data, have no
+    key and are packed on every call, so they do not push the cached colormaps out.
+    """
+    if key is None:
+        return _pack_table(table)
+
+    def build() -> np.ndarray:
+        packed = np.array(_pack_table(table))
+        packed.flags.writeable = False
+        return packed
+
+    packed: np.ndarray = _LUT_CACHE.get_or_create(("packed", key), build)
+    return packed
+
+
+def _cached_premultiplied_table(table: np.ndarray, key: Hashable | None) -> np.ndarray:
+    """Return ``_premultiply(table)``, kept in the LUT cache if the table is cached under ``key``."""
+    if key is None:
+        return _premultiply(table)
+
+    def build() -> np.ndarray:
+        premultiplied = _premultiply(table)
+        premultiplied.flags.writeable = False
+        return premultiplied
+
+    premultiplied: np.ndarray = _LUT_CACHE.get_or_create(("premultiplied", key), build)
+    return premultiplied
+
+
+def apply_colormap_packed(
+    src: np.ndarray,
+    cmp: np.ndarray,
+    dst: np.ndarray | None = None,
+    workers: int | None = 1,
+    vmin: float | None = None,
+    vmax: float | None = None,
+    n: int | None = None,
+    under: Sequence[int] | None = None,
+    over: Sequence[int] | None = None,
+    bad: Sequence[int] | None = None,
+) -> np.ndarray:
+    """Apply a colormap to an image, producing 4-byte pixels (e.g. BGRA or RGBX).
+
+    Works like ``apply_colormap_with_numpy``, but each colormap entry is gathered as one
+    uint32 word instead of three separate bytes, which makes the gather about three times
+    faster. The result is a (..., 4) uint8 view of that uint32 buffer, the layout that most
+    display surfaces and video encoders take directly.
+
+    Parameters
+    ----------
+    src : numpy.ndarray
+        The image to apply the colormap to, see ``apply_colormap_with_numpy``.
+    cmp : numpy.ndarray
+        The colormap to apply, a (256, 1, 4) uint8 LUT from ``get_rgba_colormaps`` (e.g. with
+        ``order="bgra"``), or a (256, 1, 3) LUT from ``get_cv_colormaps``, whose colors get a
+        fourth byte of 255 (BGRX). The packed table is kept in the LUT cache.
+    dst : numpy.ndarray, optional
+        The output array to store the result, with shape ``src.shape + (4,)``, dtype uint8 and
+        C-contiguous memory. If None, a new array will be created.
+    workers, vmin, vmax, n : optional
+        See ``apply_colormap_with_numpy``.
+    under, over, bad : sequence of int, optional
+        Colors for values below vmin and above vmax, NaN values and masked elements, with as
+        many values as ``cmp`` has channels. See ``apply_colormap_with_numpy``.
+
+    Returns
+    -------
+    numpy.ndarray
+        The output array with the colormap applied. This is ``dst`` when it is provided.
+
+    Raises
+    ------
+    ValueError
+        If the input, colormap or output array has an invalid shape, dtype or memory layout.
+
+    Examples
+    --------
+    >>> lut = get_rgba_colormaps("mpl.inferno", order="bgra")
+    >>> frame_buf = np.empty((480, 640, 4), dtype=np.uint8)
+    >>> for frame in frames:
+    ...     surface.blit(apply_colormap_packed(frame, lut, dst=frame_buf, vmin=20.0, vmax=40.0))
+
+    """
+    src, mask = _split_masked(src)
+    channels = 4 if cmp.shape[-1:] == (4,) else 3
+    workers = _check_input(src, cmp, workers, channels=channels)
+
+    if dst is None:
+        dst = np.empty((*src.shape, 1), dtype=np.uint32).view(np.uint8)
+    else:
+        _check_dst(dst, (*src.shape, 4))
+
+    if src.size == 0:
+        return dst
+
+    lut = cmp.reshape(256, channels)
+    extremes = _extreme_colors(lut, under, over, bad, mask is not None)
+    table, scaling, key = _gather_table(src, lut, vmin, vmax, n, extremes, mask)
+    packed = _cached_packed_table(table, key)
+    _run_tiles(partial(_take_chunks, packed, scaling), src, dst.view(np.uint32), workers, mask)
+    return dst
+
+
+def apply_colormap_batch(
+    src: np.ndarray,
+    cmp: np.ndarray,
+    out: np.ndarray | None = None,
+    layout: Literal["NHWC", "NCHW"] = "NHWC",
+    dtype: DTypeLike = np.uint8,
+    workers: int | None = 1,
+    vmin: float | None = None,
+    vmax: float | None = None,
+    n: int | None = None,
+    under: Sequence[int] | None = None,
+    over: Sequence[int] | None = None,
+    bad: Sequence[int] | None = None,
+) -> np.ndarray:
+    """Apply a colormap to a stack of images in one call.
+
+    Works like ``apply_colormap_with_numpy`` on an (N, H, W) stack, with a selectable output
+    layout and dtype. The layout and the conversion to float are fused into the gather: the
+    colormap is converted to the output dtype once, and channel-first output is gathered
+    plane by plane from per-channel tables, so no full-size temporary or transposed copy is
+    created.
+
+    Parameters
+    ----------
+    src : numpy.ndarray
+        The (N, H, W) stack of images, with dtype uint8, uint16, float32 or float64. May be a
+        masked array, whose masked elements get the bad color.
+    cmp : numpy.ndarray
+        The colormap to apply. Should have shape (256, 1, 3) and dtype uint8.
+    out : numpy.ndarray, optional
+        The output array to store the result, with the shape given by ``layout``, the given
+        ``dtype`` and C-contiguous memory. If None, a new array will be created.
+    layout : {"NHWC", "NCHW"}, optional
+        "NHWC" returns an (N, H, W, 3) array, as ``apply_colormap_with_numpy``. "NCHW" returns
+        an (N, 3, H, W) array, as expected by most deep learning frameworks. Default is "NHWC".
+    dtype : numpy dtype, optional
+        The output dtype: uint8 (values in [0, 255]), float16 or float32 (values in [0, 1]).
+        Default is uint8.
+    workers : int, optional
+        Number of threads used for the LUT gather. None uses one thread per CPU core. Default is 1.
+    vmin, vmax : float, optional
+        The data range mapped onto the colormap, shared by the whole stack. A missing bound is
+        taken from the minimum or maximum of ``src``. For uint8 input without either bound,
+        the colormap is indexed directly.
+    n : int, optional
+        Number of entries the colormap is resampled to when the input is scaled. Default is 4096.
+    under, over, bad : sequence of int, optional
+        uint8 colors for values below vmin, above vmax, and NaN or masked values, see
+        ``apply_colormap_with_numpy``.
+
+    Returns
+    -------
+    numpy.ndarray
+        The colorized stack. This is ``out`` when it is provided.
+
+    Raises
+    ------
+    ValueError
+        If the input, colormap, layout, dtype or output array is invalid.
+
+    Examples
+    --------
+    >>> lut = get_cv_colormaps("mpl.inferno")
+    >>> batch = apply_colormap_batch(frames, lut, layout="NCHW", dtype=np.float32, vmin=20.0, vmax=40.0)
+    >>> batch.shape
+    (32, 3, 120, 160)
+
+    """
+    src, mask = _split_masked(src)
+    workers = _check_input(src, cmp, workers)
+    if src.ndim != 3:
+        raise ValueError(f"The shape of the input array {src.shape} is not (N, H, W).")
+    if layout not in ("NHWC", "NCHW"):
+        raise ValueError(f"layout must be 'NHWC' or 'NCHW', got {layout!r}.")
+    dtype = np.dtype(dtype)
+    if dtype not in _OUT_DTYPES:
+        raise ValueError(f"The output dtype {dtype} is not uint8, float16 or float32.")
+
+    batch, height, width = src.shape
+    shape = (batch, height, width, 3) if layout == "NHWC" else (batch, 3, height, width)
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    else:
+        _check_dst(out, shape, dtype)
+
+    if src.size == 0:
+        return out
+
+    lut = cmp.reshape(256, 3)
+    extremes = _extreme_colors(lut, under, over, bad, mask is not None)
+    table, scaling, _ = _gather_table(src, lut, vmin, vmax, n, extremes, mask)
+    if dtype != np.uint8:
+        table = (table * np.float32(1 / 255)).astype(dtype)
+    if layout == "NHWC":
+        gather_table: _Target = table
+    else:
+        gather_table = tuple(np.ascontiguousarray(table[:, channel]) for channel in range(3))
+
+    take = partial(_take_chunks, gather_table, scaling)
+
+    if layout == "NHWC":
+        _run_tiles(take, src, out, workers, mask)
+    else:
+        for index, (image, planes) in enumerate(zip(src, out)):
+            flat_planes = tuple(plane.reshape(-1) for plane in planes)
+            _run_tiles(take, image, flat_planes, workers, None if mask is None else mask[index])
+    return out
+
+
+def blend_colormap(
+    src: np.ndarray,
+    cmp: np.ndarray,
+    background: np.ndarray,
+    workers: int | None = 1,
+    vmin: float | None = None,
+    vmax: float | None = None,
+    n: int | None = None,
+    premultiplied: bool = False,
+    under: Sequence[int] | None = None,
+    over: Sequence[int] | None = None,
+    bad: Sequence[int] | None = None,
+) -> np.ndarray:
+    """Colorize an image with an RGBA colormap and alpha-blend it onto a background in place.
+
+    Colorization and compositing are fused into one chunked pass: each chunk of colors is
+    gathered into a small scratch buffer and blended straight into ``background``, so no
+    full-size RGBA frame is allocated. The input is scaled as in ``apply_colormap_with_numpy``.
+
+    Parameters
+    ----------
+    src : numpy.ndarray
+        The image to colorize, with dtype uint8, uint16, float32 or float64. May be a masked
+        array, whose masked elements get the bad color.
+    cmp : numpy.ndarray
+        The colormap, a (256, 1, 4) uint8 LUT from ``get_rgba_colormaps``. Its color order must
+        match the background, e.g. "bgra" for OpenCV frames.
+    background : numpy.ndarray
+        The frame to blend onto, with shape ``src.shape + (3,)``, dtype uint8 and C-contiguous
+        memory. It is overwritten with the result.
+    workers : int, optional
+        Number of threads used for the blend. None uses one thread per CPU core. Default is 1.
+    vmin, vmax : float, optional
+        The data range mapped onto the colormap, see ``apply_colormap_with_numpy``.
+    n : int, optional
+        Number of entries the colormap is resampled to when the input is scaled. Default is 4096.
+    premultiplied : bool, optional
+        Whether the colors of ``cmp`` are already multiplied by alpha. Default is False.
+    under, over, bad : sequence of int, optional
+        Colors in the channel order and alpha convention of ``cmp`` for values below vmin,
+        above vmax, and NaN or masked values, e.g. ``(0, 0, 0, 0)`` to leave them transparent.
+        under and over only apply when the input is scaled, while bad also applies to masked
+        uint8 input. By default, values outside the range get the end colors of the colormap
+        and bad values its first color.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``background``, with the colorized image blended onto it.
+
+    Raises
+    ------
+    ValueError
+        If the input, colormap, background or one of the colors is invalid.
+
+    Examples
+    --------
+    >>> lut = get_rgba_colormaps("mpl.inferno", alpha=0.6, order="bgra")
+    >>> transparent = (0, 0, 0, 0)
+    >>> blend_colormap(thermal, lut, visible_frame, vmin=30.0, vmax=40.0, under=transparent)
+
+    """
+    src, mask = _split_masked(src)
+    workers = _check_input(src, cmp, workers, channels=4)
+    _check_dst(background, (*src.shape, 3))
+    if src.size == 0:
+        return background
+
+    lut = cmp.reshape(256, 4)
+    extremes = _extreme_colors(lut, under, over, bad, mask is not None)
+    table, scaling, key = _gather_table(src, lut, vmin, vmax, n, extremes, mask)
+    if not premultiplied:
+        table = _cached_premultiplied_table(table, key)
+    _run_tiles(partial(_blend_chunks, table, scaling), src, background, workers, mask)
+    return background
@@ -0,0 +1,397 @@
+"""Indexed-color storage of colormapped frames.
+
+This module stores frames as their uint8 colormap indices instead of colorized RGB images,
+which takes about a third of the space. Single frames are written as indexed-color PNG files
+whose palette is the colormap, so any image viewer shows them in color. Frames and stacks of
+frames can also be written as compressed ``.npz`` archives that reference the colormap by
+name. Loaded files are colorized on demand with ``apply_colormap_with_numpy``.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import struct
+import zlib
+from typing import TYPE_CHECKING, Any, BinaryIO, Literal, Union
+
+import numpy as np
+
+from colormap_tool._cmps import _get_bgr_lut, _lookup, _resolve
+from colormap_tool._cv import apply_colormap_with_numpy
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+__all__ = ["IndexedFrames", "load_indexed", "save_indexed"]
+
+_File = Union[str, os.PathLike, BinaryIO]
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG color types of 8-bit grayscale and palette images, the two that hold plain indices.
+_PNG_GRAY = 0
+_PNG_PALETTE = 3
+
+# PNG filter types. Rows are written with the Sub filter, whose residuals of smooth thermal
+# data compress about 30% better than the raw indices and which is undone with one cumsum.
+_FILTER_NONE, _FILTER_SUB, _FILTER_UP, _FILTER_AVERAGE, _FILTER_PAETH = range(5)
+
+
+class IndexedFrames:
+    """Frames stored as colormap indices, colorized on demand.
+
+    Returned by ``load_indexed``. The indices are kept as loaded; every call to
+    ``colorize`` or iteration over the frames expands them with
+    ``apply_colormap_with_numpy``, so only the frames that are actually viewed are
+    colorized.
+
+    Attributes
+    ----------
+    indices : numpy.ndarray
+        The uint8 colormap indices, with shape (H, W) for a single frame or (N, H, W) for
+        a stack.
+    colormap : str or None
+        The colormap name in "namespace.name" format, or None if the file does not name it
+        (e.g. an indexed PNG written by another tool).
+    vmin, vmax : float or None
+        The data range that the indices were quantized from, if it was saved.
+
+    """
+
+    def __init__(
+        self,
+        indices: np.ndarray,
+        colormap: str | None = None,
+        palette: np.ndarray | None = None,
+        vmin: float | None = None,
+        vmax: float | None = None,
+    ) -> None:
+        if palette is None and colormap is None:
+            raise ValueError("Either a colormap name or a palette is required.")
+        self.indices = indices
+        self.colormap = colormap
+        self.vmin = vmin
+        self.vmax = vmax
+        self._palette = palette
+
+    @property
+    def lut(self) -> np.ndarray:
+        """The (256, 1, 3) uint8 BGR LUT used to colorize the frames.
+
+        It is the palette stored in the file if there is one, otherwise the named colormap.
+        """
+        if self._palette is not None:
+            return self._palette
+        return _get_bgr_lut(*_resolve(str(self.colormap)))
+
+    def colorize(self, dst: np.ndarray | None = None, workers: int | None = 1) -> np.ndarray:
+        """Colorize all frames into a BGR array of shape ``indices.shape + (3,)``.
+
+        Parameters
+        ----------
+        dst : numpy.ndarray, optional
+            The output array, see ``apply_colormap_with_numpy``.
+        workers : int, optional
+            Number of threads used for the LUT gather. Default is 1.
+
+        Returns
+        -------
+        numpy.ndarray
+            The colorized frames. This is ``dst`` when it is provided.
+
+        """
+        return apply_colormap_with_numpy(self.indices, self.lut, dst=dst, workers=workers)
+
+    def values(self, dtype: Any = np.float32) -> np.ndarray:
+        """Map the indices linearly back onto [vmin, vmax].
+
+        Raises
+        ------
+        ValueError
+            If the file does not store the data range.
+
+        """
+        if self.vmin is None or self.vmax is None:
+            raise ValueError("The data range (vmin, vmax) was not saved with the frames.")
+        scale = (self.vmax - self.vmin) / 255
+        result: np.ndarray = (self.indices * scale + self.vmin).astype(dtype)
+        return result
+
+    def __len__(self) -> int:
+        return 1 if self.indices.ndim == 2 else self.indices.shape[0]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Colorize the frames one by one into a reused output buffer.
+
+        A yielded frame is valid until the next one is requested; copy it to keep it.
+        """
+        frames = self.indices[np.newaxis] if self.indices.ndim == 2 else self.indices
+        lut = self.lut
+        out = np.empty((*frames.shape[1:], 3), dtype=np.uint8)
+        for frame in frames:
+            yield apply_colormap_with_numpy(frame, lut, dst=out)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.indices.shape} colormap={self.colormap!r}>"
+
+
+def _format_of(file: _File, format: str | None) -> str:
+    if format is None:
+        if not isinstance(file, (str, os.PathLike)):
+            raise ValueError("The format must be given when writing to or reading from a file object.")
+        format = pathlib.Path(file).suffix.lstrip(".")
+    format = format.lower()
+    if format not in ("png", "npz"):
+        raise ValueError(f"The format must be 'png' or 'npz', got {format!r}.")
+    return format
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def _encode_png(indices: np.ndarray, palette: np.ndarray, text: dict[str, str], compress_level: int) -> bytes:
+    """Encode a (H, W) uint8 array as an 8-bit indexed-color PNG with a (m, 3) RGB palette."""
+    height, width = indices.shape
+    rows = np.empty((height, width + 1), dtype=np.uint8)
+    rows[:, 0] = _FILTER_SUB
+    rows[:, 1] = indices[:, 0] if width else 0
+    np.subtract(indices[:, 1:], indices[:, :-1], out=rows[:, 2:])
+
+    header = struct.pack(">IIBBBBB", width, height, 8, _PNG_PALETTE, 0, 0, 0)
+    chunks = [_chunk(b"IHDR", header), _chunk(b"PLTE", palette.tobytes())]
+    chunks += [_chunk(b"tEXt", f"{key}\0{value}".encode("latin-1")) for key, value in text.items()]
+    chunks += [_chunk(b"IDAT", zlib.compress(rows.tobytes(), compress_level)), _chunk(b"IEND", b"")]
+    return _PNG_SIGNATURE + b"".join(chunks)
+
+
+def _unfilter(rows: np.ndarray) -> np.ndarray:
+    """Undo the PNG filters of (H, 1 + W) 8-bit single-channel scanlines.
+
+    None, Sub and Up rows are vectorized. Average and Paeth rows, which this module does not
+    write, depend on the previous pixel of the same row and are decoded pixel by pixel.
+    """
+    height, width = rows.shape[0], rows.shape[1] - 1
+    out = np.empty((height, width), dtype=np.uint8)
+    prev = np.zeros(width, dtype=np.uint8)
+    for y in range(height):
+        kind, line = rows[y, 0], rows[y, 1:]
+        if kind == _FILTER_NONE:
+            out[y] = line
+        elif kind == _FILTER_SUB:
+            np.cumsum(line, out=out[y], dtype=np.uint8)
+        elif kind == _FILTER_UP:
+            np.add(line, prev, out=out[y])
+        elif kind in (_FILTER_AVERAGE, _FILTER_PAETH):
+            row, up, left, up_left = out[y], prev.tolist(), 0, 0
+            for x, value in enumerate(line.tolist()):
+                if kind == _FILTER_AVERAGE:
+                    predictor = (left + up[x]) >> 1
+                else:
+                    p = left + up[x] - up_left
+                    pa, pb, pc = abs(p - left), abs(p - up[x]), abs(p - up_left)
+                    predictor = left if pa <= pb and pa <= pc else up[x] if pb <= pc else up_left
+                left = (value + predictor) & 0xFF
+                up_left = up[x]
+                row[x] = left
+        else:
+            raise ValueError(f"Invalid PNG filter type {kind} in row {y}.")
+        prev = out[y]
+    return out
+
+
+def _decode_png(data: bytes) -> tuple[np.ndarray, np.ndarray | None, dict[str, str]]:
+    """Decode an 8-bit indexed-color or grayscale PNG to its indices, RGB palette and text."""
+    if not data.startswith(_PNG_SIGNATURE):
+        raise ValueError("The file is not a PNG file.")
+    header = b""
+    palette: np.ndarray | None = None
+    text: dict[str, str] = {}
+    idat = []
+    pos = len(_PNG_SIGNATURE)
+    while pos < len(data):
+        (length,) = struct.unpack_from(">I", data, pos)
+        kind, body = data[pos + 4 : pos + 8], data[pos + 8 : pos + 8 + length]
+        pos += length + 12
+        if kind == b"IHDR":
+            header = body
+        elif kind == b"PLTE":
+            if not 0 < len(body) <= 3 * 256 or len(body) % 3:
+                raise ValueError(f"The PNG palette has {len(body)} bytes, not 1 to 256 RGB colors.")
+            palette = np.frombuffer(body, dtype=np.uint8).reshape(-1, 3)
+        elif kind == b"tEXt":
+            key, _, value = body.partition(b"\0")
+            text[key.decode("latin-1")] = value.decode("latin-1")
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+
+    if len(header) != 13:
+        raise ValueError("The PNG file has no valid IHDR chunk.")
+    width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", header)
+    if depth != 8 or color_type not in (_PNG_GRAY, _PNG_PALETTE) or interlace:
+        msg = f"bit depth {depth}, color type {color_type}, interlace method {interlace}"
+        raise ValueError(f"Only non-interlaced 8-bit palette or grayscale PNG files are supported, got {msg}.")
+    rows = np.frombuffer(zlib.decompress(b"".join(idat)), dtype=np.uint8).reshape(height, width + 1)
+    return _unfilter(rows), palette if color_type == _PNG_PALETTE else None, text
+
+
+def save_indexed(
+    file: _File,
+    indices: np.ndarray,
+    cmap: str,
+    namespace: str | None = None,
+    *,
+    format: Literal["png", "npz"] | None = None,
+    vmin: float | None = None,
+    vmax: float | None = None,
+    compress_level: int = 6,
+) -> None:
+    """Save frames as colormap indices together with their colormap.
+
+    Compared with a colorized RGB image, this stores one byte per pixel instead of three,
+    and the frames can be colorized again, or with another colormap, after loading them
+    with ``load_indexed``.
+
+    Parameters
+    ----------
+    file : str, os.PathLike or binary file object
+        Where to write the frames.
+    indices : numpy.ndarray
+        The uint8 colormap indices, e.g. a thermal frame quantized onto [0, 255]. Shape
+        (H, W) for PNG, (H, W) or (N, H, W) for npz.
+    cmap : str
+        Colormap name. If namespace is None, use "namespace.name" format. Names are
+        case-insensitive, and a ``_r`` suffix selects the reversed colormap.
+    namespace : str, optional
+        "cv" (or "cv2", "opencv") for OpenCV, "mpl" (or "matplotlib") for Matplotlib.
+    format : {"png", "npz"}, optional
+        "png" writes an indexed-color PNG whose palette is the colormap, which image viewers
+        show in color. "npz" writes a compressed numpy archive that references the colormap
+        by name. Default is the suffix of ``file``.
+    vmin, vmax : float, optional
+        The data range the indices were quantized from, saved so that ``IndexedFrames.values``
+        can map them back.
+    compress_level : int, optional
+        zlib compression level of PNG files, from 0 to 9. Default is 6.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not found, or the frames or the format are invalid.
+
+    Examples
+    --------
+    >>> indices = np.clip((frame - 20.0) / 20.0 * 255, 0, 255).astype(np.uint8)
+    >>> save_indexed("frame_0001.png", indices, "mpl.inferno", vmin=20.0, vmax=40.0)
+    >>> save_indexed("recording.npz", np.stack(all_indices), "mpl.inferno", vmin=20.0, vmax=40.0)
+
+    """
+    file_format = _format_of(file, format)
+    if indices.dtype != np.uint8:
+        raise ValueError(f"The dtype of the indices {indices.dtype} is not uint8.")
+    if indices.ndim not in ((2,) if file_format == "png" else (2, 3)):
+        shapes = "(H, W)" if file_format == "png" else "(H, W) or (N, H, W)"
+        raise ValueError(f"The shape of the indices {indices.shape} is not {shapes} for {file_format} files.")
+
+    namespace, name = _resolve(cmap, namespace)
+    colormap = f"{namespace}.{name}"
+    if file_format == "png":
+        text = {"colormap": colormap}
+        text.update({key: repr(float(value)) for key, value in (("vmin", vmin), ("vmax", vmax)) if value is not None})
+        palette = np.ascontiguousarray(_lookup(namespace, name).reshape(-1, 3))
+        data = _encode_png(indices, palette, text, compress_level)
+        if isinstance(file, (str, os.PathLike)):
+            pathlib.Path(file).write_bytes(data)
+        else:
+            file.write(data)
+        return
+
+    np.savez_compressed(
+        file,
+        indices=indices,
+        colormap=np.array(colormap),
+        vmin=np.float64(np.nan if vmin is None else vmin),
+        vmax=np.float64(np.nan if vmax is None else vmax),
+    )
+
+
+def _optional_float(value: Any) -> float | None:
+    value = None if value is None else float(value)
+    return None if value is None or np.isnan(value) else value
+
+
+def load_indexed(
+    file: _File,
+    *,
+    cmap: str | None = None,
+    namespace: str | None = None,
+    format: Literal["png", "npz"] | None = None,
+) -> IndexedFrames:
+    """Load frames saved by ``save_indexed``.
+
+    The indices are read at once, and colorized only when ``IndexedFrames.colorize`` is
+    called or the frames are iterated over. 8-bit indexed-color PNG files written by other
+    tools can be loaded too: their palette is used as the colormap. 8-bit grayscale PNG
+    files have neither a palette nor a colormap name, so ``cmap`` must be given for them.
+
+    Parameters
+    ----------
+    file : str, os.PathLike or binary file object
+        The file to read.
+    cmap : str, optional
+        Colormap name used instead of the palette or colormap stored in the file. If
+        namespace is None, use "namespace.name" format.
+    namespace : str, optional
+        "cv" (or "cv2", "opencv") for OpenCV, "mpl" (or "matplotlib") for Matplotlib.
+    format : {"png", "npz"}, optional
+        Default is the suffix of ``file``.
+
+    Returns
+    -------
+    IndexedFrames
+        The frames.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a supported PNG or npz file, its palette is invalid, the colormap
+        is not found, or neither ``cmap``, a palette nor a colormap name is available.
+
+    Examples
+    --------
+    >>> frames = load_indexed("recording.npz")
+    >>> for color in frames:
+    ...     writer.write(color)
+
+    >>> # A grayscale thermal PNG exported by a camera tool
+    >>> frames = load_indexed("export.png", cmap="mpl.inferno")
+
+    """
+    colormap = None if cmap is None else ".".join(_resolve(cmap, namespace))
+    if _format_of(file, format) == "npz":
+        with np.load(file, allow_pickle=False) as archive:
+            return IndexedFrames(
+                archive["indices"],
+                colormap=colormap or str(archive["colormap"]),
+                vmin=_optional_float(archive["vmin"]),
+                vmax=_optional_float(archive["vmax"]),
+            )
+
+    data = pathlib.Path(file).read_bytes() if isinstance(file, (str, os.PathLike)) else file.read()
+    indices, palette, text = _decode_png(data)
+    lut = None
+    if palette is not None and colormap is None:
+        # Palettes with fewer than 256 entries are padded with their last color.
+        lut = np.empty((256, 1, 3), dtype=np.uint8)
+        lut[: len(palette), 0] = palette[:, ::-1]
+        lut[len(palette) :, 0] = palette[-1, ::-1]
+    return IndexedFrames(
+        indices,
+        colormap=colormap or text.get("colormap"),
+        palette=lut,
+        vmin=_optional_float(text.get("vmin")),
+        vmax=_optional_float(text.get("vmax")),
+    )
@@ -0,0 +1,289 @@
+"""Inverse colormap lookup.
+
+This module decodes colorized images back to positions on their colormap, e.g. to recover
+scalar values from screenshots of third-party tools. For each colormap, a hash table of its
+colors and a quantized RGB cube that stores the nearest colormap entry of every cell are built
+once and cached. Exact colors are decoded with one hash probe per pixel; other colors take the
+cube's guess, refined against the neighboring colormap entries.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+import numpy as np
+
+from colormap_tool._cmps import _lookup, _LRUCache, _resolve
+
+if TYPE_CHECKING:
+    from numpy.typing import DTypeLike
+
+__all__ = ["invert_colormap"]
+
+# Number of pixels decoded per chunk, so the temporaries stay in cache.
+_CHUNK_SIZE = 1 << 16
+
+# Number of cube cells whose nearest entry is computed per matrix product.
+_BUILD_BLOCK_SIZE = 1 << 14
+
+# Key of the empty slots of the color hash table, which no 24-bit color can match.
+_EMPTY_KEY = np.uint32(0xFFFFFFFF)
+
+# Lookup structures of the most recently inverted colormaps, keyed by (namespace, name,
+# order, bits, refine, id of the source LUT). They take far longer to build than the LUTs of
+# the shared LUT cache, so they have their own cache and are not evicted by those.
+_INVERSE_CACHE = _LRUCache(maxsize=8)
+
+
+class _Inverse(NamedTuple):
+    """The cached lookup structures of one colormap."""
+
+    colors: np.ndarray  # (3, m + 2 * refine) int32 channels, padded with the edge colors
+    keys: np.ndarray  # uint32 hash table of packed 0xRRGGBB colors
+    entries: np.ndarray  # colormap index of each hash table slot
+    multiplier: np.uint32  # multiplier of the collision-free hash
+    shift: int
+    cube: np.ndarray  # nearest colormap index of each cell center of the quantized RGB cube
+    bits: int
+    refine: int
+
+
+def _pack(r: np.ndarray, g: np.ndarray, b: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Pack three uint8 channels into 0xRRGGBB uint32 keys."""
+    np.left_shift(r, 16, out=out, dtype=np.uint32)
+    out |= np.left_shift(g, 8, dtype=np.uint32)
+    out |= b
+    return out
+
+
+def _build_hash(lut: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.uint32, int]:
+    """Return a collision-free multiplicative hash table of the colors of a (m, 3) LUT.
+
+    Repeated colors keep their first index, which is what a nearest-color search returns.
+    """
+    keys = _pack(lut[:, 0], lut[:, 1], lut[:, 2], np.empty(lut.shape[0], dtype=np.uint32))
+    keys, first = np.unique(keys, return_index=True)
+    rng = np.random.default_rng(0)
+    slot_bits = max(int(keys.size - 1).bit_length() + 6, 8)
+    while True:
+        for _ in range(32):
+            multiplier = np.uint32(rng.integers(1 << 31, 1 << 32) | 1)
+            slots = (keys * multiplier) >> np.uint32(32 - slot_bits)
+            if np.unique(slots).size == keys.size:
+                table = np.full(1 << slot_bits, _EMPTY_KEY, dtype=np.uint32)
+                index = np.zeros(1 << slot_bits, dtype=np.uint16)
+                table[slots] = keys
+                index[slots] = first
+                return table, index, multiplier, 32 - slot_bits
+        slot_bits += 1
+
+
+def _build_cube(lut: np.ndarray, bits: int) -> np.ndarray:
+    """Return the flat (2**(3 * bits),) cube of the nearest LUT entry of every cell center.
+
+    Squared distances are computed as ``|l|^2 - 2 c.l`` with one matrix product per block of
+    cells (``|c|^2`` does not change the argmin).
+    """
+    size = 1 << bits
+    step = 1 << (8 - bits)
+    centers = np.arange(size, dtype=np.float32) * step + (step - 1) / 2
+    grid = np.stack(np.meshgrid(centers, centers, centers, indexing="ij"), axis=-1).reshape(-1, 3)
+
+    colors = lut.astype(np.float32)
+    norms = (colors**2).sum(axis=1)
+    cube = np.empty(grid.shape[0], dtype=np.uint16)
+    for start in range(0, grid.shape[0], _BUILD_BLOCK_SIZE):
+        block = grid[start : start + _BUILD_BLOCK_SIZE]
+        cube[start : start + _BUILD_BLOCK_SIZE] = np.argmin(norms - 2 * block @ colors.T, axis=1)
+    return cube
+
+
+def _build_inverse(lut: np.ndarray, bits: int, refine: int) -> _Inverse:
+    """Build the lookup structures of a (m, 3) uint8 LUT."""
+    keys, index, multiplier, shift = _build_hash(lut)
+    colors = np.pad(lut, ((refine, refine), (0, 0)), mode="edge").T.astype(np.int32)
+    return _Inverse(colors, keys, index, multiplier, shift, _build_cube(lut, bits), bits, refine)
+
+
+def _refine(inverse: _Inverse, px: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the nearest index and squared distance of (P, 3) pixels that missed the hash.
+
+    The cube's guess is compared with the ``refine`` entries on either side. The colors are
+    padded with copies of the edge colors, so the candidates need no clipping; a strict
+    comparison keeps the first of equal distances, as the exact search does.
+    """
+    shift = 8 - inverse.bits
+    cell = (px[:, 0] >> shift).astype(np.intp)
+    for axis in (1, 2):
+        cell <<= inverse.bits
+        cell |= px[:, axis] >> shift
+    guess = inverse.cube.take(cell).astype(np.intp)
+
+    values = px.T.astype(np.int32)
+    best = guess.copy()
+    best_d = np.full(px.shape[0], np.iinfo(np.int32).max, dtype=np.int32)
+    d = np.empty_like(best_d)
+    diff = np.empty_like(best_d)
+    for candidate in range(2 * inverse.refine + 1):
+        cand = guess + candidate
+        d.fill(0)
+        for channel in range(3):
+            np.subtract(inverse.colors[channel].take(cand), values[channel], out=diff)
+            diff *= diff
+            d += diff
+        better = d < best_d
+        np.copyto(best_d, d, where=better)
+        np.copyto(best, cand, where=better)
+    best -= inverse.refine
+    np.clip(best, 0, inverse.colors.shape[1] - 2 * inverse.refine - 1, out=best)
+    return best, best_d
+
+
+def _decode_chunks(inverse: _Inverse, pixels: np.ndarray, indices: np.ndarray, distances: np.ndarray | None) -> None:
+    """Decode flat (P, 3) RGB ``pixels`` into ``indices`` and optional squared ``distances``.
+
+    Exact colors of the colormap are found with one probe of the hash table. The other pixels
+    fall back to the cube and the refinement.
+    """
+    size = min(pixels.shape[0], _CHUNK_SIZE)
+    key = np.empty(size, dtype=np.uint32)
+    slot = np.empty(size, dtype=np.uint32)
+    hit = np.empty(size, dtype=bool)
+    for start in range(0, pixels.shape[0], _CHUNK_SIZE):
+        px = pixels[start : start + _CHUNK_SIZE]
+        k = px.shape[0]
+        kk, sl, ht = key[:k], slot[:k], hit[:k]
+        out = indices[start : start + k]
+
+        _pack(px[:, 0], px[:, 1], px[:, 2], kk)
+        np.multiply(kk, inverse.multiplier, out=sl)
+        sl >>= inverse.shift
+        np.equal(inverse.keys.take(sl), kk, out=ht)
+        out[...] = inverse.entries.take(sl)
+        if distances is not None:
+            distances[start : start + k] = 0
+
+        if not ht.all():
+            miss = np.flatnonzero(~ht)
+            best, best_d = _refine(inverse, px[miss])
+            out[miss] = best
+            if distances is not None:
+                distances[start : start + k][miss] = best_d
+
+
+def invert_colormap(
+    image: np.ndarray,
+    name: str,
+    namespace: str | None = None,
+    *,
+    order: Literal["rgb", "bgr"] = "rgb",
+    dtype: DTypeLike = np.uint8,
+    vmin: float = 0.0,
+    vmax: float = 1.0,
+    return_distance: bool = False,
+    refine: int = 4,
+    bits: int = 6,
+) -> np.ndarray | tuple[np.ndarray, np.ndarray]:
+    """Decode a colorized image back to positions on its colormap.
+
+    Every pixel is mapped to the colormap entry with the nearest color. On first use for each
+    colormap, a hash table of its colors and a quantized RGB cube of ``2**bits`` cells per
+    channel, holding the nearest entry of every cell center, are built. Building them takes
+    far longer than decoding a frame, so those of the 8 most recently used colormaps and
+    options are kept in a cache of their own, which ``clear_cache`` and ``set_cache_size``
+    do not affect. A colormap replaced in ``CMPSPACE`` gets new structures on its next use.
+
+    Pixels with an exact color of the colormap, e.g. from a lossless screenshot, are decoded
+    with one hash table probe. Other pixels, e.g. from JPEG frames, take the cube's guess and
+    refine it by comparing the pixel with the ``refine`` entries on either side, which is
+    several times slower. The best of those entries is the nearest one overall unless the
+    pixel is far from the colormap, or the colormap comes back to similar colors elsewhere,
+    as cyclic colormaps do.
+
+    Parameters
+    ----------
+    image : numpy.ndarray
+        The colorized image, with shape (..., 3) and dtype uint8.
+    name : str
+        Colormap name. If namespace is None, use "namespace.name" format. Names are
+        case-insensitive, and a ``_r`` suffix selects the reversed colormap.
+    namespace : str, optional
+        "cv" (or "cv2", "opencv") for OpenCV, "mpl" (or "matplotlib") for Matplotlib.
+    order : {"rgb", "bgr"}, optional
+        The channel order of the image. Use "bgr" for OpenCV frames. Default is "rgb".
+    dtype : numpy dtype, optional
+        uint8 (or uint16) returns the colormap indices. float32 or float64 returns values
+        mapped linearly from the colormap onto [vmin, vmax]. Default is uint8.
+    vmin, vmax : float, optional
+        The data range of float output. Default is [0, 1].
+    return_distance : bool, optional
+        Whether to also return the Euclidean RGB distance between each pixel and its decoded
+        color, e.g. to reject pixels that do not belong to the colormap. Default is False.
+    refine : int, optional
+        Number of neighboring entries on either side of the cube's guess that are compared
+        with the pixel. 0 uses the cube alone, which is faster but off by a few entries.
+        Default is 4.
+    bits : int, optional
+        Number of bits per channel of the cube, from 1 to 8. Default is 6 (a 64**3 cube).
+
+    Returns
+    -------
+    numpy.ndarray or tuple of numpy.ndarray
+        The decoded values with shape ``image.shape[:-1]``, and the float32 distances with the
+        same shape if ``return_distance`` is True.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not found, or the image or one of the options is invalid.
+
+    Examples
+    --------
+    >>> frame = cv2.imread("screenshot.png")
+    >>> temperature, distance = invert_colormap(
+    ...     frame, "mpl.inferno", order="bgr", dtype=np.float32, vmin=20.0, vmax=40.0, return_distance=True
+    ... )
+    >>> temperature[distance > 10] = np.nan
+
+    """
+    if image.ndim < 1 or image.shape[-1] != 3:
+        raise ValueError(f"The shape of the image {image.shape} is not (..., 3).")
+    if image.dtype != np.uint8:
+        raise ValueError(f"The dtype of the image {image.dtype} is not uint8.")
+    if order not in ("rgb", "bgr"):
+        raise ValueError(f"order must be 'rgb' or 'bgr', got {order!r}.")
+    dtype = np.dtype(dtype)
+    if dtype not in (np.uint8, np.uint16, np.float32, np.float64):
+        raise ValueError(f"The output dtype {dtype} is not uint8, uint16, float32 or float64.")
+    if not 1 <= bits <= 8:
+        raise ValueError(f"bits must be between 1 and 8, got {bits}.")
+    if refine < 0:
+        raise ValueError(f"refine must be non-negative, got {refine}.")
+
+    namespace, name = _resolve(name, namespace)
+    source = _lookup(namespace, name)
+    lut = source.reshape(-1, 3)
+    if order == "bgr":
+        lut = lut[:, ::-1]
+    # The entry holds the source LUT, so its id is not reused while the entry is cached.
+    cached: tuple[np.ndarray, _Inverse] = _INVERSE_CACHE.get_or_create(
+        (namespace, name, order, bits, refine, id(source)),
+        lambda: (source, _build_inverse(lut, bits, refine)),
+    )
+    inverse = cached[1]
+
+    pixels = image.reshape(-1, 3)
+    indices = np.empty(pixels.shape[0], dtype=np.uint16)
+    distances = np.empty(pixels.shape[0], dtype=np.int32) if return_distance else None
+    _decode_chunks(inverse, pixels, indices, distances)
+
+    shape = image.shape[:-1]
+    if dtype.kind == "f":
+        scale = (vmax - vmin) / max(lut.shape[0] - 1, 1)
+        result = (indices * scale + vmin).astype(dtype).reshape(shape)
+    else:
+        result = indices.astype(dtype).reshape(shape)
+
+    if distances is None:
+        return result
+    return result, np.sqrt(distances, dtype=np.float32).reshape(shape)
@@ -0,0 +1,322 @@
+"""Perceptual colormap metrics.
+
+This module audits colormaps in the CIELAB color space: whether their lightness is monotonic,
+how uniform their perceptual steps are (CIEDE2000), and how much of their contrast survives
+simulated color vision deficiencies. All colormaps of a namespace are converted as one
+(K, 256, 3) block, and the results can be cached on disk, keyed by a hash of the LUT data.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+from typing import TYPE_CHECKING, Literal, NamedTuple, Union
+
+import numpy as np
+
+from colormap_tool._cmps import _resolve_namespace, resample_all
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+__all__ = ["colormap_metrics", "simulate_cvd"]
+
+# Bump when the metrics change, so that stale disk caches are not read.
+_METRICS_VERSION = 1
+
+# Number of entries the colormaps are resampled to before they are compared.
+_METRICS_SIZE = 256
+
+# Lightness steps smaller than this (in L*) do not break monotonicity. The 8-bit quantization
+# of the LUTs alone makes the lightness of smooth colormaps jitter by up to about 0.3.
+_LIGHTNESS_TOLERANCE = 0.5
+
+# sRGB (linear) to CIE XYZ, and the D65 reference white.
+_RGB2XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+# Machado et al. (2009) simulation matrices for full severity, applied to linear sRGB.
+_CVD_MATRICES = {
+    "protanopia": np.array([
+        [0.152286, 1.052583, -0.204868],
+        [0.114503, 0.786281, 0.099216],
+        [-0.003882, -0.048116, 1.051998],
+    ]),
+    "deuteranopia": np.array([
+        [0.367322, 0.860646, -0.227968],
+        [0.280085, 0.672501, 0.047413],
+        [-0.011820, 0.042940, 0.968881],
+    ]),
+    "tritanopia": np.array([
+        [1.255528, -0.076749, -0.178779],
+        [-0.078411, 0.930809, 0.147602],
+        [0.004733, 0.691367, 0.303900],
+    ]),
+}
+
+_Deficiency = Literal["protanopia", "deuteranopia", "tritanopia"]
+_CacheDir = Union[bool, str, os.PathLike]
+
+
+class ColormapMetrics(NamedTuple):
+    """Perceptual metrics of a colormap.
+
+    Attributes
+    ----------
+    lightness_monotonic : bool
+        Whether the CIELAB lightness L* only increases or only decreases along the colormap.
+    lightness_range : float
+        L* of the last entry minus L* of the first entry.
+    delta_e_mean : float
+        Mean CIEDE2000 difference between neighboring entries of the 256-entry colormap.
+    delta_e_cv : float
+        Coefficient of variation (standard deviation / mean) of those differences. 0 means
+        perceptually uniform steps.
+    protanopia, deuteranopia, tritanopia : float
+        Total CIEDE2000 length of the colormap under the simulated deficiency, relative to
+        its length with normal color vision. Low values mean that the colormap loses most
+        of its contrast.
+
+    """
+
+    lightness_monotonic: bool
+    lightness_range: float
+    delta_e_mean: float
+    delta_e_cv: float
+    protanopia: float
+    deuteranopia: float
+    tritanopia: float
+
+
+def _srgb_to_linear(rgb: np.ndarray) -> np.ndarray:
+    """Convert uint8 sRGB values to linear float64 RGB in [0, 1] through a 256-entry table."""
+    c = np.arange(256) / 255
+    table = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    linear: np.ndarray = table[rgb]
+    return linear
+
+
+def _linear_to_lab(linear: np.ndarray) -> np.ndarray:
+    """Convert linear RGB values of shape (..., 3) to CIELAB (D65)."""
+    xyz = linear @ (_RGB2XYZ.T / _WHITE)
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    lab: np.ndarray = np.empty_like(f)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+
+def _delta_e2000(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """Return the CIEDE2000 color difference of two broadcastable (..., 3) CIELAB arrays."""
+    l1, a1, b1 = np.moveaxis(lab1, -1, 0)
+    l2, a2, b2 = np.moveaxis(lab2, -1, 0)
+
+    c_mean7 = ((np.hypot(a1, b1) + np.hypot(a2, b2)) / 2) ** 7
+    g = 0.5 * (1 - np.sqrt(c_mean7 / (c_mean7 + 25.0**7)))
+    a1, a2 = a1 * (1 + g), a2 * (1 + g)
+    c1, c2 = np.hypot(a1, b1), np.hypot(a2, b2)
+    h1 = np.degrees(np.arctan2(b1, a1)) % 360
+    h2 = np.degrees(np.arctan2(b2, a2)) % 360
+    achromatic = c1 * c2 == 0
+
+    dh = h2 - h1
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(achromatic, 0, dh)
+    d_l = l2 - l1
+    d_c = c2 - c1
+    d_h = 2 * np.sqrt(c1 * c2) * np.sin(np.radians(dh / 2))
+
+    l_mean = (l1 + l2) / 2
+    c_mean = (c1 + c2) / 2
+    h_sum = h1 + h2
+    h_mean = np.where(np.abs(h1 - h2) <= 180, h_sum / 2, np.where(h_sum < 360, h_sum + 360, h_sum - 360) / 2)
+    h_mean = np.where(achromatic, h_sum, h_mean)
+
+    t = (
+        1
+        - 0.17 * np.cos(np.radians(h_mean - 30))
+        + 0.24 * np.cos(np.radians(2 * h_mean))
+        + 0.32 * np.cos(np.radians(3 * h_mean + 6))
+        - 0.20 * np.cos(np.radians(4 * h_mean - 63))
+    )
+    c_mean7 = c_mean**7
+    r_c = 2 * np.sqrt(c_mean7 / (c_mean7 + 25.0**7))
+    r_t = -np.sin(np.radians(60 * np.exp(-(((h_mean - 275) / 25) ** 2)))) * r_c
+    s_l = 1 + 0.015 * (l_mean - 50) ** 2 / np.sqrt(20 + (l_mean - 50) ** 2)
+    s_c = 1 + 0.045 * c_mean
+    s_h = 1 + 0.015 * c_mean * t
+
+    d_l, d_c, d_h = d_l / s_l, d_c / s_c, d_h / s_h
+    delta_e: np.ndarray = np.sqrt(d_l**2 + d_c**2 + d_h**2 + r_t * d_c * d_h)
+    return delta_e
+
+
+def simulate_cvd(lut: np.ndarray, deficiency: _Deficiency, severity: float = 1.0) -> np.ndarray:
+    """Simulate how a colormap looks to a viewer with a color vision deficiency.
+
+    Uses the model of Machado et al. (2009) in linear sRGB, interpolated linearly between
+    normal vision (severity 0) and full dichromacy (severity 1).
+
+    Parameters
+    ----------
+    lut : numpy.ndarray
+        RGB colors of any shape (..., 3) and dtype uint8, e.g. a LUT or a stack of LUTs.
+    deficiency : {"protanopia", "deuteranopia", "tritanopia"}
+        The simulated deficiency (missing L, M or S cones).
+    severity : float, optional
+        From 0 to 1. Default is 1.
+
+    Returns
+    -------
+    numpy.ndarray
+        The simulated colors, with the same shape and dtype uint8.
+
+    Raises
+    ------
+    ValueError
+        If the deficiency is unknown, or the severity or the input is invalid.
+
+    """
+    if deficiency not in _CVD_MATRICES:
+        raise ValueError(f"deficiency must be one of {', '.join(_CVD_MATRICES)}, got {deficiency!r}.")
+    if not 0 <= severity <= 1:
+        raise ValueError(f"severity must be between 0 and 1, got {severity}.")
+    if lut.dtype != np.uint8 or lut.shape[-1] != 3:
+        raise ValueError(f"The LUT must have shape (..., 3) and dtype uint8, got {lut.shape} {lut.dtype}.")
+
+    matrix = severity * _CVD_MATRICES[deficiency] + (1 - severity) * np.eye(3)
+    linear = np.clip(_srgb_to_linear(lut) @ matrix.T, 0, 1)
+    srgb = np.where(linear <= 0.0031308, 12.92 * linear, 1.055 * linear ** (1 / 2.4) - 0.055)
+    result: np.ndarray = np.rint(srgb * 255).astype(np.uint8)
+    return result
+
+
+def _path_length(lab: np.ndarray) -> np.ndarray:
+    """Return the CIEDE2000 differences between neighboring entries of a (K, n, 3) Lab block."""
+    return _delta_e2000(lab[:, :-1], lab[:, 1:])
+
+
+def _compute_metrics(luts: np.ndarray) -> dict[str, np.ndarray]:
+    """Compute the metrics of a (K, n, 3) uint8 block of colormaps, one (K,) array per field."""
+    linear = _srgb_to_linear(luts)
+    lab = _linear_to_lab(linear)
+    lightness_steps = np.diff(lab[..., 0], axis=1)
+    steps = _path_length(lab)
+    mean = steps.mean(axis=1)
+    length = steps.sum(axis=1)
+    # Constant colormaps have no length; report 0 instead of dividing by it.
+    safe = np.where(length > 0, length, 1)
+
+    metrics = {
+        "lightness_monotonic": (lightness_steps >= -_LIGHTNESS_TOLERANCE).all(axis=1)
+        | (lightness_steps <= _LIGHTNESS_TOLERANCE).all(axis=1),
+        "lightness_range": lab[:, -1, 0] - lab[:, 0, 0],
+        "delta_e_mean": mean,
+        "delta_e_cv": np.where(mean > 0, steps.std(axis=1) / np.where(mean > 0, mean, 1), 0),
+    }
+    for deficiency, matrix in _CVD_MATRICES.items():
+        simulated = _linear_to_lab(np.clip(linear @ matrix.T, 0, 1))
+        metrics[deficiency] = np.where(length > 0, _path_length(simulated).sum(axis=1) / safe, 0)
+    return metrics
+
+
+def _default_cache_dir() -> pathlib.Path:
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "colormap_tool"
+
+
+def _cache_key(namespace: str, names: Iterable[str], luts: np.ndarray) -> str:
+    """Hash the LUT data and names of a namespace, so that any change gives a new cache file."""
+    digest = hashlib.sha256(f"{_METRICS_VERSION}:{namespace}:{','.join(names)}".encode())
+    digest.update(np.ascontiguousarray(luts).data)
+    return digest.hexdigest()[:32]
+
+
+def _load_cached(path: pathlib.Path) -> dict[str, np.ndarray] | None:
+    """Read a cache file written by ``_save_cached``, or return None if it is missing or invalid."""
+    try:
+        records = np.load(path, allow_pickle=False)
+        return {field: records[field] for field in ColormapMetrics._fields}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _save_cached(path: pathlib.Path, metrics: dict[str, np.ndarray]) -> None:
+    """Write the metrics as one structured array, atomically, ignoring read-only file systems."""
+    fields = ColormapMetrics._fields
+    records = np.empty(len(metrics[fields[0]]), dtype=[(field, metrics[field].dtype) for field in fields])
+    for field in fields:
+        records[field] = metrics[field]
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as f:
+            np.save(f, records)
+        tmp.replace(path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def colormap_metrics(namespace: str, *, cache: _CacheDir = False) -> dict[str, ColormapMetrics]:
+    """Compute perceptual metrics of every colormap of a namespace.
+
+    The colormaps, including the ones added to ``CMPSPACE`` by the user, are resampled to
+    256 entries and converted to CIELAB as one (K, 256, 3) block, so auditing a whole
+    namespace costs about as much as a few colormaps converted one by one. See
+    ``ColormapMetrics`` for the metrics.
+
+    With ``cache``, the results are stored on disk in a file named after a hash of the LUT
+    data, so repeated runs only read the file until a colormap is added, removed or changed.
+
+    Parameters
+    ----------
+    namespace : str
+        "cv" (or "cv2", "opencv") for OpenCV, "mpl" (or "matplotlib") for Matplotlib.
+    cache : bool, str or os.PathLike, optional
+        The directory of the disk cache. True uses ``$XDG_CACHE_HOME/colormap_tool`` (by
+        default ``~/.cache/colormap_tool``). Default is False, which computes the metrics
+        without reading or writing any file.
+
+    Returns
+    -------
+    dict[str, ColormapMetrics]
+        Colormap name to its metrics.
+
+    Raises
+    ------
+    ValueError
+        If the namespace is not found.
+
+    Examples
+    --------
+    >>> metrics = colormap_metrics("mpl", cache=True)
+    >>> metrics["viridis"].lightness_monotonic
+    True
+    >>> [name for name, m in metrics.items() if m.deuteranopia < 0.5]
+    [...]
+
+    """
+    namespace = _resolve_namespace(namespace)
+    luts_by_name = resample_all(namespace, _METRICS_SIZE)
+    names = list(luts_by_name)
+    luts = np.stack(list(luts_by_name.values())) if names else np.empty((0, _METRICS_SIZE, 3), np.uint8)
+
+    path = None
+    metrics = None
+    if cache is not False:
+        directory = _default_cache_dir() if cache is True else pathlib.Path(cache)
+        path = directory / f"metrics-{namespace}-{_cache_key(namespace, names, luts)}.npy"
+        metrics = _load_cached(path)
+    if metrics is None:
+        metrics = _compute_metrics(luts)
+        if path is not None:
+            _save_cached(path, metrics)
+
+    columns = [metrics[field].tolist() for field in ColormapMetrics._fields]
+    return {name: ColormapMetrics(*row) for name, row in zip(names, zip(*columns))}
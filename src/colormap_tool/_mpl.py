@@ -7,21 +7,33 @@ with the matplotlib.colormaps registry.
 
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import TYPE_CHECKING, Literal, Optional
+import functools
+from typing import TYPE_CHECKING, Any, Literal, Optional
 
 import numpy as np
 
-from colormap_tool._cmps import CMPSPACE
+from colormap_tool._cmps import _REVERSED_SUFFIX, CMPSPACE, CacheInfo, _get_lut, _lookup, _LRUCache, _resolve
 
 if TYPE_CHECKING:
     from matplotlib.colors import Colormap
 
-_cached_colormaps: dict[str, dict[str, Colormap]] = defaultdict(dict)
+# Colormap objects returned by get_mpl_colormaps, keyed by (namespace, name, n, alpha, mode).
+_COLORMAP_CACHE = _LRUCache(maxsize=128)
 
 _is_registered = False
 
-__all__ = ["get_mpl_colormaps", "register_all_cmps2mpl", "uint8_rgb_arr2mpl_cmp"]
+# Float RGBA colors of every colormap of a namespace, built on first use by _namespace_rgba,
+# together with the CMPSPACE arrays they were built from.
+_namespace_colors: dict[str, tuple[dict[str, np.ndarray], dict[str, np.ndarray]]] = {}
+
+__all__ = [
+    "clear_mpl_cache",
+    "get_mpl_colormaps",
+    "mpl_cache_info",
+    "register_all_cmps2mpl",
+    "set_mpl_cache_size",
+    "uint8_rgb_arr2mpl_cmp",
+]
 
 
 def register_all_cmps2mpl() -> None:
@@ -31,6 +43,10 @@ def register_all_cmps2mpl() -> None:
     and registers each colormap with matplotlib. After calling this function,
     all colormaps can be accessed directly through matplotlib.colormaps.
 
+    Registration is lazy: each name is registered as a lightweight ListedColormap whose
+    colors are only built the first time matplotlib uses it. The float RGBA colors of a
+    whole namespace are then built together in one vectorized pass.
+
     Examples
     --------
     >>> register_all_cmps2mpl()
@@ -48,35 +64,138 @@ def register_all_cmps2mpl() -> None:
     for namespace in CMPSPACE:
         if namespace == "mpl":
             continue
-        for name in CMPSPACE[namespace]:
-            cmp = get_mpl_colormaps(name, namespace)
-            mpl.colormaps.register(cmp)
+        lazy_colormap = _lazy_colormap_class()
+        for name, lut in CMPSPACE[namespace].items():
+            mpl.colormaps.register(lazy_colormap(f"{namespace}.{name}", namespace, name, lut.shape[0]))
     _is_registered = True
 
 
-def get_mpl_colormaps(name: str, namespace: str | None = None) -> Colormap:
+def _uint8_rgb2rgba(arr: np.ndarray, alpha: float) -> np.ndarray:
+    """Convert (..., N, 3) uint8 RGB to (..., N, 4) float RGBA in [0, 1] with a single allocation."""
+    rgba = np.empty((*arr.shape[:-1], 4), dtype=np.float64)
+    np.divide(arr, 255.0, out=rgba[..., :3])
+    rgba[..., 3] = alpha
+    return rgba
+
+
+def _namespace_rgba(namespace: str) -> dict[str, np.ndarray]:
+    """Return the opaque float RGBA colors of every colormap of a namespace.
+
+    Colormaps of the same length are stacked and converted in one vectorized pass, and the
+    result is kept for later calls. It is rebuilt when a colormap of the namespace is added,
+    removed or replaced in ``CMPSPACE``.
+    """
+    luts = CMPSPACE[namespace]
+    cached = _namespace_colors.get(namespace)
+    if cached is not None:
+        sources, colors = cached
+        if sources.keys() == luts.keys() and all(sources[name] is lut for name, lut in luts.items()):
+            return colors
+
+    by_length: dict[int, list[str]] = {}
+    for name, lut in luts.items():
+        by_length.setdefault(lut.shape[0], []).append(name)
+
+    colors = {}
+    for names in by_length.values():
+        rgba = _uint8_rgb2rgba(np.stack([luts[name].reshape(-1, 3) for name in names]), 1.0)
+        colors.update(zip(names, rgba))
+    _namespace_colors[namespace] = (dict(luts), colors)
+    return colors
+
+
+_LAZY_ATTRIBUTES = ("_colors", "_namespace", "_source_name")
+
+
+def _unpickle_listed_colormap(state: dict[str, Any]) -> Colormap:
+    """Restore a pickled lazy colormap as a plain ListedColormap."""
+    from matplotlib.colors import ListedColormap
+
+    cmap = ListedColormap.__new__(ListedColormap)
+    cmap.__dict__.update(state)
+    return cmap
+
+
+@functools.cache
+def _lazy_colormap_class() -> Any:
+    """Return a ListedColormap subclass whose colors are looked up on first use.
+
+    The class is created on first call, since matplotlib is an optional dependency.
+    """
+    from matplotlib.colors import ListedColormap
+
+    class LazyListedColormap(ListedColormap):
+        """A ListedColormap for a CMPSPACE colormap, with colors built when first needed."""
+
+        def __init__(self, name: str, namespace: str, source_name: str, N: int) -> None:
+            # The placeholder only provides the number of colors.
+            super().__init__(range(N), name=name)
+            self._namespace = namespace
+            self._source_name = source_name
+            self._colors: Any = None
+
+        @property
+        def colors(self) -> Any:
+            if self._colors is None:
+                self._colors = _namespace_rgba(self._namespace)[self._source_name]
+            return self._colors
+
+        @colors.setter
+        def colors(self, value: Any) -> None:
+            self._colors = value
+
+        def __reduce__(self) -> tuple[Any, ...]:
+            # This class is created at runtime and cannot be pickled by reference.
+            state = {key: value for key, value in self.__dict__.items() if key not in _LAZY_ATTRIBUTES}
+            state["colors"] = self.colors
+            return _unpickle_listed_colormap, (state,)
+
+    return LazyListedColormap
+
+
+def get_mpl_colormaps(
+    name: str,
+    namespace: str | None = None,
+    n: int | None = None,
+    alpha: float = 1.0,
+    mode: Literal["listed", "linear"] = "listed",
+) -> Colormap:
     """Get a colormap in Matplotlib format.
 
+    Colormaps are kept in a bounded, thread-safe LRU cache keyed by
+    ``(namespace, name, n, alpha, mode)``, so repeated requests do not rebuild the colors.
+    Each call returns a new copy of the cached colormap, which can be modified, e.g. with
+    ``set_bad``, without affecting other callers.
+
     Parameters
     ----------
     name : str
         The name of the colormap. If namespace is None, this should be in the format
-        "namespace.name" (e.g., "cv.VIRIDIS", "mpl.viridis").
+        "namespace.name" (e.g., "cv.VIRIDIS", "mpl.viridis"). Names are case-insensitive,
+        and a "_r" suffix selects the reversed colormap.
     namespace : Optional[str], optional
-        The namespace of the colormap ("cv", "mpl"). If provided, the name
-        parameter should not include the namespace prefix.
+        The namespace of the colormap ("cv", "mpl", or the aliases "cv2", "opencv",
+        "matplotlib"). If provided, the name parameter should not include the namespace prefix.
+    n : Optional[int], optional
+        Number of colors in the colormap. If None, the colormap keeps its 256 entries.
+        Non-matplotlib colormaps are resampled through the shared LUT cache of ``get_colormaps``.
+    alpha : float, optional
+        The alpha (opacity) value for the colormap, by default 1.0 (fully opaque).
+    mode : {"listed", "linear"}, optional
+        The type of colormap to create, see ``uint8_rgb_arr2mpl_cmp``. Default is "listed".
 
     Returns
     -------
     matplotlib.colors.Colormap
         A Matplotlib Colormap object that can be used with matplotlib plotting functions.
-        For matplotlib colormaps (namespace="mpl"), returns the built-in colormap.
-        For other colormaps, converts the numpy array to a Matplotlib ListedColormap.
+        For matplotlib colormaps (namespace="mpl") with the default alpha and mode, returns
+        the built-in colormap. Otherwise, converts the colors to a Matplotlib Colormap.
 
     Raises
     ------
-    AssertionError
-        If the namespace is not recognized or the colormap name is not found in the namespace.
+    ValueError
+        If the namespace is not recognized, the colormap name is not found in the namespace,
+        or the mode is not "listed" or "linear".
 
     Examples
     --------
@@ -92,35 +211,104 @@ def get_mpl_colormaps(name: str, namespace: str | None = None) -> Colormap:
     >>> cmap = get_mpl_colormaps("cv.VIRIDIS")
     >>> plt.imshow(data, cmap=cmap)
 
+    >>> # A half-transparent overlay colormap
+    >>> cmap = get_mpl_colormaps("cv.jet", alpha=0.5)
+
     """
     try:
         import matplotlib as mpl
     except ImportError as err:
         raise ImportError("Missing optional dependency: matplotlib", name="matplotlib") from err
-    if namespace is not None:
-        if "." in name:
-            raise ValueError(f"Namespace {namespace} is provided, so name {name} should not include a dot.")
-    else:
-        namespace, name = name.split(".")
+    namespace, name = _resolve(name, namespace)
+    if mode not in ("listed", "linear"):
+        raise ValueError("mode must be 'listed' or 'linear'")
 
-    namespace = namespace.lower()
-    name = name.lower()
-    if namespace not in CMPSPACE:
-        raise ValueError(f"Namespace {namespace} is not recognized.")
-    if name not in CMPSPACE[namespace]:
-        raise ValueError(f"Colormap {name} is not found in namespace {namespace}.")
+    def build() -> Colormap:
+        if namespace != "mpl":
+            lut = _lookup(namespace, name) if n is None else _get_lut(namespace, name, n)
+            return uint8_rgb_arr2mpl_cmp(lut, f"{namespace}.{name}", alpha=alpha, mode=mode)
 
-    if namespace == "mpl":
-        return mpl.colormaps[name]
-    else:
-        if name not in _cached_colormaps[namespace]:
-            _cached_colormaps[namespace][name] = uint8_rgb_arr2mpl_cmp(
-                CMPSPACE[namespace][name],
-                f"{namespace}.{name}",
-                alpha=1.0,
-                mode="listed",
-            )
-        return _cached_colormaps[namespace][name]
+        cmp = mpl.colormaps[name]
+        if n is not None:
+            cmp = cmp.resampled(n)
+        if alpha == 1.0 and mode == "listed":
+            return cmp
+        return _with_alpha(cmp, alpha, mode)
+
+    cmp: Colormap = _COLORMAP_CACHE.get_or_create((namespace, name, n, float(alpha), mode), build)
+    return cmp.copy()
+
+
+def _with_alpha(cmp: Colormap, alpha: float, mode: Literal["listed", "linear"]) -> Colormap:
+    """Sample a Matplotlib colormap into a new colormap with the given alpha and mode."""
+    from matplotlib.colors import LinearSegmentedColormap, ListedColormap
+
+    colors = cmp(np.arange(cmp.N))
+    colors[:, 3] = alpha
+    if mode == "listed":
+        return ListedColormap(colors, name=cmp.name)
+    return LinearSegmentedColormap.from_list(cmp.name, colors, N=cmp.N)
+
+
+def mpl_cache_info() -> CacheInfo:
+    """Return hit, miss and eviction statistics of the Colormap cache of ``get_mpl_colormaps``.
+
+    Returns
+    -------
+    CacheInfo
+        A named tuple ``(hits, misses, evictions, maxsize, currsize)``.
+
+    """
+    return _COLORMAP_CACHE.info()
+
+
+def clear_mpl_cache(name: str | None = None, namespace: str | None = None) -> None:
+    """Remove Colormap objects from the cache of ``get_mpl_colormaps``.
+
+    Without a name, the whole cache is emptied and its statistics are reset. With a name,
+    only the cached variants of that colormap (any n, alpha, mode, and its reversed version)
+    are removed. Call this after replacing a colormap in ``CMPSPACE``, together with
+    ``clear_cache``.
+
+    Parameters
+    ----------
+    name : str, optional
+        The colormap to invalidate, in the format accepted by ``get_mpl_colormaps``.
+    namespace : str, optional
+        The namespace of the colormap, if not included in name.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not found.
+
+    """
+    if name is None:
+        _COLORMAP_CACHE.clear()
+        return
+    namespace, name = _resolve(name, namespace)
+    base = name.removesuffix(_REVERSED_SUFFIX)
+    names = {base, base + _REVERSED_SUFFIX}
+    _COLORMAP_CACHE.invalidate(lambda key: key[0] == namespace and key[1] in names)
+
+
+def set_mpl_cache_size(maxsize: int) -> None:
+    """Set the maximum number of Colormap objects kept in the cache of ``get_mpl_colormaps``.
+
+    Least recently used colormaps are evicted when the cache is full. 0 disables caching.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of cached colormaps. Default is 128.
+
+    Raises
+    ------
+    ValueError
+        If maxsize is negative.
+
+    """
+    _COLORMAP_CACHE.resize(maxsize)
 
 
 def uint8_rgb_arr2mpl_cmp(
@@ -181,11 +369,7 @@ def uint8_rgb_arr2mpl_cmp(
         raise ValueError(f"The dtype of the input array {arr.dtype} is not uint8.")
 
     # convert [0-255] uint8 to [0-1] float
-    arr = arr.astype(np.float64) / 255.0
-
-    alpha = np.full((arr.shape[0], 1), alpha)
-
-    arr = np.concatenate((arr, alpha), axis=1)
+    arr = _uint8_rgb2rgba(arr, alpha)
 
     if mode == "listed":
         return ListedColormap(arr, name=name)
@@ -0,0 +1,541 @@
+"""Normalizations composed with colormaps.
+
+This module maps integer data through a display transform, such as a window/level, a gamma
+curve or a log scale, and a colormap in one step. ``Normalize`` describes the transform, and
+each (colormap, normalization, input dtype) combination is composed once into a lookup table
+with one color per possible input value, kept in the LUT cache. Colorizing a frame is then a
+single gather, whatever the transform.
+
+Banded (discrete) colormaps, e.g. isotherm bands between explicit boundaries, are built the
+same way: integer input goes through one dense value-to-color table, and float input through
+a uniform grid of cells that each hold at most one boundary, so that finding the band of a
+value takes one comparison instead of a binary search.
+"""
+
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+import numpy as np
+
+from colormap_tool._cmps import _LUT_CACHE, _get_lut, _resolve
+from colormap_tool._cv import (
+    _CHUNK_SIZE,
+    _DEFAULT_N,
+    _FLOAT_DTYPES,
+    _INT_DTYPES,
+    _check_dst,
+    _check_workers,
+    _extreme_colors,
+    _Extremes,
+    _run_tiles,
+    _split_masked,
+    _take,
+    _take_chunks,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.typing import ArrayLike, DTypeLike
+
+__all__ = [
+    "Normalize",
+    "apply_colormap_banded",
+    "apply_colormap_normalized",
+    "get_banded_lut",
+    "get_normalized_lut",
+]
+
+_MODES = ("linear", "gamma", "power", "log", "symlog")
+
+# Maximum number of cells of the grid that maps float values to bands. Boundaries too close
+# together for it fall back to a binary search.
+_MAX_CELLS = 1 << 16
+
+
+class Normalize(NamedTuple):
+    """A mapping of data values in [vmin, vmax] onto [0, 1].
+
+    Values are clipped to [vmin, vmax] first. The modes are:
+
+    - "linear": ``t = (x - vmin) / (vmax - vmin)``.
+    - "gamma": ``t ** (1 / gamma)``, a display gamma; gamma above 1 brightens dark values.
+    - "power": ``t ** gamma``, like matplotlib's ``PowerNorm``.
+    - "log": ``log(x / vmin) / log(vmax / vmin)``. Requires ``0 < vmin``.
+    - "symlog": linear scaling of ``sign(x) * log1p(|x| / linthresh)``, which is close to linear
+      within ``linthresh`` of zero and logarithmic further out, for data of both signs.
+
+    Normalizations are hashable, so they key the cached lookup tables.
+
+    Examples
+    --------
+    >>> Normalize(20.0, 40.0)
+    >>> Normalize.window(level=1000, width=400, mode="gamma", gamma=2.2)
+    >>> Normalize(1, 65535, mode="log")
+
+    """
+
+    vmin: float
+    vmax: float
+    mode: Literal["linear", "gamma", "power", "log", "symlog"] = "linear"
+    gamma: float = 1.0
+    linthresh: float = 1.0
+
+    @classmethod
+    def window(
+        cls,
+        level: float,
+        width: float,
+        mode: Literal["linear", "gamma", "power", "log", "symlog"] = "linear",
+        gamma: float = 1.0,
+        linthresh: float = 1.0,
+    ) -> Normalize:
+        """Return the normalization of the window centered on ``level`` and ``width`` wide."""
+        return cls(level - width / 2, level + width / 2, mode, gamma, linthresh)
+
+    def check(self) -> None:
+        """Raise ValueError if the parameters are invalid."""
+        if self.mode not in _MODES:
+            raise ValueError(f"mode must be one of {', '.join(map(repr, _MODES))}, got {self.mode!r}.")
+        if not self.vmin <= self.vmax:
+            raise ValueError(f"vmin {self.vmin} must be less than or equal to vmax {self.vmax}.")
+        if self.mode == "log" and not self.vmin > 0:
+            raise ValueError(f"vmin must be positive for log normalization, got {self.vmin}.")
+        if not self.gamma > 0:
+            raise ValueError(f"gamma must be positive, got {self.gamma}.")
+        if not self.linthresh > 0:
+            raise ValueError(f"linthresh must be positive, got {self.linthresh}.")
+
+    def __call__(self, values: ArrayLike) -> np.ndarray:
+        """Return the normalized float64 values in [0, 1]. NaN values stay NaN."""
+        self.check()
+        x = np.clip(np.asarray(values, dtype=np.float64), self.vmin, self.vmax)
+        t: np.ndarray
+        if self.vmax == self.vmin:
+            t = np.where(np.isnan(x), np.nan, 0.0)
+        elif self.mode == "log":
+            t = np.log(x / self.vmin) / np.log(self.vmax / self.vmin)
+        elif self.mode == "symlog":
+            x, lo, hi = (np.sign(v) * np.log1p(np.abs(v) / self.linthresh) for v in (x, self.vmin, self.vmax))
+            t = (x - lo) / (hi - lo)
+        else:
+            t = (x - self.vmin) / (self.vmax - self.vmin)
+            if self.mode == "gamma":
+                t **= 1 / self.gamma
+            elif self.mode == "power":
+                t **= self.gamma
+        return t
+
+
+def _build_table(lut: np.ndarray, norm: Normalize, dtype: np.dtype) -> np.ndarray:
+    """Compose ``norm`` with an (n, 3) LUT into a read-only table with one color per value of ``dtype``."""
+    t = norm(np.arange(np.iinfo(dtype).max + 1))
+    indices = np.rint(t * (lut.shape[0] - 1)).astype(np.intp)
+    table: np.ndarray = lut[indices].reshape(-1, 1, 3)
+    table.flags.writeable = False
+    return table
+
+
+def get_normalized_lut(
+    name: str,
+    norm: Normalize,
+    namespace: str | None = None,
+    dtype: DTypeLike = np.uint8,
+    n: int | None = None,
+    order: Literal["bgr", "rgb"] = "bgr",
+) -> np.ndarray:
+    """Return a colormap composed with a normalization, as a LUT indexed by raw input values.
+
+    The LUT has one entry per value of ``dtype``: ``norm`` is applied to every possible value
+    once, and the result picks a color from the colormap resampled to ``n`` entries. LUTs are
+    kept in the LUT cache (see ``cache_info``) per colormap, normalization, dtype, ``n`` and
+    order, so changing the window or the colormap only builds a new table of at most 65536
+    entries. The returned array is read-only.
+
+    A uint8 LUT in BGR order has shape (256, 1, 3), so it can also be passed to
+    ``cv2.applyColorMap``.
+
+    Parameters
+    ----------
+    name : str
+        Colormap name. If namespace is None, use "namespace.name" format. Names are
+        case-insensitive, and a ``_r`` suffix selects the reversed colormap.
+    norm : Normalize
+        The normalization applied before the colormap.
+    namespace : str, optional
+        "cv" (or "cv2", "opencv") for OpenCV, "mpl" (or "matplotlib") for Matplotlib.
+    dtype : numpy dtype, optional
+        The input dtype, uint8 (256 entries) or uint16 (65536 entries). Default is uint8.
+    n : int, optional
+        Number of entries the colormap is resampled to before the composition. Default is 4096.
+    order : {"bgr", "rgb"}, optional
+        The channel order. Default is "bgr", as for ``get_cv_colormaps``.
+
+    Returns
+    -------
+    numpy.ndarray
+        (256, 1, 3) or (65536, 1, 3) uint8 LUT, read-only.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not found, or the normalization, dtype, n or order is invalid.
+
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in _INT_DTYPES:
+        raise ValueError(f"The dtype {dtype} is not uint8 or uint16.")
+    if order not in ("bgr", "rgb"):
+        raise ValueError(f"order must be 'bgr' or 'rgb', got {order!r}.")
+    norm.check()
+    namespace, name = _resolve(name, namespace)
+    n = _DEFAULT_N if n is None else n
+    if n < 1:
+        raise ValueError(f"The number of LUT entries must be at least 1, got {n}.")
+    lut = _get_lut(namespace, name, n)
+    if order == "bgr":
+        lut = lut[:, ::-1]
+
+    key = ("norm", namespace, name, norm, dtype.str, n, order)
+    cached: np.ndarray = _LUT_CACHE.get_or_create(key, lambda: _build_table(lut, norm, dtype))
+    return cached
+
+
+def apply_colormap_normalized(
+    src: np.ndarray,
+    name: str,
+    norm: Normalize,
+    dst: np.ndarray | None = None,
+    workers: int | None = 1,
+    namespace: str | None = None,
+    n: int | None = None,
+    order: Literal["bgr", "rgb"] = "bgr",
+) -> np.ndarray:
+    """Apply a normalization and a colormap to integer data in one gather.
+
+    The composed LUT from ``get_normalized_lut`` is indexed by the raw values, so the frame is
+    read once and no intermediate array is created, whatever the normalization.
+
+    Parameters
+    ----------
+    src : numpy.ndarray
+        The image to colorize, with dtype uint8 or uint16.
+    name : str
+        Colormap name, see ``get_normalized_lut``.
+    norm : Normalize
+        The normalization applied before the colormap.
+    dst : numpy.ndarray, optional
+        The output array to store the result, with shape ``src.shape + (3,)``, dtype uint8 and
+        C-contiguous memory. If None, a new array will be created.
+    workers : int, optional
+        Number of threads used for the gather, see ``apply_colormap_with_numpy``. Default is 1.
+    namespace, n, order : optional
+        See ``get_normalized_lut``.
+
+    Returns
+    -------
+    numpy.ndarray
+        The output array with the colormap applied. This is ``dst`` when it is provided.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not found, or the input, normalization or output array is invalid.
+
+    Examples
+    --------
+    >>> norm = Normalize.window(level=30000, width=8000, mode="gamma", gamma=2.2)
+    >>> frame_buf = np.empty((512, 640, 3), dtype=np.uint8)
+    >>> for frame in frames:
+    ...     apply_colormap_normalized(frame, "mpl.inferno", norm, dst=frame_buf)
+
+    """
+    if src.dtype not in _INT_DTYPES:
+        raise ValueError(f"The dtype of the input array {src.dtype} is not uint8 or uint16.")
+    workers = _check_workers(workers)
+    table = get_normalized_lut(name, norm, namespace, src.dtype, n, order).reshape(-1, 3)
+
+    if dst is None:
+        dst = np.empty((*src.shape, 3), dtype=np.uint8)
+    else:
+        _check_dst(dst, (*src.shape, 3))
+
+    if src.size > 0:
+        _run_tiles(partial(_take_chunks, table, None), src, dst, workers)
+    return dst
+
+
+class _BandGrid(NamedTuple):
+    """A uniform grid over the boundaries that maps float values of one dtype to bands.
+
+    Cell ``c`` starts at ``start + c / scale``. Each cell, widened by a quarter of a cell on
+    either side to absorb rounding, holds at most one boundary, so a value in the cell is in
+    band ``entries[2 * c + (value >= thresholds[c])]``. Thresholds are the boundaries rounded
+    up to the input dtype, so the comparison is exact, or +inf for cells without one.
+    """
+
+    start: float
+    scale: float
+    cells: int
+    entries: np.ndarray
+    thresholds: np.ndarray
+
+
+def _check_boundaries(boundaries: ArrayLike) -> np.ndarray:
+    """Return the boundaries as a float64 array, or raise ValueError if they are invalid."""
+    b = np.asarray(boundaries, dtype=np.float64)
+    if b.ndim != 1 or b.size < 2:
+        raise ValueError(f"boundaries must be a 1-D sequence of at least 2 values, got shape {b.shape}.")
+    if not np.all(np.isfinite(b)) or not np.all(np.diff(b) > 0):
+        raise ValueError("boundaries must be finite and strictly increasing.")
+    return b
+
+
+def _build_grid(boundaries: np.ndarray, dtype: np.dtype) -> _BandGrid | None:
+    """Return the band grid of the boundaries for float input, or None if it cannot be exact."""
+    b0, span = boundaries[0], boundaries[-1] - boundaries[0]
+    cells = int(np.ceil(2 * span / np.diff(boundaries).min()))
+    cell = span / cells
+    margin = cell / 4
+    limit = dtype.type(max(abs(boundaries[0]), abs(boundaries[-1])))
+    if cells > _MAX_CELLS or not np.isfinite(limit) or margin < 4 * np.spacing(limit):
+        return None
+
+    starts = b0 + np.arange(cells) * cell
+    base = np.searchsorted(boundaries, starts - margin, side="right")
+    top = np.searchsorted(boundaries, starts + cell + margin, side="right")
+    nearest = boundaries[np.minimum(base, boundaries.size - 1)]
+    rounded = nearest.astype(dtype)
+    rounded = np.where(rounded < nearest, np.nextafter(rounded, dtype.type(np.inf)), rounded)
+    thresholds = np.where(top > base, rounded, dtype.type(np.inf)).astype(dtype)
+    entries = (base[:, None] + np.arange(2)).reshape(-1)
+    return _BandGrid(float(b0), 1 / cell, cells, entries, thresholds)
+
+
+def _band_chunks(
+    boundaries: np.ndarray,
+    grid: _BandGrid | None,
+    table: np.ndarray,
+    nan: bool,
+    src: np.ndarray,
+    dst: np.ndarray,
+    mask: np.ndarray | None,
+) -> None:
+    """Map flat float ``src`` to table indices and gather ``table`` into ``dst``, one chunk at a time.
+
+    Without ``grid``, the table holds the under color, the band colors, the over color and
+    the bad color, and is indexed by a binary search. With ``grid``, the table holds the two
+    candidate colors of each cell, then the bad color, and is indexed by ``2 * cell`` plus
+    the comparison with the cell's threshold. With ``nan``, NaN values get the bad color;
+    otherwise they keep the entry they were mapped to.
+    """
+    size = min(src.shape[0], _CHUNK_SIZE)
+    indices = np.empty(size, dtype=np.intp)
+    values = np.empty(size if grid is not None else 0, dtype=src.dtype)
+    flags = np.empty(size, dtype=bool)
+    bad_index = table.shape[0] - 1
+    for start in range(0, src.shape[0], _CHUNK_SIZE):
+        chunk = src[start : start + _CHUNK_SIZE]
+        k = chunk.shape[0]
+        i, f = indices[:k], flags[:k]
+        if grid is None:
+            i[...] = np.searchsorted(boundaries, chunk, side="right")
+        else:
+            v = values[:k]
+            np.subtract(chunk, grid.start, out=v)
+            np.multiply(v, grid.scale, out=v)
+            # fmax and fmin clip like np.clip, and also replace NaN with 0.
+            np.fmax(v, 0, out=v)
+            np.fmin(v, grid.cells - 1, out=v)
+            np.copyto(i, v, casting="unsafe")
+            np.take(grid.thresholds, i, out=v, mode="clip")
+            np.greater_equal(chunk, v, out=f)
+            i <<= 1
+            i += f
+        if nan:
+            np.isnan(chunk, out=f)
+            np.copyto(i, bad_index, where=f)
+        if mask is not None:
+            np.copyto(i, bad_index, where=mask[start : start + k])
+        _take(table, i, dst[start : start + k])
+
+
+def _band_colors(
+    name: str,
+    boundaries: np.ndarray,
+    namespace: str | None,
+    order: str,
+    under: Sequence[int] | None,
+    over: Sequence[int] | None,
+    bad: Sequence[int] | None,
+) -> tuple[np.ndarray, _Extremes]:
+    """Return the (k + 3, 3) table of the under, band, over and bad colors, and the extreme colors."""
+    if order not in ("bgr", "rgb"):
+        raise ValueError(f"order must be 'bgr' or 'rgb', got {order!r}.")
+    namespace, name = _resolve(name, namespace)
+    bands = _get_lut(namespace, name, boundaries.size - 1)
+    if order == "bgr":
+        bands = bands[:, ::-1]
+    extremes = _extreme_colors(bands, under, over, bad, masked=False)
+    if extremes is None:
+        extremes = _Extremes(bands[[0, -1, 0]], under=False, over=False, bad=False)
+    return np.concatenate([extremes.colors[:1], bands, extremes.colors[1:]]), extremes
+
+
+def get_banded_lut(
+    name: str,
+    boundaries: ArrayLike,
+    namespace: str | None = None,
+    dtype: DTypeLike = np.uint8,
+    order: Literal["bgr", "rgb"] = "bgr",
+    under: Sequence[int] | None = None,
+    over: Sequence[int] | None = None,
+) -> np.ndarray:
+    """Return a banded colormap as a LUT indexed by raw integer values.
+
+    The k bands between ``k + 1`` boundaries get k colors sampled evenly from the colormap
+    with ``resample_lut``, like matplotlib's ``BoundaryNorm`` with a ``ListedColormap``:
+    values ``v`` with ``boundaries[i] <= v < boundaries[i + 1]`` get color ``i``. The LUT has
+    one entry per value of ``dtype`` and is kept in the LUT cache (see ``cache_info``). The
+    returned array is read-only.
+
+    Parameters
+    ----------
+    name : str
+        Colormap name. If namespace is None, use "namespace.name" format. Names are
+        case-insensitive, and a ``_r`` suffix selects the reversed colormap.
+    boundaries : array_like
+        The strictly increasing band boundaries, in input units.
+    namespace : str, optional
+        "cv" (or "cv2", "opencv") for OpenCV, "mpl" (or "matplotlib") for Matplotlib.
+    dtype : numpy dtype, optional
+        The input dtype, uint8 (256 entries) or uint16 (65536 entries). Default is uint8.
+    order : {"bgr", "rgb"}, optional
+        The channel order. Default is "bgr", as for ``get_cv_colormaps``.
+    under, over : sequence of int, optional
+        Colors, in ``order``, for values below the first boundary and from the last boundary
+        up. Default is the first and last band colors.
+
+    Returns
+    -------
+    numpy.ndarray
+        (256, 1, 3) or (65536, 1, 3) uint8 LUT, read-only.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not found, or the boundaries, dtype, order or colors are invalid.
+
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in _INT_DTYPES:
+        raise ValueError(f"The dtype {dtype} is not uint8 or uint16.")
+    b = _check_boundaries(boundaries)
+    colors = _band_colors(name, b, namespace, order, under, over, None)[0][:-1]
+
+    def build() -> np.ndarray:
+        values = np.arange(np.iinfo(dtype).max + 1)
+        table: np.ndarray = colors[np.searchsorted(b, values, side="right")].reshape(-1, 1, 3)
+        table.flags.writeable = False
+        return table
+
+    key = ("banded", *_resolve(name, namespace), tuple(b), dtype.str, order, colors[0].tobytes(), colors[-1].tobytes())
+    cached: np.ndarray = _LUT_CACHE.get_or_create(key, build)
+    return cached
+
+
+def apply_colormap_banded(
+    src: np.ndarray,
+    name: str,
+    boundaries: ArrayLike,
+    dst: np.ndarray | None = None,
+    workers: int | None = 1,
+    namespace: str | None = None,
+    order: Literal["bgr", "rgb"] = "bgr",
+    under: Sequence[int] | None = None,
+    over: Sequence[int] | None = None,
+    bad: Sequence[int] | None = None,
+) -> np.ndarray:
+    """Apply a banded (discrete) colormap, with one color per interval between boundaries.
+
+    Bands are defined as in ``get_banded_lut``. uint8 and uint16 input is colorized through
+    that LUT in one gather. Float input is mapped onto a uniform grid of cells over the
+    boundaries, fine enough that each cell holds at most one boundary, so each value needs
+    one comparison with that boundary. The grid is built once per set of boundaries and
+    input dtype, and kept in the LUT cache. Boundaries too close together for a grid of
+    65536 cells fall back to ``np.searchsorted``. Either way, values exactly on a boundary
+    get the band above it.
+
+    The threshold lookup and comparison per value make the float path about 1.5 times slower
+    than the continuous float path of ``apply_colormap_with_numpy``. For integer input, both
+    cost a single gather.
+
+    Parameters
+    ----------
+    src : numpy.ndarray
+        The image to colorize, with dtype uint8, uint16, float32 or float64. May be a masked
+        array, whose masked elements get the bad color.
+    name : str
+        Colormap name, see ``get_banded_lut``.
+    boundaries : array_like
+        The strictly increasing band boundaries, in input units.
+    dst : numpy.ndarray, optional
+        The output array to store the result, with shape ``src.shape + (3,)``, dtype uint8 and
+        C-contiguous memory. If None, a new array will be created.
+    workers : int, optional
+        Number of threads used for the gather, see ``apply_colormap_with_numpy``. Default is 1.
+    namespace, order, under, over : optional
+        See ``get_banded_lut``.
+    bad : sequence of int, optional
+        Color for NaN values and masked elements. Default is the first band color.
+
+    Returns
+    -------
+    numpy.ndarray
+        The output array with the colormap applied. This is ``dst`` when it is provided.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not found, or the input, boundaries, colors or output array is invalid.
+
+    Examples
+    --------
+    >>> # Ten isotherm bands from 20 to 80 degrees, cold and hot spots in gray
+    >>> bands = np.linspace(20.0, 80.0, 11)
+    >>> apply_colormap_banded(thermal, "mpl.inferno", bands, under=(64, 64, 64), over=(192, 192, 192))
+
+    """
+    src, mask = _split_masked(src)
+    if src.dtype not in _INT_DTYPES + _FLOAT_DTYPES:
+        raise ValueError(f"The dtype of the input array {src.dtype} is not uint8, uint16, float32 or float64.")
+    workers = _check_workers(workers)
+    b = _check_boundaries(boundaries)
+
+    if dst is None:
+        dst = np.empty((*src.shape, 3), dtype=np.uint8)
+    else:
+        _check_dst(dst, (*src.shape, 3))
+
+    colors, extremes = _band_colors(name, b, namespace, order, under, over, bad)
+    if src.dtype in _INT_DTYPES:
+        table = get_banded_lut(name, b, namespace, src.dtype, order, under, over).reshape(-1, 3)
+        if mask is not None:
+            table = np.concatenate([table, colors[-1:]])
+        take = partial(_take_chunks, table, None)
+    else:
+        grid: _BandGrid | None = _LUT_CACHE.get_or_create(
+            ("band grid", tuple(b), src.dtype.str),
+            lambda: _build_grid(b, src.dtype),
+        )
+        if grid is not None:
+            colors = np.concatenate([colors[grid.entries], colors[-1:]])
+        # On the grid, NaN values get the under color, which is the default bad color.
+        nan = grid is None or extremes.under or extremes.bad
+        take = partial(_band_chunks, b, grid, colors, nan)
+
+    if src.size > 0:
+        _run_tiles(take, src, dst, workers, mask)
+    return dst
@@ -0,0 +1,443 @@
+"""Streaming colorization utilities.
+
+This module provides a generator that colorizes an iterable of frames (e.g. a long video
+recording) with constant memory. The colormap is resolved once, output frames are written
+into a small ring of preallocated buffers, and decoding and colorization can optionally run
+on background threads connected by bounded queues.
+
+For mostly-static scenes, such as fixed-mount cameras, ``IncrementalColorizer`` keeps the
+previous frame and its colorized output, and only colorizes the tiles that changed.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import numpy as np
+
+from colormap_tool._cmps import _get_bgr_lut, _resolve
+from colormap_tool._cv import (
+    _check_input,
+    _gather_table,
+    _Scaling,
+    _take_chunks,
+    _value_range,
+    apply_colormap_with_numpy,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from colormap_tool._autorange import AutoRange
+
+__all__ = ["IncrementalColorizer", "colorize_stream"]
+
+# Seconds between checks of the stop event while a pipeline thread waits on a queue.
+_POLL_INTERVAL = 0.05
+# Fraction of the displayed span that an estimated range of integer frames must move by
+# before its table is rebuilt; smaller moves are within one color of a 256-entry colormap.
+_RANGE_TOLERANCE = 1 / 256
+
+
+class _Done:
+    """Marks the end of a stage's output."""
+
+
+class _Failed:
+    """Carries an exception raised in a pipeline thread to the consumer."""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put an item on a bounded queue, giving up when the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_INTERVAL)
+        except queue.Full:
+            continue
+        return True
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    """Get an item from a queue, returning _Done when the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return _Done
+
+
+def _hold_range(held: tuple[float, float] | None, low: float, high: float) -> tuple[float, float]:
+    """Return ``held`` if neither bound of (low, high) moved by more than the tolerance, else (low, high)."""
+    if held is not None:
+        tolerance = (held[1] - held[0]) * _RANGE_TOLERANCE
+        if abs(low - held[0]) <= tolerance and abs(high - held[1]) <= tolerance:
+            return held
+    return low, high
+
+
+def colorize_stream(
+    frames: Iterable[np.ndarray],
+    cmap: str | np.ndarray,
+    *,
+    vmin: float | None = None,
+    vmax: float | None = None,
+    n: int | None = None,
+    workers: int | None = 1,
+    buffers: int = 1,
+    prefetch: int = 0,
+    autorange: AutoRange | None = None,
+) -> Iterator[np.ndarray]:
+    """Colorize a stream of frames with constant memory.
+
+    The colormap is resolved once, and every frame is colorized with
+    ``apply_colormap_with_numpy`` into one of a small ring of reused output buffers. Memory
+    use therefore does not depend on the length of the stream.
+
+    With ``prefetch > 0``, reading frames from ``frames`` (e.g. decoding a video) and
+    colorizing them each run on a background thread, connected by bounded queues of
+    ``prefetch`` frames. This overlaps I/O, the LUT gather and the caller's own processing.
+
+    Parameters
+    ----------
+    frames : Iterable[numpy.ndarray]
+        The input frames, each with a dtype accepted by ``apply_colormap_with_numpy``. With
+        ``prefetch > 0``, the iterable must yield a new array for every frame, since frames
+        are queued before they are colorized.
+    cmap : str or numpy.ndarray
+        A colormap name accepted by ``get_cv_colormaps`` (the output is then in BGR order, as
+        with OpenCV), or a (256, 1, 3) uint8 LUT.
+    vmin, vmax : float, optional
+        The data range mapped onto the colormap, see ``apply_colormap_with_numpy``. Missing
+        bounds are computed per frame.
+    n : int, optional
+        Number of LUT entries for high-bit-depth input, see ``apply_colormap_with_numpy``.
+    workers : int, optional
+        Number of threads used for the LUT gather of each frame. Default is 1.
+    buffers : int, optional
+        Number of most recently yielded frames that stay valid. Older output buffers are
+        overwritten, so copy a frame to keep it longer. Default is 1 (a yielded frame is valid
+        until the next one is requested).
+    prefetch : int, optional
+        Number of frames read and colorized ahead on background threads. Default is 0
+        (no threads).
+    autorange : AutoRange, optional
+        Estimates the range of each frame from its percentiles, smoothed over time. A bound
+        given as vmin or vmax takes precedence over the estimated one. For integer frames, the
+        displayed range only follows the estimate once a bound moves by more than 1/256 of
+        its span, so the composed table of uint16 input is not rebuilt on every frame.
+
+    Yields
+    ------
+    numpy.ndarray
+        The colorized frames, with shape ``frame.shape + (3,)`` and dtype uint8.
+
+    Raises
+    ------
+    ValueError
+        If ``buffers`` or ``prefetch`` is invalid, or a frame cannot be colorized.
+
+    Examples
+    --------
+    >>> frames = (read_thermal_frame(f) for f in sorted(paths))
+    >>> for color in colorize_stream(frames, "mpl.inferno", vmin=20.0, vmax=80.0, prefetch=4):
+    ...     writer.write(color)
+
+    >>> # Auto-contrast between the 2nd and 98th percentiles
+    >>> for color in colorize_stream(frames, "mpl.inferno", autorange=AutoRange(2, 98)):
+    ...     writer.write(color)
+
+    """
+    if buffers < 1:
+        raise ValueError(f"The number of buffers must be at least 1, got {buffers}.")
+    if prefetch < 0:
+        raise ValueError(f"The number of prefetched frames must be non-negative, got {prefetch}.")
+
+    lut = _get_bgr_lut(*_resolve(cmap)) if isinstance(cmap, str) else cmap
+    # While the caller holds `buffers` frames, `prefetch` more can be queued and one more written.
+    ring: list[np.ndarray | None] = [None] * (buffers + prefetch + (1 if prefetch else 0))
+    held: tuple[float, float] | None = None
+
+    def colorize(index: int, frame: np.ndarray) -> np.ndarray:
+        nonlocal held
+        slot = index % len(ring)
+        out = ring[slot]
+        if out is None or out.shape != (*frame.shape, 3):
+            out = ring[slot] = np.empty((*frame.shape, 3), dtype=np.uint8)
+        lo, hi = vmin, vmax
+        if autorange is not None:
+            low, high = autorange.update(frame)
+            lo = low if vmin is None else vmin
+            hi = high if vmax is None else vmax
+            if frame.dtype.kind in "ui":
+                lo, hi = held = _hold_range(held, lo, hi)
+        return apply_colormap_with_numpy(frame, lut, dst=out, workers=workers, vmin=lo, vmax=hi, n=n)
+
+    if not prefetch:
+        for index, frame in enumerate(frames):
+            yield colorize(index, frame)
+        return
+
+    yield from _pipeline(frames, colorize, prefetch)
+
+
+def _pipeline(frames: Iterable[np.ndarray], colorize: Any, prefetch: int) -> Iterator[np.ndarray]:
+    """Run the read and colorize stages on background threads and yield their output."""
+    stop = threading.Event()
+    decoded: queue.Queue = queue.Queue(maxsize=prefetch)
+    colored: queue.Queue = queue.Queue(maxsize=prefetch)
+
+    def read() -> None:
+        try:
+            for frame in frames:
+                if not _put(decoded, frame, stop):
+                    return
+        except BaseException as err:
+            _put(decoded, _Failed(err), stop)
+        else:
+            _put(decoded, _Done, stop)
+
+    def convert() -> None:
+        index = 0
+        while True:
+            item = _get(decoded, stop)
+            if item is _Done or isinstance(item, _Failed):
+                _put(colored, item, stop)
+                return
+            try:
+                result = colorize(index, item)
+            except BaseException as err:
+                _put(colored, _Failed(err), stop)
+                return
+            if not _put(colored, result, stop):
+                return
+            index += 1
+
+    threads = [
+        threading.Thread(target=read, name="colormap_tool-read", daemon=True),
+        threading.Thread(target=convert, name="colormap_tool-colorize", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            item = colored.get()
+            if item is _Done:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        # Also reached when the caller stops iterating early: unblock and wait for the threads.
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+class DirtyRect(NamedTuple):
+    """A rectangle of changed pixels, in pixels from the top-left corner of the frame."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+class _IncrementalState(NamedTuple):
+    """The previous frame and output of an ``IncrementalColorizer``, and its gather table."""
+
+    prev: np.ndarray
+    out: np.ndarray
+    changed: np.ndarray  # per-pixel changed flags, padded to whole tiles
+    key: tuple[Any, ...]  # (dtype, vmin, vmax) that the table was built for
+    table: np.ndarray
+    scaling: _Scaling | None
+
+
+class IncrementalColorizer:
+    """Colorize a sequence of frames, redoing only the tiles that changed.
+
+    Each frame is compared with the previous one in a single vectorized pass, and reduced to
+    one changed flag per tile. Only the changed tiles are colorized again; the rest of the
+    output buffer is kept from the previous frame. Horizontally and vertically adjacent
+    changed tiles are merged into rectangles, which ``update`` returns so that encoders and
+    network senders can ship only the changed regions.
+
+    Frames are compared by value (float frames bit by bit), so sensor noise makes tiles
+    dirty. Without a fixed ``vmin`` and ``vmax``, the data range is computed per frame, and
+    a change of range recolors the whole frame.
+
+    Parameters
+    ----------
+    cmap : str or numpy.ndarray
+        A colormap name accepted by ``get_cv_colormaps`` (the output is then in BGR order, as
+        with OpenCV), or a (256, 1, 3) uint8 LUT.
+    tile : int or tuple of int, optional
+        The tile size, as one int or a (height, width) pair. Smaller tiles recolor fewer
+        unchanged pixels, but give more rectangles. Default is 32.
+    vmin, vmax : float, optional
+        The data range mapped onto the colormap, see ``apply_colormap_with_numpy``.
+    n : int, optional
+        Number of LUT entries for high-bit-depth input, see ``apply_colormap_with_numpy``.
+
+    Raises
+    ------
+    ValueError
+        If the colormap is not found or the tile size is invalid.
+
+    Examples
+    --------
+    >>> colorizer = IncrementalColorizer("mpl.inferno", vmin=20.0, vmax=40.0)
+    >>> for frame in camera:
+    ...     color, rects = colorizer.update(frame)
+    ...     for x, y, w, h in rects:
+    ...         sender.send_region(x, y, color[y : y + h, x : x + w])
+
+    """
+
+    def __init__(
+        self,
+        cmap: str | np.ndarray,
+        *,
+        tile: int | tuple[int, int] = 32,
+        vmin: float | None = None,
+        vmax: float | None = None,
+        n: int | None = None,
+    ) -> None:
+        tile_height, tile_width = (tile, tile) if isinstance(tile, int) else tile
+        if tile_height < 1 or tile_width < 1:
+            raise ValueError(f"The tile size must be positive, got {tile}.")
+        self._tile = (tile_height, tile_width)
+        self._lut = _get_bgr_lut(*_resolve(cmap)) if isinstance(cmap, str) else cmap
+        self._vmin = vmin
+        self._vmax = vmax
+        self._n = n
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the previous frame, so that the next frame is colorized in full."""
+        self._state: _IncrementalState | None = None
+
+    @property
+    def output(self) -> np.ndarray | None:
+        """The colorized previous frame, or None before the first update."""
+        return None if self._state is None else self._state.out
+
+    def _prepare(self, frame: np.ndarray) -> tuple[_IncrementalState, bool]:
+        """Validate a frame and return the state to update, and whether to recolor everything."""
+        _check_input(frame, self._lut, 1)
+        if frame.ndim != 2:
+            raise ValueError(f"The shape of the frame {frame.shape} is not (H, W).")
+        vmin, vmax = self._vmin, self._vmax
+        if frame.dtype != np.uint8 or vmin is not None or vmax is not None:
+            vmin, vmax = _value_range(frame, vmin, vmax)
+        key = (frame.dtype, vmin, vmax)
+
+        state = self._state
+        if state is not None and state.prev.shape == frame.shape and state.key == key:
+            return state, False
+        if state is not None and state.prev.shape == frame.shape:
+            table, scaling, _ = _gather_table(frame, self._lut.reshape(256, 3), vmin, vmax, self._n)
+            state = state._replace(prev=np.empty_like(frame), key=key, table=table, scaling=scaling)
+        else:
+            height, width = frame.shape
+            tile_height, tile_width = self._tile
+            # Padded to whole tiles; the padding is never written, so it never counts as changed.
+            padded = (-(-height // tile_height) * tile_height, -(-width // tile_width) * tile_width)
+            table, scaling, _ = _gather_table(frame, self._lut.reshape(256, 3), vmin, vmax, self._n)
+            state = _IncrementalState(
+                np.empty_like(frame),
+                np.empty((height, width, 3), dtype=np.uint8),
+                np.zeros(padded, dtype=bool),
+                key,
+                table,
+                scaling,
+            )
+        self._state = state
+        return state, True
+
+    def _dirty_tiles(self, state: _IncrementalState, frame: np.ndarray) -> np.ndarray:
+        """Return the (rows, cols) bool grid of tiles where ``frame`` differs from the previous frame."""
+        height, width = frame.shape
+        tile_height, tile_width = self._tile
+        new, old = frame, state.prev
+        if frame.dtype.kind == "f":
+            # Compare bit patterns, so that NaN pixels that stay NaN are unchanged.
+            bits = np.dtype(f"u{frame.dtype.itemsize}")
+            new, old = frame.view(bits), old.view(bits)
+        changed = state.changed
+        np.not_equal(new, old, out=changed[:height, :width])
+        rows, cols = changed.shape[0] // tile_height, changed.shape[1] // tile_width
+        tiles = np.logical_or.reduce(changed.reshape(rows, tile_height, cols, tile_width), axis=1)
+        grid: np.ndarray = np.logical_or.reduce(tiles, axis=2)
+        return grid
+
+    def _rects(self, grid: np.ndarray, height: int, width: int) -> list[DirtyRect]:
+        """Merge changed tiles into rectangles: runs within a tile row, then equal runs of adjacent rows."""
+        tile_height, tile_width = self._tile
+        rects: list[list[int]] = []
+        open_runs: dict[tuple[int, int], int] = {}
+        edges = np.diff(np.pad(grid.view(np.int8), ((0, 0), (1, 1))), axis=1)
+        # Runs start at +1 and stop at -1 edges; both are found in row-major order, so they pair up.
+        rows, starts = np.nonzero(edges == 1)
+        stops = np.nonzero(edges == -1)[1]
+        runs: dict[tuple[int, int], int] = {}
+        last_row = -1
+        for row, start, stop in zip(rows.tolist(), starts.tolist(), stops.tolist()):
+            if row != last_row:
+                open_runs, runs = (runs if row == last_row + 1 else {}), {}
+                last_row = row
+            index = open_runs.get((start, stop))
+            if index is None:
+                index = len(rects)
+                rects.append([start * tile_width, row * tile_height, (stop - start) * tile_width, 0])
+            rects[index][3] += tile_height
+            runs[start, stop] = index
+        return [DirtyRect(x, y, min(w, width - x), min(h, height - y)) for x, y, w, h in rects]
+
+    def update(self, frame: np.ndarray) -> tuple[np.ndarray, list[DirtyRect]]:
+        """Colorize the next frame, recoloring only the tiles that changed since the previous one.
+
+        Parameters
+        ----------
+        frame : numpy.ndarray
+            The frame, with shape (H, W) and a dtype accepted by ``apply_colormap_with_numpy``.
+
+        Returns
+        -------
+        tuple of numpy.ndarray and list of DirtyRect
+            The colorized frame with shape (H, W, 3), and the ``(x, y, width, height)``
+            rectangles that changed; the whole frame for the first frame. The output array
+            is reused and updated in place by the next call, so copy it to keep it.
+
+        Raises
+        ------
+        ValueError
+            If the frame has an invalid shape or dtype.
+
+        """
+        state, full = self._prepare(frame)
+        height, width = frame.shape
+        if full:
+            rects = [DirtyRect(0, 0, width, height)] if frame.size else []
+        else:
+            rects = self._rects(self._dirty_tiles(state, frame), height, width)
+
+        for x, y, w, h in rects:
+            block = frame[y : y + h, x : x + w]
+            if w == width:
+                # Whole rows are contiguous in both arrays, so gather straight into the output.
+                out = state.out[y : y + h].reshape(-1, 3)
+                _take_chunks(state.table, state.scaling, block.reshape(-1), out, None)
+            else:
+                colors = np.empty((h * w, 3), dtype=np.uint8)
+                _take_chunks(state.table, state.scaling, np.ascontiguousarray(block).reshape(-1), colors, None)
+                state.out[y : y + h, x : x + w] = colors.reshape(h, w, 3)
+            state.prev[y : y + h, x : x + w] = block
+        return state.out, rects
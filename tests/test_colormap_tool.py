@@ -1,3 +1,14 @@
+"""Tests for the colormap_tool package."""
+
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative import time of the package, in microseconds, as reported by -X importtime.
+IMPORT_TIME_BUDGET_US = 10_000
+
+
 def test_import():
     """Test import of the package."""
     try:
@@ -6,3 +17,38 @@ def test_import():
         assert False, "Could not import the package"
     else:
         assert True, "Package imported successfully"
+
+
+def run_python(*args):
+    """Run the interpreter in a subprocess with the given arguments."""
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)  # noqa: S603
+
+
+def test_import_is_lazy():
+    """Test that importing the package imports no submodule and no numpy."""
+    code = (
+        "import sys, colormap_tool; print(sorted(m for m in sys.modules if m.startswith(('numpy', 'colormap_tool.'))))"
+    )
+    assert run_python("-c", code).stdout.strip() == "[]"
+
+
+def test_import_time_budget():
+    """Test that the package imports within the 10 ms budget, taking the best of several runs."""
+    times = []
+    for _ in range(5):
+        stderr = run_python("-X", "importtime", "-c", "import colormap_tool").stderr
+        line = next(line for line in stderr.splitlines() if line.rstrip().endswith("| colormap_tool"))
+        times.append(int(line.split("|")[1]))
+    assert min(times) < IMPORT_TIME_BUDGET_US
+
+
+def test_lazy_attributes():
+    """Test that every public name resolves lazily and unknown names raise AttributeError."""
+    import colormap_tool
+
+    for name in colormap_tool.__all__:
+        assert getattr(colormap_tool, name) is not None
+        assert name in dir(colormap_tool)
+    assert colormap_tool.get_colormaps is colormap_tool._cmps.get_colormaps
+    with pytest.raises(AttributeError, match="no_such_name"):
+        _ = colormap_tool.no_such_name
@@ -0,0 +1,122 @@
+"""Tests for the _async module."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from colormap_tool import (
+    _async,
+    apply_colormap_async,
+    apply_colormap_with_numpy,
+    cache_info,
+    get_cv_colormaps,
+    set_async_executor,
+)
+
+
+@pytest.fixture
+def frames():
+    """Create a few random frames."""
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, size=(64, 80), dtype=np.uint8) for _ in range(8)]
+
+
+def test_apply_colormap_async(frames):
+    """Test that concurrent requests return the same results as the synchronous engine."""
+    lut = get_cv_colormaps("mpl.viridis")
+
+    async def main():
+        return await asyncio.gather(*(apply_colormap_async(frame, "mpl.viridis") for frame in frames))
+
+    results = asyncio.run(main())
+    for frame, result in zip(frames, results):
+        np.testing.assert_array_equal(result, apply_colormap_with_numpy(frame, lut))
+
+
+def test_apply_colormap_async_batching(frames, monkeypatch):
+    """Test that concurrent requests for the same colormap are submitted as one batch."""
+    batches = []
+    run_batch = _async._run_batch
+
+    def recording_run_batch(loop, requests):
+        batches.append(len(requests))
+        run_batch(loop, requests)
+
+    monkeypatch.setattr(_async, "_run_batch", recording_run_batch)
+
+    async def main():
+        same = [apply_colormap_async(frame, "cv.jet") for frame in frames]
+        other = [apply_colormap_async(frames[0], "cv.hot")]
+        await asyncio.gather(*same, *other)
+
+    asyncio.run(main())
+    assert sorted(batches) == [1, len(frames)]
+
+
+def test_apply_colormap_async_dispatch(frames):
+    """Test that a batch runs as one job per request, sharing the composed uint16 table."""
+    submitted = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, /, *args, **kwargs):
+            submitted.append(fn.__name__)
+            return super().submit(fn, *args, **kwargs)
+
+    executor = RecordingExecutor(max_workers=4)
+    set_async_executor(executor)
+    raw = [frame.astype(np.uint16) * 200 for frame in frames]
+    try:
+
+        async def main():
+            return await asyncio.gather(*(apply_colormap_async(frame, "cv.bone", vmin=0, vmax=40000) for frame in raw))
+
+        misses = cache_info().misses
+        results = asyncio.run(main())
+    finally:
+        set_async_executor(None)
+        executor.shutdown()
+
+    assert submitted == ["_run_batch"] + ["_run"] * (len(frames) - 1)
+    assert cache_info().misses <= misses + 2
+    lut = get_cv_colormaps("cv.bone")
+    for frame, result in zip(raw, results):
+        np.testing.assert_array_equal(result, apply_colormap_with_numpy(frame, lut, vmin=0, vmax=40000))
+
+
+def test_apply_colormap_async_extremes(frames):
+    """Test that the under, over and bad colors and masked input are passed to the engine."""
+    src = np.ma.masked_array(frames[0].astype(np.float32), mask=frames[0] < 10)
+    colors = {"under": (1, 2, 3), "over": (4, 5, 6), "bad": (7, 8, 9)}
+    result = asyncio.run(apply_colormap_async(src, "cv.jet", vmin=50, vmax=200, **colors))
+    expected = apply_colormap_with_numpy(src, get_cv_colormaps("cv.jet"), vmin=50, vmax=200, **colors)
+    np.testing.assert_array_equal(result, expected)
+    assert (result[src.mask] == colors["bad"]).all()
+
+
+def test_apply_colormap_async_errors_and_cancel(frames):
+    """Test error propagation, cancellation and a custom executor."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    set_async_executor(executor)
+    try:
+
+        async def main():
+            with pytest.raises(ValueError, match="dtype of the input array"):
+                await apply_colormap_async(frames[0].astype(np.int32), "cv.jet")
+            with pytest.raises(ValueError, match="not found"):
+                await apply_colormap_async(frames[0], "cv.nonexistent")
+
+            task = asyncio.ensure_future(apply_colormap_async(frames[0], "cv.jet"))
+            other = asyncio.ensure_future(apply_colormap_async(frames[1], "cv.jet"))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return await other
+
+        result = asyncio.run(main())
+        np.testing.assert_array_equal(result, apply_colormap_with_numpy(frames[1], get_cv_colormaps("cv.jet")))
+    finally:
+        set_async_executor(None)
+        executor.shutdown()
@@ -0,0 +1,61 @@
+"""Tests for the _autorange module."""
+
+import numpy as np
+import pytest
+
+from colormap_tool import AutoRange
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32, np.float64])
+def test_autorange_exact(dtype):
+    """Test that without subsampling and smoothing, the range is the percentiles of the frame."""
+    rng = np.random.default_rng(0)
+    frame = (rng.random((100, 120)) * 250).astype(dtype)
+    autorange = AutoRange(5, 95, alpha=1, samples=None)
+    assert autorange.range is None
+    expected = np.percentile(frame, [5, 95], method="lower")
+    assert autorange.update(frame) == tuple(expected)
+    assert autorange.range == tuple(expected)
+
+
+def test_autorange_subsample():
+    """Test that percentiles of a subsample are close to the exact ones."""
+    rng = np.random.default_rng(1)
+    frame = rng.normal(1000, 100, size=(480, 640)).astype(np.uint16)
+    vmin, vmax = AutoRange(samples=10000).update(frame)
+    expected = np.percentile(frame, [1, 99])
+    np.testing.assert_allclose([vmin, vmax], expected, atol=10)
+
+
+def test_autorange_smoothing():
+    """Test the exponential moving average of the range, and reset."""
+    autorange = AutoRange(0, 100, alpha=0.25)
+    assert autorange.update(np.array([0, 100], dtype=np.uint8)) == (0.0, 100.0)
+    assert autorange.update(np.array([40, 60], dtype=np.uint8)) == (10.0, 90.0)
+    autorange.reset()
+    assert autorange.update(np.array([40, 60], dtype=np.uint8)) == (40.0, 60.0)
+
+
+def test_autorange_invalid_values():
+    """Test that NaN values and masked elements are ignored."""
+    frame = np.array([np.nan, 1.0, 2.0, 3.0, np.nan])
+    autorange = AutoRange(0, 100, alpha=1)
+    assert autorange.update(frame) == (1.0, 3.0)
+    masked = np.ma.masked_array(np.array([0, 5, 6, 255], dtype=np.uint8), mask=[True, False, False, True])
+    assert autorange.update(masked) == (5.0, 6.0)
+    assert autorange.update(np.full(4, np.nan)) == (5.0, 6.0)
+
+    with pytest.raises(ValueError, match="no valid values"):
+        AutoRange().update(np.full(4, np.nan))
+
+
+def test_autorange_invalid():
+    """Test that invalid parameters and input raise ValueError."""
+    with pytest.raises(ValueError, match="percentiles must satisfy"):
+        AutoRange(99, 1)
+    with pytest.raises(ValueError, match="alpha must be"):
+        AutoRange(alpha=0)
+    with pytest.raises(ValueError, match="number of samples"):
+        AutoRange(samples=0)
+    with pytest.raises(ValueError, match="is not uint8"):
+        AutoRange().update(np.zeros(4, dtype=np.int32))
@@ -1,9 +1,24 @@
 """Tests for the _cmps module."""
 
+import re
+
 import numpy as np
 import pytest
 
-from colormap_tool import CV_COLORMAPS, MPL_COLORMAPS, get_colormaps, resample_lut
+from colormap_tool import (
+    CMPSPACE,
+    CV_COLORMAPS,
+    MPL_COLORMAPS,
+    _cmps,
+    cache_info,
+    clear_cache,
+    get_colormaps,
+    get_rgba_colormaps,
+    resample_all,
+    resample_lut,
+    set_cache_size,
+)
+from colormap_tool._cmps import _RESOLVED, _LazyColormapDict, _resolve
 
 
 def test_cv_colormaps_format():
@@ -42,6 +57,59 @@ def test_mpl_colormaps_format():
         assert cmap_array.dtype == np.uint8, f"Colormap dtype should be uint8, got {cmap_array.dtype}"
 
 
+def test_colormaps_lazy_loading():
+    """Test that colormaps are materialized on access as read-only views of the packed block."""
+    namespace = _LazyColormapDict("cv", list(CV_COLORMAPS))
+    assert namespace._block is None
+    assert dict.__getitem__(namespace, "jet") is None
+
+    lut = namespace["jet"]
+    assert namespace._block is not None
+    assert lut.shape == (256, 1, 3)
+    assert not lut.flags.writeable
+    assert np.shares_memory(lut, namespace._block)
+    np.testing.assert_array_equal(lut, CV_COLORMAPS["jet"])
+
+    # Other colormaps stay unmaterialized, but conversions to a plain dict see real arrays
+    assert dict.__getitem__(namespace, "bone") is None
+    copied = dict(namespace)
+    assert all(isinstance(value, np.ndarray) for value in copied.values())
+    assert namespace.get("nonexistent") is None
+
+    assert CMPSPACE["cv"] is CV_COLORMAPS
+    assert CMPSPACE["mpl"] is MPL_COLORMAPS
+
+
+def test_colormaps_lazy_dict_methods():
+    """Test that dict methods and operators never expose unmaterialized colormaps."""
+    namespace = _LazyColormapDict("cv", list(CV_COLORMAPS))
+    assert isinstance(namespace.setdefault("bone"), np.ndarray)
+    assert namespace.setdefault("custom", 1) == 1
+    del namespace["custom"]
+
+    values = namespace.values()
+    assert len(values) == len(namespace)
+    assert all(isinstance(value, np.ndarray) for value in values)
+    assert all(isinstance(value, np.ndarray) for _, value in namespace.items())
+    assert ("jet", namespace["jet"]) in namespace.items()
+
+    fresh = _LazyColormapDict("cv", list(CV_COLORMAPS))
+    merged = fresh | {"custom": None}
+    assert all(isinstance(merged[name], np.ndarray) for name in CV_COLORMAPS)
+    merged = {"custom": None} | fresh
+    assert all(isinstance(merged[name], np.ndarray) for name in CV_COLORMAPS)
+    assert namespace == namespace.copy()
+    assert namespace != {}
+
+    name, lut = fresh.popitem()
+    assert name == list(CV_COLORMAPS)[-1]
+    assert isinstance(lut, np.ndarray)
+    assert name not in fresh
+    assert len(values) == len(namespace)
+    namespace.popitem()
+    assert len(values) == len(namespace) == len(CV_COLORMAPS) - 1
+
+
 def test_get_colormaps():
     """Test getting colormaps in RGB format."""
     # Test getting a matplotlib colormap with default length
@@ -72,9 +140,62 @@ def test_get_colormaps():
     with pytest.raises(ValueError, match="Namespace nonexistent is not recognized"):
         get_colormaps("viridis", "nonexistent")
 
-    with pytest.raises(ValueError, match="Namespace mpl is provided, so name mpl.viridis should not include a dot"):
+    with pytest.raises(
+        ValueError, match=re.escape("Namespace mpl is provided, so name mpl.viridis should not include a dot")
+    ):
         get_colormaps("mpl.viridis", "mpl")
 
+    with pytest.raises(ValueError, match=re.escape("Colormap viridis.extra is not found in namespace mpl")):
+        get_colormaps("mpl.viridis.extra")
+
+    with pytest.raises(ValueError, match=re.escape("namespace.name")):
+        get_colormaps("viridis")
+
+
+def test_resolve_removed_colormap(monkeypatch):
+    """Test that clear_cache forgets the memoized handles of a removed colormap, and that the memo is bounded."""
+    monkeypatch.setitem(CMPSPACE["cv"], "custom", CV_COLORMAPS["jet"])
+    assert _resolve("cv.Custom_r") == ("cv", "custom_r")
+    monkeypatch.delitem(CMPSPACE["cv"], "custom")
+    clear_cache()
+    with pytest.raises(ValueError, match="Colormap Custom_r is not found in namespace cv"):
+        _resolve("cv.Custom_r")
+
+    size = len(_RESOLVED)
+    for i in range(100):
+        with pytest.raises(ValueError, match="not found"):
+            _resolve(f"cv.missing_{i}")
+    assert len(_RESOLVED) == size
+
+    monkeypatch.setattr(_cmps, "_RESOLVED_MAXSIZE", 4)
+    for spelling in ("cv.jet", "cv.JET", "cv.Jet", "opencv.jet", "cv2.jet", "CV.jet"):
+        assert _resolve(spelling) == ("cv", "jet")
+        assert len(_RESOLVED) <= 4
+    assert _resolve("CV.jet") is _resolve("CV.jet")
+
+
+def test_resolve_names():
+    """Test name resolution with aliases, letter case and reversed variants."""
+    assert _resolve("cv.jet") == ("cv", "jet")
+    assert _resolve("opencv.JET") == ("cv", "jet")
+    assert _resolve("Jet", "CV2") == ("cv", "jet")
+    assert _resolve("matplotlib.blues") == ("mpl", "Blues")
+    assert _resolve("mpl.viridis_r") == ("mpl", "viridis_r")
+    assert _resolve("cv.jet_r") == ("cv", "jet_r")
+    # Resolved handles are memoized and interned
+    assert _resolve("opencv.JET") is _resolve("opencv.JET")
+    assert _resolve("cv.jet")[1] is _resolve("jet", "cv")[1]
+
+    with pytest.raises(ValueError, match="Colormap jet_r_r is not found in namespace cv"):
+        _resolve("cv.jet_r_r")
+
+    np.testing.assert_array_equal(get_colormaps("mpl.Blues"), MPL_COLORMAPS["Blues"].reshape(-1, 3))
+    reversed_jet = get_colormaps("cv.jet_r")
+    np.testing.assert_array_equal(reversed_jet, CV_COLORMAPS["jet"].reshape(-1, 3)[::-1])
+    assert reversed_jet.flags.c_contiguous
+    assert not reversed_jet.flags.writeable
+    assert get_colormaps("cv.jet_r", n=64).shape == (64, 3)
+
 
 def test_resample_lut():
     """Test LUT resampling functionality."""
@@ -104,6 +225,17 @@ def test_resample_lut():
     assert np.all(out3d == lut_3d)
     assert out3d is not lut_3d
 
+    # Test a single-entry LUT
+    resampled = resample_lut(lut_2d[:1], 3)
+    assert resampled.tolist() == [[0, 0, 0]] * 3
+
+    # Test one and zero entries: the first color, and an empty LUT
+    viridis = MPL_COLORMAPS["viridis"]
+    np.testing.assert_array_equal(resample_lut(viridis, 1), viridis[:1])
+    np.testing.assert_array_equal(resample_lut(viridis.reshape(-1, 3), 1), viridis.reshape(-1, 3)[:1])
+    assert resample_lut(viridis, 0).shape == (0, 1, 3)
+    assert resample_lut(np.stack([viridis.reshape(-1, 3)] * 2), 0, stack=True).shape == (2, 0, 3)
+
     # Test error cases
 
     with pytest.raises(ValueError):  # noqa: PT011
@@ -114,3 +246,104 @@ def test_resample_lut():
         resample_lut(np.zeros((5, 3, 1), dtype=np.uint8), 5)  # Wrong 3D shape
     with pytest.raises(ValueError):  # noqa: PT011
         resample_lut(np.zeros((5,), dtype=np.uint8), 5)  # 1D array
+    with pytest.raises(ValueError, match="must be non-negative"):
+        resample_lut(lut_2d, -1)
+
+
+def test_resampled_lut_cache():
+    """Test that resampled LUTs are cached, read-only and bounded."""
+    clear_cache()
+    first = get_colormaps("viridis", "mpl", n=64)
+    second = get_colormaps("mpl.viridis", n=64)
+    assert first is second
+    assert not first.flags.writeable
+    np.testing.assert_array_equal(first, resample_lut(MPL_COLORMAPS["viridis"].reshape(-1, 3), 64))
+
+    info = cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    # The default length does not go through the cache
+    get_colormaps("viridis", "mpl")
+    assert cache_info().currsize == 1
+
+    try:
+        set_cache_size(2)
+        get_colormaps("jet", "cv", n=64)
+        get_colormaps("jet", "cv", n=128)
+        info = cache_info()
+        assert (info.evictions, info.maxsize, info.currsize) == (1, 2, 2)
+        assert get_colormaps("viridis", "mpl", n=64) is not first
+
+        with pytest.raises(ValueError, match="non-negative"):
+            set_cache_size(-1)
+    finally:
+        set_cache_size(128)
+        clear_cache()
+
+    assert cache_info() == (0, 0, 0, 128, 0)
+
+
+def test_resample_lut_stack():
+    """Test resampling a stack of LUTs in one pass."""
+    luts = np.stack([MPL_COLORMAPS["viridis"].reshape(-1, 3), CV_COLORMAPS["jet"].reshape(-1, 3)])
+    resampled = resample_lut(luts, 100, stack=True)
+    assert resampled.shape == (2, 100, 3)
+    assert resampled.dtype == np.uint8
+    for lut, expected in zip(luts, resampled):
+        np.testing.assert_array_equal(resample_lut(lut, 100), expected)
+
+    # Matches per-channel linear interpolation truncated to uint8
+    x_old, x_new = np.linspace(0, 1, 256), np.linspace(0, 1, 100)
+    expected = np.stack([np.interp(x_new, x_old, luts[0, :, c]) for c in range(3)], axis=1)
+    np.testing.assert_array_equal(resampled[0], expected.astype(np.float32).astype(np.uint8))
+
+    with pytest.raises(ValueError, match="lut stack"):
+        resample_lut(luts[0], 100, stack=True)
+
+
+def test_resample_all():
+    """Test resampling every colormap of a namespace."""
+    luts = resample_all("cv", 1024)
+    assert list(luts) == list(CV_COLORMAPS)
+    for name, lut in luts.items():
+        assert lut.shape == (1024, 3)
+        assert not lut.flags.writeable
+        np.testing.assert_array_equal(lut, resample_lut(CV_COLORMAPS[name].reshape(-1, 3), 1024))
+    assert list(resample_all("OpenCV", 16)) == list(CV_COLORMAPS)
+    assert list(resample_all("matplotlib", 16)) == list(MPL_COLORMAPS)
+
+    with pytest.raises(ValueError, match="Namespace nonexistent is not recognized"):
+        resample_all("nonexistent", 1024)
+
+
+def test_get_rgba_colormaps():
+    """Test RGBA LUTs with scalar and ramp alpha, premultiplication, BGRA order and caching."""
+    rgb = get_colormaps("mpl.viridis")
+
+    rgba = get_rgba_colormaps("mpl.viridis", alpha=0.5)
+    assert rgba.shape == (256, 1, 4)
+    assert rgba.dtype == np.uint8
+    assert not rgba.flags.writeable
+    np.testing.assert_array_equal(rgba[:, 0, :3], rgb)
+    assert np.all(rgba[:, 0, 3] == 128)
+    assert get_rgba_colormaps("MPL.VIRIDIS", alpha=0.5) is rgba
+
+    bgra = get_rgba_colormaps("mpl.viridis", alpha=np.linspace(0, 1, 256), premultiplied=True, order="bgra")
+    np.testing.assert_array_equal(bgra[:, 0, 3], np.arange(256))
+    expected = np.rint(rgb[:, ::-1] * (np.arange(256)[:, None] / 255)).astype(np.uint8)
+    np.testing.assert_array_equal(bgra[:, 0, :3], expected)
+
+    with pytest.raises(ValueError, match="range"):
+        get_rgba_colormaps("mpl.viridis", alpha=1.5)
+    with pytest.raises(ValueError, match="shape"):
+        get_rgba_colormaps("mpl.viridis", alpha=np.ones(10))
+    with pytest.raises(ValueError, match="order"):
+        get_rgba_colormaps("mpl.viridis", order="argb")
+
+
+def test_resample_lut_rgba():
+    """Test that RGBA LUTs are resampled like RGB LUTs, channel by channel."""
+    rgba = np.asarray(get_rgba_colormaps("cv.jet", alpha=np.linspace(0, 1, 256)))
+    resampled = resample_lut(rgba, 1024)
+    assert resampled.shape == (1024, 1, 4)
+    np.testing.assert_array_equal(resampled[:, 0, :3], resample_lut(get_colormaps("cv.jet"), 1024))
@@ -1,11 +1,23 @@
 """Test colormap conversion between different libraries."""
 
+import warnings
+
 import cv2
 import matplotlib.pyplot as plt
 import numpy as np
 import pytest
 
-from colormap_tool import apply_colormap_with_numpy, get_cv_colormaps, get_mpl_colormaps
+from colormap_tool import (
+    apply_colormap_batch,
+    apply_colormap_packed,
+    apply_colormap_with_numpy,
+    blend_colormap,
+    cache_info,
+    get_cv_colormaps,
+    get_mpl_colormaps,
+    get_rgba_colormaps,
+)
+from colormap_tool._cv import _pool
 
 
 @pytest.fixture
@@ -85,3 +97,379 @@ def test_apply_colormap_with_numpy(test_image):
     assert cv_result.shape == np_result.shape
     # The results should be the same
     assert np.allclose(cv_result, np_result, atol=1)
+
+
+@pytest.mark.parametrize("workers", [1, 3, None])
+@pytest.mark.parametrize("shape", [(7,), (512, 640), (4, 300, 400)])
+def test_apply_colormap_with_numpy_workers(shape, workers):
+    """Test that the threaded, tiled gather matches a plain LUT lookup."""
+    cmap = get_cv_colormaps("viridis", "mpl")
+    src = np.random.default_rng(0).integers(0, 256, size=shape, dtype=np.uint8)
+
+    np_result = apply_colormap_with_numpy(src, cmap, workers=workers)
+
+    assert np_result.shape == (*shape, 3)
+    np.testing.assert_array_equal(np_result, cmap.reshape(256, 3)[src])
+
+
+def test_apply_colormap_with_numpy_pool_shutdown():
+    """Test that the gather pool is recreated after it is shut down, as it is at exit."""
+    cmap = get_cv_colormaps("viridis", "mpl")
+    src = np.random.default_rng(0).integers(0, 256, size=(512, 640), dtype=np.uint8)
+    apply_colormap_with_numpy(src, cmap, workers=3)
+    _pool.shutdown()
+    np.testing.assert_array_equal(apply_colormap_with_numpy(src, cmap, workers=3), cmap.reshape(256, 3)[src])
+
+
+def test_apply_colormap_with_numpy_invalid_workers(test_image):
+    """Test that a non-positive number of workers is rejected."""
+    cmap = get_cv_colormaps("viridis", "mpl")
+    with pytest.raises(ValueError, match="number of workers"):
+        apply_colormap_with_numpy(test_image, cmap, workers=0)
+
+
+def test_apply_colormap_with_numpy_dst(test_image):
+    """Test that the result is written into a caller-provided output buffer."""
+    cmap = get_cv_colormaps("viridis", "mpl")
+    dst = np.empty((*test_image.shape, 3), dtype=np.uint8)
+
+    np_result = apply_colormap_with_numpy(test_image, cmap, dst=dst)
+
+    assert np_result is dst
+    np.testing.assert_array_equal(dst, cv2.applyColorMap(test_image, cmap))
+
+
+def test_apply_colormap_with_numpy_invalid_dst(test_image):
+    """Test that output buffers with the wrong shape, dtype or layout are rejected."""
+    cmap = get_cv_colormaps("viridis", "mpl")
+    with pytest.raises(ValueError, match="shape of the output array"):
+        apply_colormap_with_numpy(test_image, cmap, dst=np.empty_like(test_image))
+    with pytest.raises(ValueError, match="dtype of the output array"):
+        apply_colormap_with_numpy(test_image, cmap, dst=np.empty((*test_image.shape, 3), dtype=np.float32))
+    with pytest.raises(ValueError, match="C-contiguous"):
+        apply_colormap_with_numpy(
+            test_image, cmap, dst=np.empty((3, *test_image.shape), dtype=np.uint8).transpose(1, 2, 0)
+        )
+
+
+@pytest.mark.parametrize("dtype", [np.uint16, np.float32, np.float64])
+def test_apply_colormap_with_numpy_scaled(test_image, dtype):
+    """Test that scaled input with a 256-entry LUT matches direct uint8 indexing."""
+    cmap = get_cv_colormaps("viridis", "mpl")
+    src = (test_image.astype(np.float64) * 4 + 100).astype(dtype)
+
+    np_result = apply_colormap_with_numpy(src, cmap, vmin=100, vmax=100 + 255 * 4, n=256)
+    np.testing.assert_array_equal(np_result, cmap.reshape(256, 3)[test_image])
+
+    np_result = apply_colormap_with_numpy(test_image, cmap, vmin=0, vmax=255, n=256)
+    np.testing.assert_array_equal(np_result, cmap.reshape(256, 3)[test_image])
+
+
+def test_apply_colormap_with_numpy_auto_range():
+    """Test that missing bounds are taken from the data and out-of-range values are clipped."""
+    cmap = get_cv_colormaps("jet", "cv")
+    lut = cmap.reshape(256, 3)
+    src = np.linspace(-5.0, 40.0, 1000, dtype=np.float32).reshape(20, 50)
+
+    np_result = apply_colormap_with_numpy(src, cmap)
+    np.testing.assert_array_equal(np_result[0, 0], lut[0])
+    np.testing.assert_array_equal(np_result[-1, -1], lut[-1])
+
+    np_result = apply_colormap_with_numpy(src, cmap, vmin=0, vmax=30, workers=2)
+    assert (np_result[src <= 0] == lut[0]).all()
+    assert (np_result[src >= 30] == lut[-1]).all()
+
+    raw = np.array([[0, 1000, 4000, 65535]], dtype=np.uint16)
+    np_result = apply_colormap_with_numpy(raw, cmap, vmin=1000, vmax=4000, n=65536)
+    np.testing.assert_array_equal(np_result[0], lut[[0, 0, -1, -1]])
+
+
+def test_apply_colormap_with_numpy_cached_table():
+    """Test that composed uint16 tables are cached for an explicit range, and rebuilt for new colors."""
+    cmap = get_cv_colormaps("jet", "cv").copy()
+    raw = np.array([[0, 1000, 4000, 65535]], dtype=np.uint16)
+    apply_colormap_with_numpy(raw, cmap, vmin=1000, vmax=4000)
+    hits = cache_info().hits
+    apply_colormap_with_numpy(raw, cmap, vmin=1000, vmax=4000)
+    assert cache_info().hits == hits + 1
+
+    cmap[0] = (1, 2, 3)
+    np_result = apply_colormap_with_numpy(raw, cmap, vmin=1000, vmax=4000, under=(7, 8, 9))
+    np.testing.assert_array_equal(np_result[0, :2], [(7, 8, 9), (1, 2, 3)])
+
+
+def test_apply_colormap_with_numpy_invalid_input(test_image):
+    """Test that unsupported dtypes, inverted ranges and empty LUTs are rejected."""
+    cmap = get_cv_colormaps("jet", "cv")
+    with pytest.raises(ValueError, match="dtype of the input array"):
+        apply_colormap_with_numpy(test_image.astype(np.int32), cmap)
+    with pytest.raises(ValueError, match="vmin"):
+        apply_colormap_with_numpy(test_image.astype(np.float32), cmap, vmin=10, vmax=0)
+    with pytest.raises(ValueError, match="must be at least 1"):
+        apply_colormap_with_numpy(test_image.astype(np.uint16), cmap, n=0)
+
+
+@pytest.mark.parametrize("out_dtype", [np.uint8, np.float16, np.float32])
+@pytest.mark.parametrize("src_dtype", [np.uint8, np.uint16, np.float32])
+def test_apply_colormap_batch(src_dtype, out_dtype):
+    """Test that batch output in both layouts matches the per-image engine."""
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, 256, size=(4, 30, 40)).astype(src_dtype)
+    vmin, vmax = (None, None) if src_dtype == np.uint8 else (10.0, 200.0)
+    cmap = get_cv_colormaps("mpl.inferno")
+
+    expected = apply_colormap_with_numpy(src, cmap, vmin=vmin, vmax=vmax)
+    if out_dtype != np.uint8:
+        expected = (expected * np.float32(1 / 255)).astype(out_dtype)
+
+    nhwc = apply_colormap_batch(src, cmap, dtype=out_dtype, vmin=vmin, vmax=vmax)
+    assert nhwc.dtype == out_dtype
+    np.testing.assert_array_equal(nhwc, expected)
+
+    out = np.empty((4, 3, 30, 40), dtype=out_dtype)
+    nchw = apply_colormap_batch(src, cmap, out=out, layout="NCHW", dtype=out_dtype, workers=2, vmin=vmin, vmax=vmax)
+    assert nchw is out
+    np.testing.assert_array_equal(nchw, expected.transpose(0, 3, 1, 2))
+
+
+def test_apply_colormap_batch_invalid():
+    """Test that the batch API rejects invalid shapes, layouts, dtypes and output arrays."""
+    cmap = get_cv_colormaps("mpl.inferno")
+    src = np.zeros((2, 4, 4), dtype=np.uint8)
+    with pytest.raises(ValueError, match=r"\(N, H, W\)"):
+        apply_colormap_batch(src[0], cmap)
+    with pytest.raises(ValueError, match="layout"):
+        apply_colormap_batch(src, cmap, layout="NWHC")
+    with pytest.raises(ValueError, match="float64"):
+        apply_colormap_batch(src, cmap, dtype=np.float64)
+    with pytest.raises(ValueError, match="shape"):
+        apply_colormap_batch(src, cmap, out=np.empty((2, 4, 4, 3), dtype=np.uint8), layout="NCHW")
+    with pytest.raises(ValueError, match="float32"):
+        apply_colormap_batch(src, cmap, out=np.empty((2, 4, 4, 3), dtype=np.uint8), dtype=np.float32)
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32])
+def test_blend_colormap(dtype):
+    """Test that the fused blend matches a float reference composite."""
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, 256, size=(60, 80)).astype(dtype)
+    background = rng.integers(0, 256, size=(60, 80, 3), dtype=np.uint8)
+    alpha = np.linspace(0, 1, 256)
+    lut = get_rgba_colormaps("mpl.inferno", alpha=alpha, order="bgra")
+    vmin, vmax = (None, None) if dtype == np.uint8 else (0.0, 255.0)
+
+    result = blend_colormap(src, lut, background.copy(), vmin=vmin, vmax=vmax, n=256, workers=2)
+
+    colors = apply_colormap_with_numpy(src, get_cv_colormaps("mpl.inferno"), vmin=vmin, vmax=vmax, n=256)
+    weights = lut[src.astype(np.intp), 0, 3:] / 255
+    expected = colors * weights + background * (1 - weights)
+    assert np.abs(result - expected).max() <= 1
+
+
+def test_blend_colormap_cached():
+    """Test that the premultiplied table of a cached gather table is cached too."""
+    src = np.arange(256, dtype=np.uint16).reshape(16, 16)
+    background = np.zeros((16, 16, 3), dtype=np.uint8)
+    lut = get_rgba_colormaps("mpl.inferno", alpha=0.5, order="bgra")
+    expected = blend_colormap(src, lut, background.copy(), vmin=0, vmax=255)
+    misses = cache_info().misses
+    result = blend_colormap(src, lut, background.copy(), vmin=0, vmax=255)
+    assert cache_info().misses == misses
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_blend_colormap_opacity():
+    """Test that opaque LUTs replace the background and transparent LUTs keep it."""
+    src = np.tile(np.arange(256, dtype=np.uint8), (4, 1))
+    background = np.full((4, 256, 3), 77, dtype=np.uint8)
+
+    opaque = blend_colormap(src, get_rgba_colormaps("cv.jet", order="bgra"), background.copy())
+    np.testing.assert_array_equal(opaque, apply_colormap_with_numpy(src, get_cv_colormaps("cv.jet")))
+
+    lut = get_rgba_colormaps("cv.jet", alpha=0.0, premultiplied=True)
+    np.testing.assert_array_equal(blend_colormap(src, lut, background.copy(), premultiplied=True), background)
+
+
+def test_blend_colormap_extremes():
+    """Test transparent colors for values below vmin, above vmax and NaN values."""
+    src = np.array([[-1.0, 0.0, 0.5, 1.0, 2.0, np.nan]], dtype=np.float32)
+    background = np.full((1, 6, 3), 50, dtype=np.uint8)
+    lut = get_rgba_colormaps("cv.jet", order="bgra")
+    transparent = (0, 0, 0, 0)
+
+    result = blend_colormap(
+        src, lut, background.copy(), vmin=0.0, vmax=1.0, under=transparent, over=transparent, bad=transparent
+    )
+    np.testing.assert_array_equal(result[0, [0, 4, 5]], background[0, [0, 4, 5]])
+    np.testing.assert_array_equal(result[:, 1:4], apply_colormap_with_numpy(src[:, 1:4], get_cv_colormaps("cv.jet")))
+
+    clamped = blend_colormap(src[:, :5], lut, background[:, :5].copy(), vmin=0.0, vmax=1.0, under=transparent)
+    np.testing.assert_array_equal(clamped[0, 0], background[0, 0])
+    np.testing.assert_array_equal(clamped[0, 4], clamped[0, 3])
+
+    src16 = np.array([[10, 20, 30]], dtype=np.uint16)
+    result16 = blend_colormap(src16, lut, background[:, :3].copy(), vmin=15, vmax=25, over=transparent)
+    np.testing.assert_array_equal(result16[0, 2], background[0, 2])
+
+
+def test_blend_colormap_invalid():
+    """Test that blend_colormap rejects RGB LUTs, bad backgrounds and bad colors."""
+    src = np.zeros((4, 4), dtype=np.uint8)
+    background = np.zeros((4, 4, 3), dtype=np.uint8)
+    lut = get_rgba_colormaps("cv.jet")
+    with pytest.raises(ValueError, match=r"\(256, 1, 4\)"):
+        blend_colormap(src, get_cv_colormaps("mpl.viridis"), background)
+    with pytest.raises(ValueError, match="shape"):
+        blend_colormap(src, lut, background[:2])
+    with pytest.raises(ValueError, match="Colors"):
+        blend_colormap(src.astype(np.float32), lut, background, vmin=0, vmax=1, under=(0, 0, 0))
+
+
+@pytest.mark.parametrize("dtype", [np.uint16, np.float32, np.float64])
+def test_apply_colormap_with_numpy_extremes(dtype):
+    """Test the under, over and bad colors for scaled input, with and without a mask."""
+    src = np.array([[5, 10, 15, 20, 25]], dtype=dtype)
+    cmap = get_cv_colormaps("cv.jet")
+    under, over, bad = (1, 2, 3), (4, 5, 6), (7, 8, 9)
+    inside = apply_colormap_with_numpy(src[:, 1:4], cmap, vmin=10, vmax=20)
+
+    result = apply_colormap_with_numpy(src, cmap, vmin=10, vmax=20, under=under, over=over)
+    np.testing.assert_array_equal(result[0, 0], under)
+    np.testing.assert_array_equal(result[0, 4], over)
+    np.testing.assert_array_equal(result[:, 1:4], inside)
+
+    masked = np.ma.masked_array(src, mask=[[False, False, True, False, False]])
+    result = apply_colormap_with_numpy(masked, cmap, vmin=10, vmax=20, bad=bad)
+    np.testing.assert_array_equal(result[0, 2], bad)
+    np.testing.assert_array_equal(result[0, [0, 4]], inside[0, [0, 2]])
+
+
+def test_apply_colormap_with_numpy_nan():
+    """Test that NaN values get the bad color, or the first color without one, and no warning."""
+    src = np.array([[0.0, np.nan, 1.0]], dtype=np.float32)
+    cmap = get_cv_colormaps("cv.jet")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = apply_colormap_with_numpy(src, cmap)
+        np.testing.assert_array_equal(result[0, 1], cmap[0, 0])
+        result = apply_colormap_with_numpy(src, cmap, bad=(1, 2, 3))
+        np.testing.assert_array_equal(result[0, 1], (1, 2, 3))
+        np.testing.assert_array_equal(result[0, [0, 2]], cmap[[0, 255], 0])
+
+
+@pytest.mark.parametrize("vmin", [None, 5.0])
+def test_apply_colormap_with_numpy_no_valid_values(vmin):
+    """Test that fully masked and all-NaN input gets the bad color with an auto range."""
+    cmap = get_cv_colormaps("cv.jet")
+    masked = np.ma.masked_all((2, 3), dtype=np.uint16)
+    result = apply_colormap_with_numpy(masked, cmap, vmin=vmin, bad=(1, 2, 3))
+    assert (result == (1, 2, 3)).all()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = apply_colormap_with_numpy(np.full((2, 3), np.nan), cmap, vmin=vmin)
+    assert (result == cmap[0, 0]).all()
+
+
+def test_apply_colormap_with_numpy_masked_uint8():
+    """Test that masked uint8 input gets the bad color and the auto range ignores masked values."""
+    src = np.ma.masked_array(np.array([[0, 100, 255]], dtype=np.uint8), mask=[[False, False, True]])
+    cmap = get_cv_colormaps("cv.jet")
+
+    result = apply_colormap_with_numpy(src, cmap, bad=(1, 2, 3))
+    np.testing.assert_array_equal(result[0, :2], cmap[[0, 100], 0])
+    np.testing.assert_array_equal(result[0, 2], (1, 2, 3))
+
+    scaled = apply_colormap_with_numpy(src.astype(np.float32), cmap)
+    np.testing.assert_array_equal(scaled[0, :2], cmap[[0, 255], 0])
+    np.testing.assert_array_equal(scaled[0, 2], cmap[0, 0])
+
+
+def test_apply_colormap_batch_masked():
+    """Test that masked stacks and extreme colors work in both batch layouts."""
+    rng = np.random.default_rng(0)
+    data = rng.uniform(-10, 110, size=(3, 20, 30)).astype(np.float32)
+    src = np.ma.masked_array(data, mask=rng.random(data.shape) < 0.1)
+    cmap = get_cv_colormaps("mpl.viridis")
+    colors = {"under": (1, 2, 3), "over": (4, 5, 6), "bad": (7, 8, 9)}
+
+    expected = apply_colormap_with_numpy(src, cmap, vmin=0, vmax=100, **colors)
+    nhwc = apply_colormap_batch(src, cmap, vmin=0, vmax=100, **colors)
+    nchw = apply_colormap_batch(src, cmap, layout="NCHW", vmin=0, vmax=100, **colors)
+    np.testing.assert_array_equal(nhwc, expected)
+    np.testing.assert_array_equal(nchw, expected.transpose(0, 3, 1, 2))
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32])
+@pytest.mark.parametrize("workers", [1, 3])
+def test_apply_colormap_packed(dtype, workers):
+    """Test that the packed gather matches the 3-channel gather, with BGRA and BGRX LUTs."""
+    rng = np.random.default_rng(0)
+    src = (rng.random((300, 400)) * 255).astype(dtype)
+    bgr = get_cv_colormaps("mpl.inferno")
+    bgra = get_rgba_colormaps("mpl.inferno", alpha=0.5, order="bgra")
+    expected = apply_colormap_with_numpy(src, bgr, vmin=10, vmax=200)
+
+    result = apply_colormap_packed(src, bgra, workers=workers, vmin=10, vmax=200)
+    assert result.shape == (300, 400, 4)
+    assert result.dtype == np.uint8
+    np.testing.assert_array_equal(result[..., :3], expected)
+    assert (result[..., 3] == 128).all()
+
+    dst = np.zeros((300, 400, 4), dtype=np.uint8)
+    assert apply_colormap_packed(src, bgr, dst=dst, workers=workers, vmin=10, vmax=200) is dst
+    np.testing.assert_array_equal(dst[..., :3], expected)
+    assert (dst[..., 3] == 255).all()
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16])
+def test_apply_colormap_packed_cached(dtype):
+    """Test that packed tables are cached, and that changing the colormap in place repacks it."""
+    src = np.arange(256, dtype=dtype).reshape(16, 16)
+    bgra = get_rgba_colormaps("mpl.inferno", order="bgra").copy()
+    apply_colormap_packed(src, bgra, vmin=0, vmax=255)
+    hits = cache_info().hits
+    apply_colormap_packed(src, bgra, vmin=0, vmax=255)
+    assert cache_info().hits >= hits + 1
+
+    bgra[0] = (1, 2, 3, 4)
+    result = apply_colormap_packed(src, bgra, vmin=0, vmax=255)
+    np.testing.assert_array_equal(result[0, 0], (1, 2, 3, 4))
+
+
+def test_apply_colormap_float_table_cached():
+    """Test that the resampled table of float input is cached, whatever the range."""
+    src = np.linspace(0, 1, 64, dtype=np.float32).reshape(8, 8)
+    lut = get_cv_colormaps("mpl.viridis")
+    expected = apply_colormap_with_numpy(src, lut)
+    size = cache_info().currsize
+    misses = cache_info().misses
+    for scale in (1, 2, 3):
+        apply_colormap_with_numpy(src * scale, lut)
+    assert cache_info().misses == misses
+    assert cache_info().currsize == size
+    np.testing.assert_array_equal(apply_colormap_with_numpy(src, lut), expected)
+
+
+def test_apply_colormap_packed_auto_range_not_cached():
+    """Test that tables of a range computed from the data do not fill the LUT cache."""
+    rng = np.random.default_rng(0)
+    bgra = get_rgba_colormaps("mpl.inferno", order="bgra")
+    apply_colormap_packed(rng.integers(0, 4096, (8, 8), dtype=np.uint16), bgra)
+    size = cache_info().currsize
+    for high in range(1000, 1005):
+        apply_colormap_packed(rng.integers(0, high, (8, 8), dtype=np.uint16), bgra)
+    assert cache_info().currsize == size
+
+
+def test_apply_colormap_packed_extremes():
+    """Test the under, over and bad colors of the packed gather, with as many values as the LUT."""
+    src = np.ma.masked_array([[5.0, 15.0, 25.0, np.nan]], mask=[[False, True, False, False]])
+    bgra = get_rgba_colormaps("cv.jet", order="bgra")
+    result = apply_colormap_packed(src, bgra, vmin=10, vmax=20, under=(1, 2, 3, 4), over=(5, 6, 7, 8), bad=(0, 0, 0, 0))
+    np.testing.assert_array_equal(result[0], [(1, 2, 3, 4), (0, 0, 0, 0), (5, 6, 7, 8), (0, 0, 0, 0)])
+
+    with pytest.raises(ValueError, match="Colors must have 4 values"):
+        apply_colormap_packed(src, bgra, vmin=10, vmax=20, under=(1, 2, 3))
+    with pytest.raises(ValueError, match=r"is not \(1, 4, 4\)"):
+        apply_colormap_packed(src, bgra, dst=np.empty((1, 4, 3), dtype=np.uint8))
@@ -3,7 +3,7 @@
 import cv2
 import numpy as np
 
-from colormap_tool import get_cv_colormaps
+from colormap_tool import CV_COLORMAPS, MPL_COLORMAPS, get_cv_colormaps
 
 
 def test_get_cv_colormaps_mpl():
@@ -48,3 +48,33 @@ def test_get_cv_colormaps_dot_notation():
     assert cmap.shape[1] == 1
     assert cmap.shape[2] == 3
     assert cmap.dtype == np.uint8
+
+
+def test_get_cv_colormaps_contiguous():
+    """Test that BGR LUTs are contiguous, read-only and built once per colormap."""
+    cmap = get_cv_colormaps("mpl.viridis")
+    assert cmap.flags.c_contiguous
+    assert not cmap.flags.writeable
+    assert get_cv_colormaps("viridis", "mpl") is cmap
+    np.testing.assert_array_equal(cmap, MPL_COLORMAPS["viridis"][:, :, ::-1])
+
+
+def test_get_cv_colormaps_replaced():
+    """Test that replacing a colormap in CMPSPACE rebuilds its BGR LUT."""
+    original = CV_COLORMAPS["jet"]
+    stale = get_cv_colormaps("cv.jet")
+    try:
+        CV_COLORMAPS["jet"] = np.zeros((256, 1, 3), dtype=np.uint8)
+        cmap = get_cv_colormaps("cv.jet")
+        assert cmap is not stale
+        assert not cmap.any()
+    finally:
+        CV_COLORMAPS["jet"] = original
+
+
+def test_get_cv_colormaps_aliases():
+    """Test namespace aliases, letter case and reversed variants."""
+    np.testing.assert_array_equal(get_cv_colormaps("opencv.JET"), get_cv_colormaps("cv.jet"))
+    cmap = get_cv_colormaps("cv.jet_r")
+    assert cmap.flags.c_contiguous
+    np.testing.assert_array_equal(cmap, CV_COLORMAPS["jet"][::-1, :, ::-1])
@@ -0,0 +1,140 @@
+"""Tests for the _indexed module."""
+
+import io
+import struct
+import zlib
+
+import cv2
+import numpy as np
+import pytest
+
+from colormap_tool import apply_colormap_with_numpy, get_cv_colormaps, load_indexed, save_indexed
+from colormap_tool._indexed import _PNG_SIGNATURE, _chunk, _decode_png, _unfilter
+
+
+@pytest.fixture
+def indices():
+    """A smooth 48x64 index frame with noise, like a quantized thermal frame."""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:48, 0:64]
+    field = 128 + 60 * np.sin(x / 9) + 50 * np.cos(y / 7) + rng.normal(0, 2, size=x.shape)
+    return np.clip(field, 0, 255).astype(np.uint8)
+
+
+def test_indexed_png_round_trip(tmp_path, indices):
+    """Test that a PNG round-trips, and image readers show it in the colormap's colors."""
+    path = tmp_path / "frame.png"
+    save_indexed(path, indices, "mpl.inferno", vmin=20.0, vmax=40.0)
+
+    expected = apply_colormap_with_numpy(indices, get_cv_colormaps("mpl.inferno"))
+    np.testing.assert_array_equal(cv2.imread(str(path)), expected)
+
+    frames = load_indexed(path)
+    np.testing.assert_array_equal(frames.indices, indices)
+    assert frames.colormap == "mpl.inferno"
+    assert (frames.vmin, frames.vmax) == (20.0, 40.0)
+    assert len(frames) == 1
+    np.testing.assert_array_equal(frames.colorize(), expected)
+    np.testing.assert_array_equal(next(iter(frames)), expected)
+    np.testing.assert_allclose(frames.values(), indices / 255 * 20 + 20, rtol=1e-6)
+
+
+def test_indexed_npz_stack(indices):
+    """Test that a stack of frames round-trips through npz, with the colormap by name."""
+    stack = np.stack([indices, indices[::-1], 255 - indices])
+    buffer = io.BytesIO()
+    save_indexed(buffer, stack, "JET", namespace="cv", format="npz")
+    buffer.seek(0)
+
+    frames = load_indexed(buffer, format="npz")
+    np.testing.assert_array_equal(frames.indices, stack)
+    assert frames.colormap == "cv.jet"
+    assert frames.vmin is None
+    lut = get_cv_colormaps("cv.jet")
+    colors = [frame.copy() for frame in frames]
+    assert len(colors) == len(frames) == 3
+    for frame, color in zip(stack, colors):
+        np.testing.assert_array_equal(color, apply_colormap_with_numpy(frame, lut))
+    with pytest.raises(ValueError, match="data range"):
+        frames.values()
+
+
+def filter_rows(image, kinds):
+    """Apply the PNG filter kinds[y] to each row y of an 8-bit image, as a reference encoder."""
+    rows = []
+    for y, (line, kind) in enumerate(zip(image.tolist(), kinds)):
+        up = image[y - 1].tolist() if y else [0] * len(line)
+        filtered = [kind]
+        for x, value in enumerate(line):
+            left, up_left = (line[x - 1], up[x - 1]) if x else (0, 0)
+            p = left + up[x] - up_left
+            paeth = min((abs(p - left), 0, left), (abs(p - up[x]), 1, up[x]), (abs(p - up_left), 2, up_left))[2]
+            predictor = [0, left, up[x], (left + up[x]) // 2, paeth][kind]
+            filtered.append((value - predictor) % 256)
+        rows.append(filtered)
+    return np.array(rows, dtype=np.uint8)
+
+
+def test_unfilter(indices):
+    """Test undoing all five PNG row filters, including the ones only other encoders write."""
+    image = indices[:10, :16]
+    kinds = [0, 1, 2, 3, 4, 4, 3, 2, 1, 0]
+    np.testing.assert_array_equal(_unfilter(filter_rows(image, kinds)), image)
+
+    ok, data = cv2.imencode(".png", indices)
+    assert ok
+    decoded, palette, _ = _decode_png(data.tobytes())
+    np.testing.assert_array_equal(decoded, indices)
+    assert palette is None
+
+
+def test_indexed_invalid(tmp_path, indices):
+    """Test that invalid frames, formats and files raise ValueError."""
+    with pytest.raises(ValueError, match="is not uint8"):
+        save_indexed(tmp_path / "a.png", indices.astype(np.uint16), "mpl.viridis")
+    with pytest.raises(ValueError, match="is not \\(H, W\\) for png"):
+        save_indexed(tmp_path / "a.png", np.stack([indices, indices]), "mpl.viridis")
+    with pytest.raises(ValueError, match="must be 'png' or 'npz'"):
+        save_indexed(tmp_path / "a.tiff", indices, "mpl.viridis")
+    with pytest.raises(ValueError, match="format must be given"):
+        save_indexed(io.BytesIO(), indices, "mpl.viridis")
+    with pytest.raises(ValueError, match="not found"):
+        save_indexed(tmp_path / "a.png", indices, "mpl.not_a_colormap")
+
+    (tmp_path / "rgb.png").write_bytes(cv2.imencode(".png", np.dstack([indices] * 3))[1].tobytes())
+    with pytest.raises(ValueError, match="color type 2"):
+        load_indexed(tmp_path / "rgb.png")
+    (tmp_path / "gray.png").write_bytes(cv2.imencode(".png", indices)[1].tobytes())
+    with pytest.raises(ValueError, match="colormap name or a palette"):
+        load_indexed(tmp_path / "gray.png")
+    with pytest.raises(ValueError, match="not found"):
+        load_indexed(tmp_path / "gray.png", cmap="mpl.not_a_colormap")
+
+    for size in (0, 4, 3 * 257):
+        with pytest.raises(ValueError, match=f"palette has {size} bytes"):
+            load_indexed(io.BytesIO(palette_png(indices, bytes(size))), format="png")
+
+
+def palette_png(image, palette):
+    """Encode an 8-bit indexed-color PNG with the given raw PLTE chunk body."""
+    height, width = image.shape
+    rows = np.hstack([np.zeros((height, 1), dtype=np.uint8), image]).tobytes()
+    header = struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)
+    chunks = [(b"IHDR", header), (b"PLTE", palette), (b"IDAT", zlib.compress(rows)), (b"IEND", b"")]
+    return _PNG_SIGNATURE + b"".join(_chunk(kind, body) for kind, body in chunks)
+
+
+def test_load_indexed_cmap(tmp_path, indices):
+    """Test that grayscale PNG files load with a colormap name, which also replaces a palette."""
+    expected = apply_colormap_with_numpy(indices, get_cv_colormaps("mpl.inferno"))
+    (tmp_path / "gray.png").write_bytes(cv2.imencode(".png", indices)[1].tobytes())
+    frames = load_indexed(tmp_path / "gray.png", cmap="INFERNO", namespace="matplotlib")
+    assert frames.colormap == "mpl.inferno"
+    np.testing.assert_array_equal(frames.colorize(), expected)
+
+    palette = bytes(range(16)) * 3
+    frames = load_indexed(io.BytesIO(palette_png(indices, palette)), format="png")
+    assert frames.colormap is None
+    assert frames.lut.shape == (256, 1, 3)
+    frames = load_indexed(io.BytesIO(palette_png(indices, palette)), cmap="mpl.inferno", format="png")
+    np.testing.assert_array_equal(frames.colorize(), expected)
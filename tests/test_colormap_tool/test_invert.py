@@ -0,0 +1,91 @@
+"""Tests for the _invert module."""
+
+import numpy as np
+import pytest
+
+from colormap_tool import (
+    CMPSPACE,
+    _invert,
+    apply_colormap_with_numpy,
+    clear_cache,
+    get_colormaps,
+    get_cv_colormaps,
+    invert_colormap,
+)
+
+
+@pytest.mark.parametrize("name", ["cv.jet", "mpl.viridis", "mpl.inferno_r", "mpl.flag"])
+def test_invert_colormap_exact(name):
+    """Test that exact colormap colors decode to an entry of the same color, at distance 0."""
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, 256, size=(48, 64), dtype=np.uint8)
+    lut = get_colormaps(name).reshape(-1, 3)
+    image = lut[src]
+
+    indices, distance = invert_colormap(image, name, return_distance=True)
+    assert indices.shape == src.shape
+    assert indices.dtype == np.uint8
+    np.testing.assert_array_equal(lut[indices], image)
+    np.testing.assert_array_equal(distance, 0)
+
+
+def test_invert_colormap_bgr():
+    """Test that BGR output of apply_colormap_with_numpy round-trips with order='bgr'."""
+    src = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    image = apply_colormap_with_numpy(src, get_cv_colormaps("cv.jet"))
+    np.testing.assert_array_equal(invert_colormap(image, "cv.jet", order="bgr"), src)
+
+
+def test_invert_colormap_nearest():
+    """Test that colors near the colormap decode to the nearest entry, as a brute-force search."""
+    rng = np.random.default_rng(1)
+    lut = get_colormaps("mpl.viridis").reshape(-1, 3).astype(np.int32)
+    src = rng.integers(0, 256, size=5000)
+    image = np.clip(lut[src] + rng.integers(-6, 7, size=(5000, 3)), 0, 255).astype(np.uint8)
+
+    indices, distance = invert_colormap(image, "mpl.viridis", return_distance=True, refine=6)
+    d2 = ((image[:, None, :].astype(np.int32) - lut[None]) ** 2).sum(axis=-1)
+    np.testing.assert_array_equal(indices, d2.argmin(axis=1))
+    np.testing.assert_allclose(distance, np.sqrt(d2.min(axis=1)), rtol=1e-6)
+    assert distance.dtype == np.float32
+
+
+def test_invert_colormap_float():
+    """Test that float output maps the colormap linearly onto [vmin, vmax]."""
+    lut = get_colormaps("mpl.gray").reshape(-1, 3)
+    image = lut[[0, 51, 255]]
+    values = invert_colormap(image, "mpl.gray", dtype=np.float32, vmin=20.0, vmax=40.0)
+    assert values.dtype == np.float32
+    np.testing.assert_allclose(values, [20.0, 24.0, 40.0])
+
+
+def test_invert_colormap_cache(monkeypatch):
+    """Test that the lookup structures outlive clear_cache, and are rebuilt for a replaced colormap."""
+    src = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    invert_colormap(get_colormaps("cv.hot")[src], "cv.hot")
+    misses = _invert._INVERSE_CACHE.info().misses
+    clear_cache()
+    invert_colormap(get_colormaps("cv.hot")[src], "cv.hot")
+    assert _invert._INVERSE_CACHE.info().misses == misses
+
+    reversed_lut = np.ascontiguousarray(CMPSPACE["cv"]["hot"][::-1])
+    monkeypatch.setitem(CMPSPACE["cv"], "hot", reversed_lut)
+    np.testing.assert_array_equal(invert_colormap(reversed_lut.reshape(-1, 3)[src], "cv.hot"), src)
+    assert _invert._INVERSE_CACHE.info().misses == misses + 1
+
+
+def test_invert_colormap_invalid():
+    """Test that invalid input raises ValueError."""
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    with pytest.raises(ValueError, match=r"is not \(\.\.\., 3\)"):
+        invert_colormap(np.zeros((4, 4), dtype=np.uint8), "mpl.viridis")
+    with pytest.raises(ValueError, match="is not uint8"):
+        invert_colormap(image.astype(np.float32), "mpl.viridis")
+    with pytest.raises(ValueError, match="order must be"):
+        invert_colormap(image, "mpl.viridis", order="rgba")
+    with pytest.raises(ValueError, match="output dtype int8"):
+        invert_colormap(image, "mpl.viridis", dtype=np.int8)
+    with pytest.raises(ValueError, match="bits must be"):
+        invert_colormap(image, "mpl.viridis", bits=9)
+    with pytest.raises(ValueError, match="not found"):
+        invert_colormap(image, "mpl.not_a_colormap")
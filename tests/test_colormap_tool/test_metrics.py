@@ -0,0 +1,97 @@
+"""Tests for the _metrics module."""
+
+import numpy as np
+import pytest
+
+from colormap_tool import MPL_COLORMAPS, _metrics, colormap_metrics, get_colormaps, simulate_cvd
+from colormap_tool._metrics import _delta_e2000
+
+
+@pytest.mark.parametrize(
+    ("lab1", "lab2", "expected"),
+    [
+        ((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485), 2.0425),
+        ((50.0, -1.3802, -84.2814), (50.0, 0.0, -82.7485), 1.0),
+        ((50.0, 2.49, -0.001), (50.0, -2.49, 0.0009), 7.1792),
+        ((50.0, 2.5, 0.0), (73.0, 25.0, -18.0), 27.1492),
+        ((2.0776, 0.0795, -1.135), (0.9033, -0.0636, -0.5514), 0.9082),
+    ],
+)
+def test_delta_e2000(lab1, lab2, expected):
+    """Test CIEDE2000 against the reference data of Sharma et al. (2005)."""
+    assert _delta_e2000(np.array(lab1), np.array(lab2)) == pytest.approx(expected, abs=1e-4)
+
+
+def test_colormap_metrics(tmp_path):
+    """Test the metrics of a few well-known colormaps."""
+    metrics = colormap_metrics("mpl", cache=tmp_path)
+    assert set(metrics) == set(MPL_COLORMAPS)
+
+    gray = metrics["gray"]
+    assert gray.lightness_monotonic
+    assert gray.lightness_range == pytest.approx(100, abs=0.01)
+    assert gray.deuteranopia == pytest.approx(1, abs=1e-3)
+    assert metrics["gray_r"].lightness_range == pytest.approx(-100, abs=0.01)
+
+    assert metrics["viridis"].lightness_monotonic
+    assert not metrics["jet"].lightness_monotonic
+    assert metrics["viridis"].delta_e_cv < metrics["jet"].delta_e_cv
+
+
+def test_colormap_metrics_disk_cache(tmp_path, monkeypatch):
+    """Test that a repeated run reads the disk cache, and a new colormap invalidates it."""
+    first = colormap_metrics("cv", cache=tmp_path)
+    assert len(list(tmp_path.glob("metrics-cv-*.npy"))) == 1
+
+    def fail(luts):
+        pytest.fail(f"the metrics of {len(luts)} colormaps were computed again")
+
+    with monkeypatch.context() as m:
+        m.setattr(_metrics, "_compute_metrics", fail)
+        assert colormap_metrics("cv", cache=tmp_path) == first
+
+    MPL_COLORMAPS["custom_gray"] = get_colormaps("mpl.gray").reshape(256, 1, 3)
+    try:
+        metrics = colormap_metrics("mpl", cache=tmp_path)
+        assert metrics["custom_gray"] == metrics["gray"]
+        assert len(list(tmp_path.glob("metrics-mpl-*.npy"))) == 1
+        del MPL_COLORMAPS["custom_gray"]
+        colormap_metrics("mpl", cache=tmp_path)
+        assert len(list(tmp_path.glob("metrics-mpl-*.npy"))) == 2
+    finally:
+        MPL_COLORMAPS.pop("custom_gray", None)
+
+
+def test_colormap_metrics_without_cache(tmp_path, monkeypatch):
+    """Test that by default, no cache file is read or written, and cache=True uses $XDG_CACHE_HOME."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    metrics = colormap_metrics("cv")
+    assert metrics == colormap_metrics("cv", cache=False)
+    assert metrics["jet"] == colormap_metrics("cv", cache=tmp_path / "other")["jet"]
+    assert not (tmp_path / "colormap_tool").exists()
+
+    assert colormap_metrics("cv", cache=True) == metrics
+    assert len(list((tmp_path / "colormap_tool").glob("metrics-cv-*.npy"))) == 1
+
+
+def test_colormap_metrics_aliases():
+    """Test that namespace aliases are accepted, and unknown namespaces raise ValueError."""
+    assert colormap_metrics("OpenCV") == colormap_metrics("cv2") == colormap_metrics("cv")
+    assert set(colormap_metrics("matplotlib")) == set(MPL_COLORMAPS)
+    with pytest.raises(ValueError, match="Namespace nonexistent is not recognized"):
+        colormap_metrics("nonexistent")
+
+
+def test_simulate_cvd():
+    """Test that grays are unchanged, severity 0 is the identity, and colors are shifted."""
+    gray = get_colormaps("mpl.gray")
+    np.testing.assert_allclose(simulate_cvd(gray, "deuteranopia").astype(int), gray, atol=1)
+
+    jet = get_colormaps("cv.jet")
+    np.testing.assert_array_equal(simulate_cvd(jet, "protanopia", severity=0), jet)
+    assert np.abs(simulate_cvd(jet, "protanopia").astype(int) - jet).max() > 50
+
+    with pytest.raises(ValueError, match="deficiency must be one of"):
+        simulate_cvd(jet, "monochromacy")
+    with pytest.raises(ValueError, match="severity must be between"):
+        simulate_cvd(jet, "tritanopia", severity=2)
@@ -1,11 +1,22 @@
 """Tests for the _mpl module."""
 
+import pickle
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pytest
 from matplotlib.colors import Colormap
 
-from colormap_tool import get_mpl_colormaps, register_all_cmps2mpl, uint8_rgb_arr2mpl_cmp
+from colormap_tool import (
+    CMPSPACE,
+    clear_mpl_cache,
+    get_colormaps,
+    get_mpl_colormaps,
+    mpl_cache_info,
+    register_all_cmps2mpl,
+    set_mpl_cache_size,
+    uint8_rgb_arr2mpl_cmp,
+)
 from colormap_tool._cv import get_cv_colormaps
 
 
@@ -49,6 +60,26 @@ def test_get_mpl_colormaps_dot_notation():
     assert "cv.jet" in cmap.name
 
 
+def test_get_mpl_colormaps_resampled():
+    """Test getting resampled colormaps for matplotlib."""
+    cmap = get_mpl_colormaps("cv.jet", n=16)
+    assert isinstance(cmap, Colormap)
+    assert cmap.N == 16
+
+    cmap = get_mpl_colormaps("viridis", "mpl", n=16)
+    assert isinstance(cmap, Colormap)
+    assert cmap.N == 16
+
+
+def test_get_mpl_colormaps_aliases():
+    """Test namespace aliases, letter case and reversed variants."""
+    assert get_mpl_colormaps("matplotlib.blues").name == "Blues"
+    assert get_mpl_colormaps("OpenCV.Jet").name == "cv.jet"
+    cmap = get_mpl_colormaps("cv.jet_r")
+    assert cmap.name == "cv.jet_r"
+    np.testing.assert_allclose(cmap(0.0), get_mpl_colormaps("cv.jet")(1.0))
+
+
 def test_register_all_cmps2mpl():
     """Test registering all colormaps with matplotlib."""
     # Register all colormaps
@@ -62,6 +93,21 @@ def test_register_all_cmps2mpl():
     assert isinstance(cmap, Colormap)
 
 
+def test_register_all_cmps2mpl_lazy():
+    """Test that registered colormaps build their colors on first use and survive pickling."""
+    register_all_cmps2mpl()
+
+    cmap = plt.get_cmap("cv.hot")
+    expected = uint8_rgb_arr2mpl_cmp(get_colormaps("cv.hot"), "cv.hot")
+    x = np.linspace(0, 1, 100)
+    np.testing.assert_array_equal(cmap(x), expected(x))
+    np.testing.assert_array_equal(cmap.reversed()(x), expected.reversed()(x))
+
+    restored = pickle.loads(pickle.dumps(cmap))  # noqa: S301
+    assert restored.name == "cv.hot"
+    np.testing.assert_array_equal(restored(x), expected(x))
+
+
 @pytest.fixture
 def test_image():
     """Create a linear gradient test image."""
@@ -90,3 +136,59 @@ def test_uint8_rgb_arr2mpl_cmp_listed(test_image):
     ori_result = (ori_result[:, :, :3] * 255).astype(np.uint8)
 
     assert np.allclose(mpl_result, ori_result, atol=1)
+
+
+def test_get_mpl_colormaps_cached():
+    """Test that colormap variants are cached per (namespace, name, n, alpha, mode)."""
+    clear_mpl_cache()
+    cmap = get_mpl_colormaps("cv.jet", alpha=0.5, mode="linear")
+    assert cmap(0.0)[3] == 0.5
+    other = get_mpl_colormaps("CV.JET", alpha=0.5, mode="linear")
+    assert other is not cmap
+    assert other == cmap
+    assert get_mpl_colormaps("cv.jet") != cmap
+
+    viridis = get_mpl_colormaps("mpl.viridis", n=16, alpha=0.25)
+    assert viridis.N == 16
+    assert viridis(1.0)[3] == 0.25
+
+    info = mpl_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 3, 3)
+
+    clear_mpl_cache("cv.jet_r")
+    assert mpl_cache_info().currsize == 1
+
+    with pytest.raises(ValueError, match="mode"):
+        get_mpl_colormaps("cv.jet", mode="nearest")
+
+
+def test_get_mpl_colormaps_copies():
+    """Test that modifying a returned colormap does not affect later results."""
+    cmap = get_mpl_colormaps("cv.hot")
+    cmap.set_bad((1.0, 0.0, 1.0, 1.0))
+    assert get_mpl_colormaps("cv.hot").get_bad()[3] == 0.0
+    assert cmap.get_bad()[3] == 1.0
+
+
+def test_register_all_cmps2mpl_refreshes_colors(monkeypatch):
+    """Test that lazy colors are rebuilt after a colormap is replaced in CMPSPACE."""
+    register_all_cmps2mpl()
+    assert plt.get_cmap("cv.hot")(0.0) != (1.0, 1.0, 1.0, 1.0)
+
+    white = np.full((256, 1, 3), 255, dtype=np.uint8)
+    monkeypatch.setitem(CMPSPACE["cv"], "hot", white)
+    assert plt.get_cmap("cv.hot")(0.0) == (1.0, 1.0, 1.0, 1.0)
+
+
+def test_set_mpl_cache_size():
+    """Test that the colormap cache evicts the least recently used entries."""
+    clear_mpl_cache()
+    set_mpl_cache_size(2)
+    try:
+        for name in ("cv.jet", "cv.hot", "cv.bone"):
+            get_mpl_colormaps(name)
+        info = mpl_cache_info()
+        assert (info.evictions, info.maxsize, info.currsize) == (1, 2, 2)
+    finally:
+        set_mpl_cache_size(128)
+        clear_mpl_cache()
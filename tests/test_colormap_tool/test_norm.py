@@ -0,0 +1,197 @@
+"""Tests for the _norm module."""
+
+import numpy as np
+import pytest
+
+from colormap_tool import (
+    Normalize,
+    apply_colormap_banded,
+    apply_colormap_normalized,
+    apply_colormap_with_numpy,
+    cache_info,
+    get_banded_lut,
+    get_colormaps,
+    get_cv_colormaps,
+    get_normalized_lut,
+    resample_lut,
+)
+
+
+@pytest.mark.parametrize(
+    ("norm", "expected"),
+    [
+        (Normalize(0, 4), [0, 0, 0.25, 1, 1]),
+        (Normalize.window(level=2, width=4), [0, 0, 0.25, 1, 1]),
+        (Normalize(0, 4, mode="gamma", gamma=2.0), [0, 0, 0.5, 1, 1]),
+        (Normalize(0, 4, mode="power", gamma=2.0), [0, 0, 0.0625, 1, 1]),
+        (Normalize(1, 100, mode="log"), [0, 0, 0, np.log(4) / np.log(100), 1]),
+        (Normalize(3, 3), [0, 0, 0, 0, 0]),
+    ],
+)
+def test_normalize(norm, expected):
+    """Test the normalized values of each mode, clipped to [vmin, vmax]."""
+    np.testing.assert_allclose(norm([-1, 0, 1, 4, 200]), expected, atol=1e-12)
+
+
+def test_normalize_log_symlog():
+    """Test that log normalization is linear in log(x), and symlog is symmetric around zero."""
+    np.testing.assert_allclose(Normalize(1, 100, mode="log")([10, np.nan]), [0.5, np.nan])
+    t = Normalize(-1000, 1000, mode="symlog", linthresh=10.0)([-1000, -10, 0, 10, 1000])
+    np.testing.assert_allclose(t, [0, 0.5 - t[3] + 0.5, 0.5, t[3], 1])
+    assert 0.5 < t[3] < 0.75
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16])
+def test_apply_colormap_normalized(dtype):
+    """Test that the composed LUT matches normalizing the frame and then applying the colormap."""
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, np.iinfo(dtype).max + 1, size=(48, 64), dtype=dtype)
+    norm = Normalize.window(level=src.max() / 2, width=src.max() / 2, mode="gamma", gamma=2.2)
+
+    expected = apply_colormap_with_numpy(norm(src), get_cv_colormaps("mpl.inferno"), vmin=0, vmax=1)
+    np.testing.assert_array_equal(apply_colormap_normalized(src, "mpl.inferno", norm), expected)
+
+    dst = np.empty((48, 64, 3), dtype=np.uint8)
+    result = apply_colormap_normalized(src, "inferno", norm, dst=dst, workers=2, namespace="mpl", order="rgb")
+    assert result is dst
+    np.testing.assert_array_equal(dst, expected[..., ::-1])
+
+
+def test_get_normalized_lut():
+    """Test that composed LUTs are read-only, cached by their parameters, and usable as colormaps."""
+    lut = get_normalized_lut("mpl.viridis", Normalize(0, 255), n=256, order="rgb")
+    assert lut.shape == (256, 1, 3)
+    assert not lut.flags.writeable
+    np.testing.assert_array_equal(lut.reshape(256, 3), get_colormaps("mpl.viridis"))
+
+    norm = Normalize(100, 1000, mode="log")
+    lut = get_normalized_lut("mpl.viridis", norm, dtype=np.uint16)
+    assert lut.shape == (65536, 1, 3)
+    misses = cache_info().misses
+    assert get_normalized_lut("mpl.viridis", Normalize(100, 1000, "log"), dtype=np.uint16) is lut
+    assert get_normalized_lut("mpl.viridis", norm, dtype=np.uint16, order="rgb") is not lut
+    assert cache_info().misses == misses + 1
+
+    single = get_normalized_lut("mpl.viridis", Normalize(0, 255), n=1, order="rgb")
+    np.testing.assert_array_equal(single.reshape(256, 3), np.broadcast_to(get_colormaps("mpl.viridis")[0], (256, 3)))
+
+
+def test_normalize_invalid():
+    """Test that invalid parameters and input raise ValueError."""
+    src = np.zeros((4, 4), dtype=np.uint8)
+    with pytest.raises(ValueError, match="mode must be one of"):
+        Normalize(0, 1, mode="sqrt")(src)
+    with pytest.raises(ValueError, match="must be less than or equal"):
+        Normalize(1, 0)(src)
+    with pytest.raises(ValueError, match="vmin must be positive"):
+        get_normalized_lut("mpl.viridis", Normalize(0, 10, mode="log"))
+    with pytest.raises(ValueError, match="gamma must be positive"):
+        apply_colormap_normalized(src, "mpl.viridis", Normalize(0, 1, mode="gamma", gamma=0))
+    with pytest.raises(ValueError, match="linthresh must be positive"):
+        Normalize(0, 1, mode="symlog", linthresh=-1)(src)
+    with pytest.raises(ValueError, match="is not uint8 or uint16"):
+        apply_colormap_normalized(src.astype(np.float32), "mpl.viridis", Normalize(0, 1))
+    with pytest.raises(ValueError, match="order must be"):
+        get_normalized_lut("mpl.viridis", Normalize(0, 1), order="rgba")
+    with pytest.raises(ValueError, match="must be at least 1"):
+        get_normalized_lut("mpl.viridis", Normalize(0, 1), n=0)
+    with pytest.raises(ValueError, match="not found"):
+        apply_colormap_normalized(src, "mpl.not_a_colormap", Normalize(0, 1))
+
+
+def banded_reference(src, boundaries, name="mpl.inferno"):
+    """Colorize with a binary search per value, in BGR order, with NaN values in the first band color."""
+    bands = resample_lut(get_colormaps(name), len(boundaries) - 1)[:, ::-1]
+    table = np.concatenate([bands[:1], bands, bands[-1:]])
+    out = table[np.searchsorted(boundaries, src, side="right")]
+    out[np.isnan(src.astype(np.float64))] = bands[0]
+    return out
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32, np.float64])
+@pytest.mark.parametrize(
+    "boundaries",
+    [np.linspace(20, 80, 11), [3.5, 7.25, 100.0, 101.0, 180.0], [0.0, 1e-9, 200.0]],
+    ids=["uniform", "irregular", "close"],
+)
+def test_apply_colormap_banded(dtype, boundaries):
+    """Test that bands match a binary search, including values on and next to the boundaries."""
+    rng = np.random.default_rng(0)
+    b = np.asarray(boundaries).astype(dtype)
+    if dtype in (np.uint8, np.uint16):
+        src = rng.integers(0, 256, size=(40, 50)).astype(dtype)
+    else:
+        edges = np.concatenate([b, np.nextafter(b, dtype(np.inf)), np.nextafter(b, dtype(-np.inf))])
+        src = np.concatenate([rng.uniform(-10, 250, 1960), edges, [np.nan, np.inf, -np.inf]]).astype(dtype)
+        src = np.resize(src, (40, 50))
+
+    expected = banded_reference(src, boundaries)
+    np.testing.assert_array_equal(apply_colormap_banded(src, "mpl.inferno", boundaries), expected)
+
+    dst = np.empty((40, 50, 3), dtype=np.uint8)
+    result = apply_colormap_banded(src, "inferno", boundaries, dst=dst, workers=2, namespace="mpl", order="rgb")
+    assert result is dst
+    np.testing.assert_array_equal(dst, expected[..., ::-1])
+
+
+@pytest.mark.parametrize("dtype", [np.uint16, np.float32])
+def test_apply_colormap_banded_extremes(dtype):
+    """Test the under, over and bad colors, for NaN values and masked elements."""
+    src = np.ma.masked_array(np.array([0, 10, 19, 20, 29, 30, 50], dtype=dtype), mask=[0, 0, 0, 0, 0, 0, 1])
+    colors = [(1, 1, 1), (2, 2, 2), (3, 3, 3)]
+    bands = resample_lut(get_colormaps("mpl.viridis"), 2)
+
+    out = apply_colormap_banded(
+        src, "mpl.viridis", [10, 20, 30], order="rgb", under=colors[0], over=colors[1], bad=colors[2]
+    )
+    np.testing.assert_array_equal(out, [colors[0], bands[0], bands[0], bands[1], bands[1], colors[1], colors[2]])
+
+    if dtype == np.float32:
+        out = apply_colormap_banded(
+            np.array([np.nan, 25], dtype=dtype), "mpl.viridis", [10, 20, 30], order="rgb", under=colors[0]
+        )
+        np.testing.assert_array_equal(out, [bands[0], bands[1]])
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32])
+def test_apply_colormap_banded_single_band(dtype):
+    """Test that two boundaries make one band with the first color of the colormap."""
+    first = get_colormaps("mpl.viridis")[0]
+    src = np.array([0, 10, 20, 30], dtype=dtype)
+    out = apply_colormap_banded(src, "mpl.viridis", [10, 20], order="rgb")
+    np.testing.assert_array_equal(out, np.broadcast_to(first, (4, 3)))
+
+    out = apply_colormap_banded(src, "mpl.viridis", [10, 20], order="rgb", under=(1, 1, 1), over=(2, 2, 2))
+    np.testing.assert_array_equal(out, [(1, 1, 1), first, (2, 2, 2), (2, 2, 2)])
+
+
+def test_get_banded_lut():
+    """Test that banded LUTs are read-only, cached, and band raw values like the float path."""
+    lut = get_banded_lut("mpl.inferno", [64, 128, 192], under=(0, 0, 0))
+    assert lut.shape == (256, 1, 3)
+    assert not lut.flags.writeable
+    assert get_banded_lut("mpl.inferno", (64.0, 128.0, 192.0), under=[0, 0, 0]) is lut
+    values = np.arange(256, dtype=np.float32)
+    np.testing.assert_array_equal(
+        lut.reshape(256, 3), apply_colormap_banded(values, "mpl.inferno", [64, 128, 192], under=(0, 0, 0))
+    )
+    assert get_banded_lut("mpl.inferno", [64, 128, 192], dtype=np.uint16).shape == (65536, 1, 3)
+
+
+def test_apply_colormap_banded_invalid():
+    """Test that invalid boundaries and input raise ValueError."""
+    src = np.zeros((4, 4), dtype=np.float32)
+    with pytest.raises(ValueError, match="at least 2 values"):
+        apply_colormap_banded(src, "mpl.viridis", [1.0])
+    with pytest.raises(ValueError, match="strictly increasing"):
+        apply_colormap_banded(src, "mpl.viridis", [1.0, 3.0, 2.0])
+    with pytest.raises(ValueError, match="strictly increasing"):
+        apply_colormap_banded(src, "mpl.viridis", [1.0, np.nan])
+    with pytest.raises(ValueError, match="is not uint8, uint16, float32 or float64"):
+        apply_colormap_banded(src.astype(np.int32), "mpl.viridis", [0, 1])
+    with pytest.raises(ValueError, match="is not uint8 or uint16"):
+        get_banded_lut("mpl.viridis", [0, 1], dtype=np.float32)
+    with pytest.raises(ValueError, match="Colors must have 3 values"):
+        apply_colormap_banded(src, "mpl.viridis", [0, 1], under=(0, 0))
+    with pytest.raises(ValueError, match="order must be"):
+        apply_colormap_banded(src, "mpl.viridis", [0, 1], order="rgba")
@@ -0,0 +1,196 @@
+"""Tests for the _stream module."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from colormap_tool import (
+    AutoRange,
+    IncrementalColorizer,
+    apply_colormap_with_numpy,
+    cache_info,
+    colorize_stream,
+    get_cv_colormaps,
+)
+
+
+def make_frames(count, shape=(48, 64), dtype=np.uint8):
+    """Create a list of random frames."""
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, size=shape).astype(dtype) for _ in range(count)]
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_colorize_stream(prefetch):
+    """Test that streamed frames match colorizing each frame on its own."""
+    frames = make_frames(10)
+    lut = get_cv_colormaps("mpl.inferno")
+
+    results = [frame.copy() for frame in colorize_stream(iter(frames), "mpl.inferno", prefetch=prefetch)]
+
+    assert len(results) == len(frames)
+    for frame, result in zip(frames, results):
+        np.testing.assert_array_equal(result, apply_colormap_with_numpy(frame, lut))
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_colorize_stream_reuses_buffers(prefetch):
+    """Test that output buffers are reused, and that the last `buffers` frames stay valid."""
+    frames = make_frames(12)
+    lut = get_cv_colormaps("cv.jet")
+
+    held = []
+    buffer_ids = set()
+    for index, result in enumerate(colorize_stream(frames, lut, buffers=2, prefetch=prefetch)):
+        buffer_ids.add(id(result))
+        held.append(result)
+        if index >= 1:
+            np.testing.assert_array_equal(held[-2], apply_colormap_with_numpy(frames[index - 1], lut))
+
+    assert len(buffer_ids) == 2 + prefetch + (1 if prefetch else 0)
+
+
+def test_colorize_stream_float_frames():
+    """Test high-bit-depth frames with a fixed range."""
+    frames = [frame.astype(np.float32) / 10 for frame in make_frames(3)]
+    lut = get_cv_colormaps("cv.jet")
+
+    for frame, result in zip(frames, colorize_stream(frames, lut, vmin=0.0, vmax=25.5, prefetch=1)):
+        np.testing.assert_array_equal(result, apply_colormap_with_numpy(frame, lut, vmin=0.0, vmax=25.5))
+
+
+def test_colorize_stream_errors():
+    """Test that errors in the pipeline threads reach the caller and invalid arguments are rejected."""
+
+    def failing_frames():
+        yield from make_frames(2)
+        raise RuntimeError("decode failed")
+
+    with pytest.raises(RuntimeError, match="decode failed"):
+        list(colorize_stream(failing_frames(), "cv.jet", prefetch=2))
+
+    with pytest.raises(ValueError, match="dtype of the input array"):
+        list(colorize_stream(make_frames(2, dtype=np.int32), "cv.jet", prefetch=2))
+
+    with pytest.raises(ValueError, match="buffers"):
+        list(colorize_stream([], "cv.jet", buffers=0))
+    with pytest.raises(ValueError, match="prefetched"):
+        list(colorize_stream([], "cv.jet", prefetch=-1))
+
+
+def test_colorize_stream_early_exit():
+    """Test that stopping early shuts the pipeline threads down."""
+    before = threading.active_count()
+
+    stream = colorize_stream(iter(make_frames(50)), "cv.jet", prefetch=2)
+    next(stream)
+    stream.close()
+
+    assert threading.active_count() == before
+
+
+def test_colorize_stream_autorange():
+    """Test that each frame is colorized with the range estimated so far, and fixed bounds take precedence."""
+    frames = make_frames(4, dtype=np.float32)
+    lut = get_cv_colormaps("mpl.inferno")
+
+    expected = AutoRange(alpha=0.5)
+    for frame, result in zip(frames, colorize_stream(frames, lut, autorange=AutoRange(alpha=0.5))):
+        vmin, vmax = expected.update(frame)
+        np.testing.assert_array_equal(result, apply_colormap_with_numpy(frame, lut, vmin=vmin, vmax=vmax))
+
+    expected.reset()
+    for frame, result in zip(frames, colorize_stream(frames, lut, vmin=0, autorange=AutoRange(alpha=0.5))):
+        vmax = expected.update(frame)[1]
+        np.testing.assert_array_equal(result, apply_colormap_with_numpy(frame, lut, vmin=0, vmax=vmax))
+
+
+def test_colorize_stream_autorange_held():
+    """Test that a slowly drifting range of uint16 frames reuses its table instead of filling the cache."""
+    rng = np.random.default_rng(0)
+    base = rng.integers(1000, 3000, size=(32, 32))
+    frames = [(base + index).astype(np.uint16) for index in range(20)]
+    lut = get_cv_colormaps("mpl.inferno")
+
+    info = cache_info()
+    results = [result.copy() for result in colorize_stream(frames, lut, autorange=AutoRange(alpha=0.5))]
+    assert cache_info().misses - info.misses <= 4
+    assert cache_info().currsize - info.currsize <= 4
+
+    vmin, vmax = AutoRange(alpha=0.5).update(frames[0])
+    np.testing.assert_array_equal(results[1], apply_colormap_with_numpy(frames[1], lut, vmin=vmin, vmax=vmax))
+
+    jump = (base * 4).astype(np.uint16)
+    results = list(colorize_stream([frames[0], jump], lut, autorange=AutoRange(alpha=1.0)))
+    vmin, vmax = AutoRange().update(jump)
+    np.testing.assert_array_equal(results[-1], apply_colormap_with_numpy(jump, lut, vmin=vmin, vmax=vmax))
+
+
+def covered(rects, shape):
+    """Return a bool mask of the pixels covered by a list of rectangles."""
+    mask = np.zeros(shape, dtype=bool)
+    for x, y, w, h in rects:
+        assert not mask[y : y + h, x : x + w].any(), "rectangles must not overlap"
+        mask[y : y + h, x : x + w] = True
+    return mask
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32])
+def test_incremental_colorizer(dtype):
+    """Test that only changed tiles are reported, and the output always matches a full recolor."""
+    rng = np.random.default_rng(0)
+    lut = get_cv_colormaps("mpl.inferno")
+    frame = (rng.random((100, 150)) * 200).astype(dtype)
+    colorizer = IncrementalColorizer(lut, tile=(16, 32), vmin=0, vmax=200)
+
+    out, rects = colorizer.update(frame)
+    assert rects == [(0, 0, 150, 100)]
+    np.testing.assert_array_equal(out, apply_colormap_with_numpy(frame, lut, vmin=0, vmax=200))
+
+    for _ in range(5):
+        frame = frame.copy()
+        changes = rng.random(frame.shape) < 0.002
+        frame[changes] += 1
+        out, rects = colorizer.update(frame)
+        assert out is colorizer.output
+        np.testing.assert_array_equal(out, apply_colormap_with_numpy(frame, lut, vmin=0, vmax=200))
+        mask = covered(rects, frame.shape)
+        assert mask[changes].all()
+        tiles = np.zeros((112, 160), dtype=bool)
+        tiles[:100, :150] = changes
+        dirty = tiles.reshape(7, 16, 5, 32).any(axis=(1, 3)).repeat(16, axis=0).repeat(32, axis=1)
+        np.testing.assert_array_equal(mask, dirty[:100, :150])
+
+    assert colorizer.update(frame)[1] == []
+
+
+def test_incremental_colorizer_merges_rects():
+    """Test that adjacent changed tiles are merged into one rectangle."""
+    frame = np.zeros((64, 64), dtype=np.uint8)
+    colorizer = IncrementalColorizer("cv.jet", tile=8)
+    colorizer.update(frame)
+    frame[10:30, 20:41] = 1
+    _, rects = colorizer.update(frame)
+    assert rects == [(16, 8, 32, 24)]
+
+
+def test_incremental_colorizer_full_updates():
+    """Test that a new range, shape or NaN handling recolors as expected."""
+    colorizer = IncrementalColorizer("cv.jet", tile=8)
+    frame = np.linspace(0, 1, 24 * 24, dtype=np.float32).reshape(24, 24)
+    colorizer.update(frame)
+    frame[0, 0] = np.nan
+    assert colorizer.update(frame)[1] == [(0, 0, 24, 24)]  # NaN is ignored, but the minimum moved
+    assert colorizer.update(frame.copy())[1] == []
+
+    frame[5, 5] = 2.0
+    assert colorizer.update(frame)[1] == [(0, 0, 24, 24)]
+    assert colorizer.update(np.zeros((8, 16), dtype=np.float32))[1] == [(0, 0, 16, 8)]
+
+    colorizer.reset()
+    assert colorizer.output is None
+    with pytest.raises(ValueError, match=r"is not \(H, W\)"):
+        colorizer.update(np.zeros((2, 2, 2), dtype=np.uint8))
+    with pytest.raises(ValueError, match="tile size"):
+        IncrementalColorizer("cv.jet", tile=0)